@@ -6,6 +6,8 @@ import pandas as pd
 from pathlib import Path
 import json
 
+from source_cache import excel_sheet_names, read_excel_cached
+
 ZZ_DIR = Path("ZZ")
 
 def extract_key_value_pairs(df):
@@ -28,7 +30,7 @@ def extract_key_value_pairs(df):
 def analyze_sheet_structure(file_path, sheet_name):
     """Анализ структуры листа"""
     try:
-        df = pd.read_excel(file_path, sheet_name=sheet_name, header=None)
+        df = read_excel_cached(file_path, sheet_name=sheet_name, header=None)
         
         # Извлекаем пары ключ-значение
         pairs = extract_key_value_pairs(df)
@@ -68,13 +70,13 @@ def main():
         print(f"{'='*80}")
         
         try:
-            xls = pd.ExcelFile(excel_file)
+            sheet_names = excel_sheet_names(excel_file)
             file_result = {
                 "file": excel_file.name,
                 "sheets": {}
             }
             
-            for sheet_name in xls.sheet_names:
+            for sheet_name in sheet_names:
                 print(f"\n  Лист: {sheet_name}")
                 sheet_data = analyze_sheet_structure(excel_file, sheet_name)
                 file_result["sheets"][sheet_name] = sheet_data
@@ -6,17 +6,18 @@ import pandas as pd
 from pathlib import Path
 import json
 
+from source_cache import excel_sheet_names, read_excel_cached
+
 ZZ_DIR = Path("ZZ")
 
 def read_main_sheet(file_path: Path):
     """Чтение основного листа 'Залоговое заключение'"""
     try:
-        xls = pd.ExcelFile(file_path)
-        if "Залоговое заключение" not in xls.sheet_names:
+        if "Залоговое заключение" not in excel_sheet_names(file_path):
             return None
         
         # Читаем весь лист
-        df = pd.read_excel(xls, sheet_name="Залоговое заключение", header=None)
+        df = read_excel_cached(file_path, sheet_name="Залоговое заключение", header=None)
         
         # Ищем структурированные данные (пары ключ-значение)
         data = {}
@@ -42,11 +43,10 @@ def read_main_sheet(file_path: Path):
 def read_description_sheet(file_path: Path):
     """Чтение листа 'Описание'"""
     try:
-        xls = pd.ExcelFile(file_path)
-        if "Описание" not in xls.sheet_names:
+        if "Описание" not in excel_sheet_names(file_path):
             return None
         
-        df = pd.read_excel(xls, sheet_name="Описание", header=None)
+        df = read_excel_cached(file_path, sheet_name="Описание", header=None)
         
         # Ищем заголовки
         headers = []
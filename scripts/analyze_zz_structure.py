@@ -2,24 +2,25 @@
 Анализ структуры файлов залоговых заключений
 """
 
-import pandas as pd
 from pathlib import Path
 import json
 
+from source_cache import excel_sheet_names, read_excel_cached
+
 ZZ_DIR = Path("ZZ")
 
 def analyze_excel_file(file_path: Path):
     """Анализ структуры Excel файла"""
     try:
-        xls = pd.ExcelFile(file_path)
+        sheet_names = excel_sheet_names(file_path)
         result = {
             "file": file_path.name,
             "sheets": []
         }
         
-        for sheet_name in xls.sheet_names:
+        for sheet_name in sheet_names:
             try:
-                df = pd.read_excel(xls, sheet_name=sheet_name, nrows=5)
+                df = read_excel_cached(file_path, sheet_name=sheet_name, nrows=5)
                 sheet_info = {
                     "name": sheet_name,
                     "columns": list(df.columns),
@@ -6,12 +6,14 @@ import pandas as pd
 from pathlib import Path
 import json
 
+from source_cache import excel_sheet_names, read_excel_cached
+
 ZZ_DIR = Path("ZZ")
 
 def analyze_tab_structure(file_path, sheet_name):
     """Анализ структуры вкладки"""
     try:
-        df = pd.read_excel(file_path, sheet_name=sheet_name, header=None)
+        df = read_excel_cached(file_path, sheet_name=sheet_name, header=None)
         
         # Ищем заголовки (обычно в первых строках)
         headers = []
@@ -58,13 +60,13 @@ def main():
     print(f"Детальный анализ файла: {test_file.name}")
     
     try:
-        xls = pd.ExcelFile(test_file)
+        sheet_names = excel_sheet_names(test_file)
         file_result = {
             "file": test_file.name,
             "sheets": {}
         }
         
-        for sheet_name in xls.sheet_names:
+        for sheet_name in sheet_names:
             print(f"\n  Анализ вкладки: {sheet_name}")
             sheet_data = analyze_tab_structure(test_file, sheet_name)
             file_result["sheets"][sheet_name] = sheet_data
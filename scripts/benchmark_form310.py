@@ -0,0 +1,60 @@
+"""
+Замер пропускной способности генерации формы 0409310 на больших портфелях.
+
+Портфель размножается из public/portfolioData.json до нужного числа сделок,
+отчет пишется в счетчик байт (кодировка windows-1251, как в файле), без диска.
+
+python scripts/benchmark_form310.py --sizes 10000 100000 1000000 --workers 4
+"""
+
+import argparse
+import itertools
+import json
+import os
+import time
+from typing import Any, Dict, List
+
+import generate_form310_xml as form310
+
+
+class CountingSink:
+    """Принимает текст отчета и считает его размер в windows-1251"""
+
+    def __init__(self) -> None:
+        self.size = 0
+
+    def write(self, text: str) -> int:
+        self.size += len(text.encode("windows-1251", errors="xmlcharrefreplace"))
+        return len(text)
+
+
+def synthetic_portfolio(records: List[Dict[str, Any]], size: int) -> List[Dict[str, Any]]:
+    # Записи переиспользуются по ссылке: для замера важен объем, а не уникальность
+    return list(itertools.islice(itertools.cycle(records), size))
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark Form 0409310 XML generation throughput.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    records = json.loads(form310.PORTFOLIO_DATA_FILE.read_text(encoding="utf-8"))
+    print(f"workers={args.workers}, chunk={form310.SECTION_CHUNK_SIZE}")
+    for size in args.sizes:
+        portfolio = synthetic_portfolio(records, size)
+        sink = CountingSink()
+        started = time.perf_counter()
+        form310.write_xml_stream(sink, portfolio, "bench", "2025-01-01", "000000000", "Банк", args.workers)
+        elapsed = time.perf_counter() - started
+        print(
+            f"{size:>9} сделок: {elapsed:8.2f} с, {size / elapsed:9.0f} сделок/с, "
+            f"{sink.size / elapsed / 2**20:6.1f} МБ/с, {sink.size / 2**20:8.1f} МБ"
+        )
+
+
+if __name__ == "__main__":
+    main()
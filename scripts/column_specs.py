@@ -0,0 +1,140 @@
+"""
+Колоночные генераторы случайных полей.
+
+Спецификация — упорядоченный словарь {поле: генератор}. Генератор получает
+numpy.random.Generator, число строк и уже построенные колонки (можно ссылаться
+на поля, объявленные раньше) и возвращает колонку целиком. build_rows строит
+колонки по порядку и собирает из них записи; порядок ключей записи совпадает с
+порядком спецификации. Значение ABSENT означает, что ключа в записи нет.
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Mapping
+
+import numpy as np
+
+
+Columns = Dict[str, np.ndarray]
+Column = Callable[[np.random.Generator, int, Columns], np.ndarray]
+
+
+class _Absent:
+    def __repr__(self) -> str:
+        return "ABSENT"
+
+
+ABSENT: Any = _Absent()
+
+
+def objects(values: List[Any]) -> np.ndarray:
+    """Колонка dtype=object из списка значений (без разбора вложенных списков)"""
+    column = np.empty(len(values), dtype=object)
+    column[:] = values
+    return column
+
+
+def ints(low: int, high: int) -> Column:
+    """Целые из [low, high], как random.randint"""
+    return lambda rng, size, columns: rng.integers(low, high + 1, size)
+
+
+def floats(low: float, high: float, digits: int = 1) -> Column:
+    """round(random.uniform(low, high), digits)"""
+    return lambda rng, size, columns: np.round(rng.uniform(low, high, size), digits)
+
+
+def share_of(field: str, low: float, high: float, digits: Any = None) -> Column:
+    """Доля поля field: round(field * uniform(low, high), digits); digits=None — int(...)"""
+
+    def column(rng: np.random.Generator, size: int, columns: Columns) -> np.ndarray:
+        values = columns[field] * rng.uniform(low, high, size)
+        return np.trunc(values).astype(np.int64) if digits is None else np.round(values, digits)
+
+    return column
+
+
+def ratio_of(numerator: str, denominator: str) -> Column:
+    """int(numerator / denominator)"""
+    return lambda rng, size, columns: np.trunc(columns[numerator] / columns[denominator]).astype(np.int64)
+
+
+def choice(*options: Any) -> Column:
+    """random.choice(options); значения берутся как есть (в том числе None)"""
+    values = objects(list(options))
+    return lambda rng, size, columns: values[rng.integers(len(values), size=size)]
+
+
+def flags(probability: float = 0.5) -> Column:
+    """True с вероятностью probability (random.choice([True, False]) при 0.5)"""
+    return lambda rng, size, columns: rng.random(size) < probability
+
+
+def const(value: Any) -> Column:
+    def column(rng: np.random.Generator, size: int, columns: Columns) -> np.ndarray:
+        values = np.empty(size, dtype=object)
+        values.fill(value)
+        return values
+
+    return column
+
+
+def labeled(template: str, low: int, high: int) -> Column:
+    """template.format(random.randint(low, high)), например "SN{}" """
+
+    def column(rng: np.random.Generator, size: int, columns: Columns) -> np.ndarray:
+        return objects(list(map(template.format, rng.integers(low, high + 1, size).tolist())))
+
+    return column
+
+
+def when(flag: str, column: Column, otherwise: Any = 0) -> Column:
+    """Значение column там, где поле flag истинно, иначе otherwise"""
+
+    def masked(rng: np.random.Generator, size: int, columns: Columns) -> np.ndarray:
+        values = objects(column(rng, size, columns).tolist())
+        values[~columns[flag].astype(bool)] = otherwise
+        return values
+
+    return masked
+
+
+def optional(flag: str, value: Any) -> Column:
+    """value там, где поле flag истинно; в остальных записях ключа нет"""
+    return when(flag, const(value), ABSENT)
+
+
+def codes(alphabet: str, length: int) -> Column:
+    """Строки из length символов alphabet (ASCII), например VIN"""
+    table = np.frombuffer(alphabet.encode("ascii"), dtype=np.uint8)
+
+    def column(rng: np.random.Generator, size: int, columns: Columns) -> np.ndarray:
+        chars = table[rng.integers(len(table), size=(size, length))]
+        return np.ascontiguousarray(chars).view(f"S{length}").ravel().astype(str)
+
+    return column
+
+
+def iso_dates(start: datetime, end: datetime) -> Column:
+    """start + случайное число дней до end включительно, в isoformat()"""
+    values = objects([(start + timedelta(days=offset)).isoformat() for offset in range((end - start).days + 1)])
+    return lambda rng, size, columns: values[rng.integers(len(values), size=size)]
+
+
+def build_columns(spec: Mapping[str, Column], rng: np.random.Generator, size: int) -> Columns:
+    columns: Columns = {}
+    for name, column in spec.items():
+        columns[name] = column(rng, size, columns)
+    return columns
+
+
+def build_rows(spec: Mapping[str, Column], rng: np.random.Generator, size: int) -> List[Dict[str, Any]]:
+    """size записей по спецификации; ключи со значением ABSENT опускаются"""
+    columns = build_columns(spec, rng, size)
+    names = list(spec)
+    rows = [dict(zip(names, row)) for row in zip(*(columns[name].tolist() for name in names))]
+    for name in names:
+        column = columns[name]
+        if column.dtype == object:
+            for i in np.flatnonzero(column == ABSENT).tolist():
+                del rows[i][name]
+    return rows
@@ -2,19 +2,30 @@
 Генерация демо-данных для раздела "Залоговые заключения"
 """
 
+import argparse
 import json
 import random
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from record_specs import Context, Field, choice, compile_record, const, let, randint, ref
 
 OUTPUT_FILE = Path("public/collateralConclusionsData.json")
+BATCH_SIZE = 10_000
 
 # Типы заключений
 CONCLUSION_TYPES = ["Первичное", "Повторное", "Дополнительное", "Переоценка"]
 
 # Статусы
 STATUSES = ["Черновик", "На согласовании", "Согласовано", "Отклонено", "Аннулировано"]
+DECIDED_STATUSES = ("Согласовано", "Отклонено")  # у таких есть согласующий и дата согласования
+STATUS_COLORS = {
+    "Согласовано": "green",
+    "На согласовании": "blue",
+    "Отклонено": "red",
+    "Аннулировано": "red",
+}
 
 # Уровни риска
 RISK_LEVELS = ["Низкий", "Средний", "Высокий", "Критический"]
@@ -85,6 +96,16 @@ RECOMMENDATIONS = [
     "Требуется проведение дополнительной экспертизы для оценки рисков.",
 ]
 
+# Отлагательные условия
+SUSPENSIVE_CONDITIONS = [
+    "согласования ДЗ/ДИ",
+    "предоставления КП",
+    "подтверждения права собственности",
+]
+
+# Типы расчетов
+CALCULATION_TYPES = ["Расчет ком.пом.", "Расчет АЗС", "Расчет движимое (ЗП)"]
+
 AUTHORS = [
     "Иванов И.И.",
     "Петрова А.В.",
@@ -111,9 +132,9 @@ def random_date(start_date: datetime, end_date: datetime) -> str:
     return random_date_obj.strftime("%Y-%m-%d")
 
 
-def generate_conclusion_number(index: int) -> str:
+def generate_conclusion_number(index: int, year: Optional[int] = None) -> str:
     """Генерация номера заключения"""
-    year = datetime.now().year
+    year = year or datetime.now().year
     return f"ЗК-{year}-{str(index).zfill(6)}"
 
 
@@ -129,368 +150,495 @@ def load_portfolio_data() -> List[Dict[str, Any]]:
     return []
 
 
-def generate_conclusions(count: int = 50) -> List[Dict[str, Any]]:
-    """Генерация списка заключений"""
-    portfolio = load_portfolio_data()
-    conclusions: List[Dict[str, Any]] = []
+def deal_fields(deal: Dict[str, Any]) -> Tuple[Any, ...]:
+    """Поля сделки для заключения (reference, договор, залогодатель, ..., стоимости)"""
+    reference = str(deal.get("reference") or deal.get("contractNumber") or "")
+    collateral_value_raw = deal.get("collateralValue") or deal.get("marketValue")
+    market_value_raw = deal.get("currentMarketValue") or deal.get("marketValue")
+    # Преобразуем в числа
+    try:
+        collateral_value = float(collateral_value_raw) if collateral_value_raw else None
+        market_value = float(market_value_raw) if market_value_raw else None
+    except (ValueError, TypeError):
+        collateral_value = None
+        market_value = None
+    return (
+        reference,
+        deal.get("contractNumber"),
+        deal.get("pledger"),
+        deal.get("inn"),
+        deal.get("borrower"),
+        deal.get("collateralType"),
+        deal.get("collateralLocation"),
+        collateral_value,
+        market_value,
+    )
+
+
+class ConclusionDates:
+    """
+    Даты заключения — номер дня от start_date. Строки всех дат окна (с запасом
+    на смещения от даты заключения) форматируются один раз, и random_date
+    относительно даты заключения сводится к сложению индексов.
+    """
+
+    BEFORE = 365  # самое раннее смещение от даты заключения, дней
+    AFTER = 10  # самое позднее
+
+    def __init__(self, start_date: datetime, end_date: datetime) -> None:
+        self.window = (end_date - start_date).days
+        origin = start_date - timedelta(days=self.BEFORE)
+        self.texts = [
+            (origin + timedelta(days=offset)).strftime("%Y-%m-%d")
+            for offset in range(self.BEFORE + self.window + self.AFTER)
+        ]
+
+    def conclusion_day(self) -> int:
+        """Как random_date(start_date, end_date), но номер дня вместо строки"""
+        return random.randrange(self.window)
+
+    def text(self, day: int) -> str:
+        return self.texts[self.BEFORE + day]
+
+    def between(self, day: int, first: int, last: int) -> str:
+        """random_date(дата заключения + first дней, дата заключения + last дней)"""
+        return self.texts[self.BEFORE + day + first + random.randrange(last - first)]
+
+
+def demo_deal() -> Tuple[Any, ...]:
+    """Демо-сделка в том же виде, что deal_fields"""
+    reference = f"REF-{random.randint(1000, 9999)}"
+    contract_number = f"ДОГ-{random.randint(10000, 99999)}"
+    pledger = f"ООО 'Компания {random.randint(1, 100)}'"
+    pledger_inn = f"{random.randint(1000000000, 9999999999)}"
+    borrower = f"ИП Иванов Иван Иванович"
+    collateral_type = random.choice(COLLATERAL_TYPES)
+    collateral_location = random.choice(["г. Москва", "г. Санкт-Петербург", "г. Новосибирск", "г. Екатеринбург"])
+    collateral_value = float(random.randint(1000000, 50000000))
+    market_value = float(int(collateral_value * random.uniform(0.8, 1.2)))
+    return (
+        reference, contract_number, pledger, pledger_inn, borrower,
+        collateral_type, collateral_location, collateral_value, market_value,
+    )
+
+
+def demo_photos(i: int, count: int) -> List[Dict[str, Any]]:
+    """Фото (демо): первые два — фасадные"""
+    return [
+        {
+            "id": f"photo-{i}-{j}",
+            "url": f"https://via.placeholder.com/400x300?text=Photo+{j}",
+            "description": f"Фото {j} - {'фасадное' if j <= 2 else 'внутреннее'}",
+            "isMain": j <= 2,
+        }
+        for j in range(1, count + 1)
+    ]
+
+
+def demo_calculations(i: int, result: Any) -> List[Dict[str, Any]]:
+    """Один-два расчета случайных типов"""
+    return [
+        {
+            "id": f"calc-{i}-{calc_type}",
+            "type": calc_type,
+            "data": {
+                "Исходные данные": "Демо данные",
+                "Результат": result,
+                "Метод": "Сравнительный",
+            },
+        }
+        for calc_type in random.sample(CALCULATION_TYPES, random.randint(1, 2))
+    ]
+
+
+# Шаблоны записей (см. record_specs): поля в порядке обращений к random
+
+SUSPENSIVE_CONDITION_FIELDS = [
+    Field("id", lambda c: f"cond-{c['i']}-{c['j']}"),
+    Field("number", ref("j")),
+    Field("description", lambda c: f"Условие {c['j']}"),
+    Field("suspensiveCondition", choice(SUSPENSIVE_CONDITIONS), 0.5),
+    Field("additionalCondition", lambda c: f"Дополнительное условие {c['j']}", 0.5),
+]
+
+suspensive_condition_record = compile_record(SUSPENSIVE_CONDITION_FIELDS)
+
+
+def object_cadastral(c: Context) -> str:
+    return f"{random.randint(77, 99)}:{random.randint(1, 99)}:{random.randint(1000000, 9999999)}:{random.randint(1, 9999)}"
+
+
+def registration_record(c: Context) -> str:
+    return (
+        f"Запись № {random.randint(100000, 999999)}-{random.randint(1, 99)}/{random.randint(2000, 2024)}-"
+        f"{random.randint(1, 10)} от {c['dates'].between(c['day'], -180, 0)}"
+    )
+
+
+def registration_document(c: Context) -> str:
+    return (
+        "Выписка из Единого государственного реестра недвижимости об объекте недвижимости "
+        f"№ {random.randint(99, 999)}/{random.randint(2020, 2024)}/{random.randint(100000000, 999999999)}"
+    )
+
+
+def collateral_description(c: Context) -> str:
+    return (
+        f"Предлагаемое в залог имущество расположено в {c['collateral_location']}, "
+        f"состояние имущества {c['collateral_condition'] if c['collateral_condition'] else 'хорошее'}, "
+        f"перепланировки {'выявлены' if c['has_replanning'] else 'не выявлены'}."
+    )
+
+
+def special_opinion(c: Context) -> str:
+    condition = "внесения в ЕГРН сведений о кадастровых номерах" if c["land_cadastral"] else "подтверждения права собственности"
+    return (
+        f"Возможно рассмотреть в качестве залога при условии {condition}. "
+        f"Уровень ликвидности объекта: {random.choice(LIQUIDITY_OPTIONS)}. "
+        f"{'Требуется снятие обременений.' if c['has_encumbrances'] else ''}"
+    )
+
+
+def fair_value(c: Context) -> int:
+    return int(float(c["market_value"]) * random.uniform(0.9, 1.0))
+
+
+def is_nonresidential(c: Context) -> bool:
+    return bool(c["is_real_estate"] and c["collateral_type"] and "нежилая" in str(c["collateral_type"]).lower())
+
+
+def is_transport(c: Context) -> bool:
+    return bool(c["collateral_type"] and "транспорт" in str(c["collateral_type"]).lower())
+
+
+DETAILED_DESCRIPTION_FIELDS = [
+    let("obj_area", randint(20, 200), when="is_real_estate"),
+    let("obj_cadastral", object_cadastral, 0.5, when="is_real_estate"),
+    Field("id", lambda c: f"desc-{c['i']}-{c['j']}"),
+    Field("objectNumber", ref("j")),
+    Field("objectName", lambda c: f"{c['collateral_type']} - объект {c['j']}"),
+    Field("objectType", ref("collateral_type")),
+    Field("cadastralNumber", ref("obj_cadastral")),
+    Field("address", lambda c: f"{c['collateral_location']}, объект {c['j']}"),
+    Field("areaSqm", ref("obj_area")),
+    Field("areaHectares", lambda c: round(c["obj_area"] / 100, 2), 0.3, when="obj_area"),
+    Field("floor", lambda c: f"{random.randint(1, 10)} этаж", 0.5, when="is_real_estate"),
+    Field("floorsCount", randint(1, 10), 0.5, when="is_real_estate"),
+    Field("undergroundFloors", randint(0, 2), 0.3, when="is_real_estate"),
+    Field("purpose", ref("collateral_type")),
+    Field("condition", lambda c: c["collateral_condition"] or "хорошее"),
+    Field("material", choice(["Кирпич", "Бетон", "Металл"]), 0.5, when="is_real_estate"),
+    Field("yearBuilt", randint(1990, 2020), 0.5),
+    Field("yearCommissioned", randint(1990, 2020), 0.5),
+    Field(
+        "marketValue",
+        lambda c: int(float(c["market_value"]) / c["objects_count"]),
+        when=lambda c: c["market_value"] and c["objects_count"],
+    ),
+    Field(
+        "collateralValue",
+        lambda c: int(float(c["collateral_value"]) / c["objects_count"]),
+        when=lambda c: c["collateral_value"] and c["objects_count"],
+    ),
+    Field("ownershipShare", ref("ownership_share")),
+    Field("ownershipBasis", ref("ownership_basis")),
+    Field("registrationRecord", ref("registration_record"), 0.5),
+    Field("encumbrances", lambda c: "Не выявлены" if not c["has_encumbrances"] else "Имеются обременения"),
+    Field("replanning", ref("replanning_description")),
+    Field("description", lambda c: f"Детальное описание объекта {c['j']}: {c['collateral_description'] or 'Описание отсутствует'}"),
+]
+
+detailed_description_record = compile_record(DETAILED_DESCRIPTION_FIELDS)
+
+REVIEW_FIELDS = [
+    Field("id", lambda c: f"review-{c['i']}"),
+    Field("reviewer", choice(AUTHORS)),
+    Field("reviewDate", lambda c: c["dates"].between(c["day"], 0, 10)),
+    Field("reviewText", const("Рецензия проведена. Заключение соответствует требованиям.")),
+    Field("conclusion", const("Одобрено")),
+]
+
+review_record = compile_record(REVIEW_FIELDS)
+
+# Характеристики нежилой недвижимости; ключи со значением None не пишутся
+ADDITIONAL_DATA_FIELDS = [
+    Field("totalAreaSqm", ref("total_area_sqm")),
+    Field("collateralLocation", ref("collateral_location")),
+    Field("landCategory", ref("land_category")),
+    Field("landPermittedUse", ref("land_permitted_use")),
+    Field("landCadastralNumber", ref("land_cadastral")),
+    Field("hasEncumbrances", ref("has_encumbrances")),
+    Field("ownershipShare", lambda c: f"{c['ownership_share']}/100", when="ownership_share"),
+    Field("marketValue", ref("market_value")),
+    Field("collateralValue", ref("collateral_value")),
+    Field("fairValue", fair_value, when="market_value"),
+    Field("category", choice(CATEGORIES), 0.7),
+    Field("collateralCondition", ref("collateral_condition")),
+    Field("wallMaterial", choice(["Деревянные", "Кирпич", "Кирпичный/Сталинский", "Монолит/Монолит-кирпич", "Панельный/блочный"]), 0.5),
+    Field("ceilingMaterial", choice(["Деревянные балки", "Металлические балки", "ж/б"]), 0.5),
+    Field("finishLevel", choice(["Евроремонт", "Простая", "Среднее", "Улучшенная"]), 0.5),
+    Field("finishCondition", choice(["Хорошее", "Удовлетворительное", "Требуется косметический ремонт"]), 0.5),
+    Field("replanning", choice(["Несущественные", "Перепланировки отсутствуют", "Существенные"]), 0.5),
+    Field("ownershipRight", choice(["Право собственности", "Право аренды", "Иное"]), 0.5),
+]
+
+additional_data_record = compile_record(ADDITIONAL_DATA_FIELDS, skip_none=True)
+
+
+def suspensive_conditions(c: Context) -> List[Dict[str, Any]]:
+    return [suspensive_condition_record({"i": c["i"], "j": j}) for j in range(1, random.randint(2, 5))]
+
+
+def detailed_descriptions(c: Context) -> List[Dict[str, Any]]:
+    # Описание объекта читает поля заключения, поэтому получает копию его контекста
+    return [detailed_description_record(dict(c, j=j)) for j in range(1, min(c["objects_count"] + 1, 6))]
+
+
+CONCLUSION_FIELDS = [
+    # Случайная сделка из портфеля (70%) или демо-данные
+    let("linked", const(True), 0.7, when="deals", otherwise=False),
+    let(
+        (
+            "reference", "contract_number", "pledger", "pledger_inn", "borrower",
+            "collateral_type", "collateral_location", "collateral_value", "market_value",
+        ),
+        lambda c: random.choice(c["deals"]) if c["linked"] else demo_deal(),
+    ),
+    let("day", lambda c: c["dates"].conclusion_day()),
+    let("conclusion_date", lambda c: c["dates"].text(c["day"])),
+    let("author_date", lambda c: c["dates"].between(c["day"], -7, 0)),
+    let("status", choice(STATUSES)),
+    let("approved", lambda c: c["status"] in DECIDED_STATUSES),
+    let("approver", choice(APPROVERS), when="approved"),
+    let("approval_date", lambda c: c["dates"].between(c["day"], 0, 5), when="approved"),
+    let("is_real_estate", lambda c: "недвижимость" in str(c["collateral_type"]).lower(), when="collateral_type", otherwise=False),
+    # Кредит
+    let("credit_product", choice(CREDIT_PRODUCTS), 0.7),
+    let("credit_amount", ref("collateral_value"), when="credit_product"),
+    let("credit_term", randint(12, 60), when="credit_product"),
+    # Площадь и количество объектов
+    let("total_area_sqm", randint(50, 500), when="is_real_estate"),
+    let("total_area_hectares", lambda c: round(random.uniform(0.1, 5.0), 2), 0.3, when="is_real_estate"),
+    let("objects_count", randint(1, 10), 0.5),
+    let("ownership_share", choice([25, 50, 75, 100]), 0.4),
+    # Земельный участок (для недвижимости)
+    let("has_land", const(True), 0.6, when="is_real_estate", otherwise=False),
+    let("land_cadastral", lambda c: f"77:08:{random.randint(1000000, 9999999)}:{random.randint(1, 9999)}", when="has_land"),
+    let("land_category", choice(LAND_CATEGORIES), when="has_land"),
+    let("land_permitted_use", choice(PERMITTED_USES), when="has_land"),
+    let(
+        "land_area_sqm",
+        lambda c: int(c["total_area_sqm"] * random.uniform(1.5, 3.0)),
+        when=lambda c: c["has_land"] and c["total_area_sqm"],
+    ),
+    # Состояние и описание
+    let("collateral_condition", choice(CONDITIONS), 0.7),
+    let("has_replanning", choice([True, False]), 0.5),
+    let("replanning_found", const("Выявлены несущественные перепланировки"), 0.5, when="has_replanning"),
+    let("replanning_description", lambda c: c["replanning_found"] if c["has_replanning"] else "Перепланировки не выявлены"),
+    let("land_functional_provision", choice(["функционально обеспечивает", "не обеспечивает"]), 0.4, when="is_real_estate"),
+    let("collateral_description", collateral_description, 0.8),
+    # Обременения
+    let("has_encumbrances", choice([True, False]), 0.4),
+    let("encumbrances_description", const("Имеются зарегистрированные обременения. Требуется снятие обременений."), when="has_encumbrances"),
+    let(
+        "encumbrances_details",
+        const("Обременения не выявлены, имеются ограничения прав на часть земельного участка."),
+        0.5,
+        when="has_encumbrances",
+    ),
+    # Права на объект
+    let("ownership_basis", choice(["Право собственности", "Право аренды", "Право пользования земельным участком"]), 0.6),
+    let(
+        "ownership_documents",
+        lambda c: f"Договор купли-продажи от {c['dates'].between(c['day'], -365, 0)}",
+        0.5,
+        when="ownership_basis",
+    ),
+    let("registration_record", registration_record, 0.5),
+    let("registration_document", registration_document, 0.4),
+    # Проверки
+    let("bankruptcy_check_date", lambda c: c["dates"].between(c["day"], -30, 0), 0.5),
+    let("bankruptcy_check_result", const("Признаков банкротства не выявлено"), 0.7, when="bankruptcy_check_date"),
+    let("inspection_date", lambda c: c["dates"].between(c["day"], -14, -1), 0.7),
+    let("inspector_name", choice(AUTHORS), when="inspection_date"),
+    let("special_opinion", special_opinion, 0.7),
+    # Вложенные списки и рецензия
+    let("suspensive_conditions", suspensive_conditions, 0.5, otherwise=[]),
+    let("detailed_descriptions", detailed_descriptions, 0.4, when=lambda c: c["objects_count"] and c["objects_count"] > 1, otherwise=[]),
+    let("photos", lambda c: demo_photos(c["i"], random.randint(2, 5)), 0.5, otherwise=[]),
+    let("review", lambda c: review_record({"i": c["i"], "dates": c["dates"], "day": c["day"]}), 0.3),
+    let("calculations", lambda c: demo_calculations(c["i"], c["market_value"] or c["collateral_value"]), 0.4, otherwise=[]),
+    let("additional_data", lambda c: additional_data_record(dict(c)), when=is_nonresidential, otherwise={}),
+    # Запись
+    Field("id", lambda c: f"conclusion-{c['i']}"),
+    Field("conclusionNumber", lambda c: generate_conclusion_number(c["i"], c["year"])),
+    Field("conclusionDate", ref("conclusion_date")),
+    Field("reference", lambda c: c["reference"] or None),
+    Field("contractNumber", ref("contract_number")),
+    Field("pledger", ref("pledger")),
+    Field("pledgerInn", ref("pledger_inn")),
+    Field("borrower", ref("borrower")),
+    Field("borrowerInn", lambda c: f"{random.randint(1000000000, 9999999999)}", 0.5),
+    Field("creditProduct", ref("credit_product")),
+    Field("creditAmount", ref("credit_amount")),
+    Field("creditTermMonths", ref("credit_term")),
+    Field("collateralType", ref("collateral_type")),
+    Field("collateralName", lambda c: f"{c['collateral_type']} - объект {c['i']}", 0.5),
+    Field("collateralPurpose", lambda c: f"Использование в качестве {c['collateral_type'].lower()}", 0.5),
+    Field("totalAreaSqm", ref("total_area_sqm")),
+    Field("totalAreaHectares", ref("total_area_hectares")),
+    Field("collateralLocation", ref("collateral_location")),
+    Field("objectsCount", ref("objects_count")),
+    Field("ownershipShare", ref("ownership_share")),
+    Field("landCategory", ref("land_category")),
+    Field("landPermittedUse", ref("land_permitted_use")),
+    Field("landCadastralNumber", ref("land_cadastral")),
+    Field("landAreaSqm", ref("land_area_sqm")),
+    Field("marketValue", ref("market_value")),
+    Field("collateralValue", ref("collateral_value")),
+    Field("fairValue", fair_value, when="market_value"),
+    Field("category", choice(CATEGORIES), 0.7),
+    Field("liquidity", choice(LIQUIDITY_OPTIONS), 0.7),
+    Field("liquidityFairValue", choice(LIQUIDITY_OPTIONS), 0.5),
+    Field("collateralDescription", ref("collateral_description")),
+    Field("collateralCondition", ref("collateral_condition")),
+    Field("hasReplanning", ref("has_replanning")),
+    Field("replanningDescription", ref("replanning_description")),
+    Field("landFunctionalProvision", ref("land_functional_provision")),
+    Field("hasEncumbrances", ref("has_encumbrances")),
+    Field("encumbrancesDescription", ref("encumbrances_description")),
+    Field("encumbrancesDetails", ref("encumbrances_details")),
+    Field("ownershipBasis", ref("ownership_basis")),
+    Field("ownershipDocuments", ref("ownership_documents")),
+    Field("registrationRecord", ref("registration_record")),
+    Field("registrationDocument", ref("registration_document")),
+    Field("inspectionDate", ref("inspection_date")),
+    Field("inspectorName", ref("inspector_name")),
+    Field("bankruptcyCheckDate", ref("bankruptcy_check_date")),
+    Field("bankruptcyCheckResult", ref("bankruptcy_check_result")),
+    Field("specialOpinion", ref("special_opinion")),
+    Field("creditContractNumber", lambda c: f"КРД-{random.randint(10000, 99999)}", 0.5, when="credit_product"),
+    Field("cadastralValue", lambda c: int(c["market_value"] * random.uniform(0.7, 0.9)), 0.5, when="market_value"),
+    Field(
+        "marketValuePerSqm",
+        lambda c: int(c["market_value"] / c["total_area_sqm"]),
+        0.5,
+        when=lambda c: c["market_value"] and c["total_area_sqm"],
+    ),
+    Field(
+        "marketValuePerHectare",
+        lambda c: int(c["market_value"] / c["total_area_hectares"]),
+        0.5,
+        when=lambda c: c["market_value"] and c["total_area_hectares"],
+    ),
+    Field("liquidityMovable", choice(LIQUIDITY_OPTIONS), 0.5, when=is_transport),
+    Field("suspensiveConditions", lambda c: c["suspensive_conditions"] or None),
+    Field("detailedDescriptions", lambda c: c["detailed_descriptions"] or None),
+    Field("photos", lambda c: c["photos"] or None),
+    Field("review", ref("review")),
+    Field("calculations", lambda c: c["calculations"] or None),
+    Field("additionalData", lambda c: c["additional_data"] or None),
+    Field("conclusionType", choice(CONCLUSION_TYPES)),
+    Field("status", ref("status")),
+    Field("statusColor", lambda c: STATUS_COLORS.get(c["status"])),
+    Field("author", choice(AUTHORS)),
+    Field("authorDate", ref("author_date")),
+    Field("approver", ref("approver")),
+    Field("approvalDate", ref("approval_date")),
+    Field("conclusionText", choice(CONCLUSION_TEXTS)),
+    Field("recommendations", choice(RECOMMENDATIONS), 0.7),
+    Field("riskLevel", choice(RISK_LEVELS), 0.8),
+    Field("notes", lambda c: f"Примечание к заключению {c['i']}", 0.5),
+]
+
+conclusion_record = compile_record(CONCLUSION_FIELDS)
+
+
+def build_conclusion(i: int, deals: List[Tuple[Any, ...]], dates: ConclusionDates, year: int) -> Dict[str, Any]:
+    """Заключение №i; deals — deal_fields сделок портфеля"""
+    return conclusion_record({"i": i, "deals": deals, "dates": dates, "year": year})
+
+
+def iter_conclusion_batches(
+    count: int, portfolio: Optional[List[Dict[str, Any]]] = None, batch_size: int = BATCH_SIZE
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Заключения пачками по batch_size. Сделки разбираются один раз, даты — по
+    таблице ConclusionDates; случайные значения берутся в том же порядке, что и
+    при построчной генерации, поэтому при одном seed результат совпадает.
+    """
+    if portfolio is None:
+        portfolio = load_portfolio_data()
+    deals = [deal_fields(deal) for deal in portfolio]
     
     start_date = datetime.now() - timedelta(days=365)
     end_date = datetime.now()
+    dates = ConclusionDates(start_date, end_date)
+    year = datetime.now().year
     
-    for i in range(1, count + 1):
-        # Выбираем случайную сделку из портфеля или создаем демо-данные
-        if portfolio and random.random() > 0.3:  # 70% связаны с реальными сделками
-            deal = random.choice(portfolio)
-            reference = str(deal.get("reference") or deal.get("contractNumber") or "")
-            contract_number = deal.get("contractNumber")
-            pledger = deal.get("pledger")
-            pledger_inn = deal.get("inn")
-            borrower = deal.get("borrower")
-            collateral_type = deal.get("collateralType")
-            collateral_location = deal.get("collateralLocation")
-            collateral_value_raw = deal.get("collateralValue") or deal.get("marketValue")
-            market_value_raw = deal.get("currentMarketValue") or deal.get("marketValue")
-            # Преобразуем в числа
-            try:
-                collateral_value = float(collateral_value_raw) if collateral_value_raw else None
-                market_value = float(market_value_raw) if market_value_raw else None
-            except (ValueError, TypeError):
-                collateral_value = None
-                market_value = None
-        else:
-            reference = f"REF-{random.randint(1000, 9999)}"
-            contract_number = f"ДОГ-{random.randint(10000, 99999)}"
-            pledger = f"ООО 'Компания {random.randint(1, 100)}'"
-            pledger_inn = f"{random.randint(1000000000, 9999999999)}"
-            borrower = f"ИП Иванов Иван Иванович"
-            collateral_type = random.choice(COLLATERAL_TYPES)
-            collateral_location = random.choice(["г. Москва", "г. Санкт-Петербург", "г. Новосибирск", "г. Екатеринбург"])
-            collateral_value = float(random.randint(1000000, 50000000))
-            market_value = float(int(collateral_value * random.uniform(0.8, 1.2)))
-        
-        conclusion_date = random_date(start_date, end_date)
-        author_date = random_date(
-            datetime.strptime(conclusion_date, "%Y-%m-%d") - timedelta(days=7),
-            datetime.strptime(conclusion_date, "%Y-%m-%d")
-        )
-        
-        status = random.choice(STATUSES)
-        approver = None
-        approval_date = None
-        if status in ["Согласовано", "Отклонено"]:
-            approver = random.choice(APPROVERS)
-            approval_date = random_date(
-                datetime.strptime(conclusion_date, "%Y-%m-%d"),
-                datetime.strptime(conclusion_date, "%Y-%m-%d") + timedelta(days=5)
-            )
-        
-        # Определяем тип имущества для дополнительных полей
-        is_real_estate = "недвижимость" in str(collateral_type).lower() if collateral_type else False
-        
-        # Генерируем дополнительные поля
-        credit_product = random.choice(CREDIT_PRODUCTS) if random.random() > 0.3 else None
-        credit_amount = collateral_value if credit_product else None
-        credit_term = random.randint(12, 60) if credit_product else None
-        
-        # Площадь и количество объектов
-        total_area_sqm = random.randint(50, 500) if is_real_estate else None
-        total_area_hectares = round(random.uniform(0.1, 5.0), 2) if is_real_estate and random.random() > 0.7 else None
-        objects_count = random.randint(1, 10) if random.random() > 0.5 else None
-        ownership_share = random.choice([25, 50, 75, 100]) if random.random() > 0.6 else None
-        
-        # Земельный участок (для недвижимости)
-        land_cadastral = None
-        land_category = None
-        land_permitted_use = None
-        land_area_sqm = None
-        if is_real_estate and random.random() > 0.4:
-            land_cadastral = f"77:08:{random.randint(1000000, 9999999)}:{random.randint(1, 9999)}"
-            land_category = random.choice(LAND_CATEGORIES)
-            land_permitted_use = random.choice(PERMITTED_USES)
-            land_area_sqm = int(total_area_sqm * random.uniform(1.5, 3.0)) if total_area_sqm else None
-        
-        # Состояние и описание
-        collateral_condition = random.choice(CONDITIONS) if random.random() > 0.3 else None
-        has_replanning = random.choice([True, False]) if random.random() > 0.5 else None
-        replanning_description = (
-            "Выявлены несущественные перепланировки" if has_replanning and random.random() > 0.5
-            else "Перепланировки не выявлены" if not has_replanning
-            else None
-        )
-        land_functional_provision = random.choice([
-            "функционально обеспечивает",
-            "не обеспечивает"
-        ]) if is_real_estate and random.random() > 0.6 else None
-        
-        collateral_description = (
-            f"Предлагаемое в залог имущество расположено в {collateral_location}, "
-            f"состояние имущества {collateral_condition if collateral_condition else 'хорошее'}, "
-            f"перепланировки {'выявлены' if has_replanning else 'не выявлены'}."
-        ) if random.random() > 0.2 else None
-        
-        # Обременения
-        has_encumbrances = random.choice([True, False]) if random.random() > 0.6 else None
-        encumbrances_description = (
-            "Имеются зарегистрированные обременения. Требуется снятие обременений."
-        ) if has_encumbrances else None
-        encumbrances_details = (
-            "Обременения не выявлены, имеются ограничения прав на часть земельного участка."
-        ) if has_encumbrances and random.random() > 0.5 else None
-        
-        # Права на объект
-        ownership_basis = random.choice([
-            "Право собственности",
-            "Право аренды",
-            "Право пользования земельным участком"
-        ]) if random.random() > 0.4 else None
-        ownership_documents = (
-            f"Договор купли-продажи от {random_date(datetime.strptime(conclusion_date, "%Y-%m-%d") - timedelta(days=365), datetime.strptime(conclusion_date, "%Y-%m-%d"))}"
-        ) if ownership_basis and random.random() > 0.5 else None
-        registration_record = (
-            f"Запись № {random.randint(100000, 999999)}-{random.randint(1, 99)}/{random.randint(2000, 2024)}-{random.randint(1, 10)} от {random_date(datetime.strptime(conclusion_date, "%Y-%m-%d") - timedelta(days=180), datetime.strptime(conclusion_date, "%Y-%m-%d"))}"
-        ) if random.random() > 0.5 else None
-        registration_document = (
-            f"Выписка из Единого государственного реестра недвижимости об объекте недвижимости № {random.randint(99, 999)}/{random.randint(2020, 2024)}/{random.randint(100000000, 999999999)}"
-        ) if random.random() > 0.6 else None
-        
-        # Проверка на банкротство
-        bankruptcy_check_date = random_date(
-            datetime.strptime(conclusion_date, "%Y-%m-%d") - timedelta(days=30),
-            datetime.strptime(conclusion_date, "%Y-%m-%d")
-        ) if random.random() > 0.5 else None
-        bankruptcy_check_result = (
-            "Признаков банкротства не выявлено"
-        ) if bankruptcy_check_date and random.random() > 0.3 else None
-        
-        # Проверка
-        inspection_date = random_date(
-            datetime.strptime(conclusion_date, "%Y-%m-%d") - timedelta(days=14),
-            datetime.strptime(conclusion_date, "%Y-%m-%d") - timedelta(days=1)
-        ) if random.random() > 0.3 else None
-        inspector_name = random.choice(AUTHORS) if inspection_date else None
-        
-        # Особое мнение
-        special_opinion = (
-            f"Возможно рассмотреть в качестве залога при условии {'внесения в ЕГРН сведений о кадастровых номерах' if land_cadastral else 'подтверждения права собственности'}. "
-            f"Уровень ликвидности объекта: {random.choice(LIQUIDITY_OPTIONS)}. "
-            f"{'Требуется снятие обременений.' if has_encumbrances else ''}"
-        ) if random.random() > 0.3 else None
-        
-        # Отлагательные условия
-        suspensive_conditions = []
-        if random.random() > 0.5:
-            for j in range(1, random.randint(2, 5)):
-                suspensive_conditions.append({
-                    "id": f"cond-{i}-{j}",
-                    "number": j,
-                    "description": f"Условие {j}",
-                    "suspensiveCondition": random.choice([
-                        "согласования ДЗ/ДИ",
-                        "предоставления КП",
-                        "подтверждения права собственности",
-                    ]) if random.random() > 0.5 else None,
-                    "additionalCondition": f"Дополнительное условие {j}" if random.random() > 0.5 else None,
-                })
-        
-        # Детальное описание (для некоторых типов)
-        detailed_descriptions = []
-        if objects_count and objects_count > 1 and random.random() > 0.6:
-            for j in range(1, min(objects_count + 1, 6)):
-                obj_area = random.randint(20, 200) if is_real_estate else None
-                obj_cadastral = f"{random.randint(77, 99)}:{random.randint(1, 99)}:{random.randint(1000000, 9999999)}:{random.randint(1, 9999)}" if is_real_estate and random.random() > 0.5 else None
-                obj_market_value = int((float(market_value) if market_value else 0) / objects_count) if market_value and objects_count else None
-                obj_collateral_value = int((float(collateral_value) if collateral_value else 0) / objects_count) if collateral_value and objects_count else None
-                
-                detailed_descriptions.append({
-                    "id": f"desc-{i}-{j}",
-                    "objectNumber": j,
-                    "objectName": f"{collateral_type} - объект {j}",
-                    "objectType": collateral_type,
-                    "cadastralNumber": obj_cadastral,
-                    "address": f"{collateral_location}, объект {j}",
-                    "areaSqm": obj_area,
-                    "areaHectares": round((obj_area or 0) / 100, 2) if obj_area and random.random() > 0.7 else None,
-                    "floor": f"{random.randint(1, 10)} этаж" if is_real_estate and random.random() > 0.5 else None,
-                    "floorsCount": random.randint(1, 10) if is_real_estate and random.random() > 0.5 else None,
-                    "undergroundFloors": random.randint(0, 2) if is_real_estate and random.random() > 0.7 else None,
-                    "purpose": collateral_type,
-                    "condition": collateral_condition or "хорошее",
-                    "material": random.choice(["Кирпич", "Бетон", "Металл"]) if is_real_estate and random.random() > 0.5 else None,
-                    "yearBuilt": random.randint(1990, 2020) if random.random() > 0.5 else None,
-                    "yearCommissioned": random.randint(1990, 2020) if random.random() > 0.5 else None,
-                    "marketValue": obj_market_value,
-                    "collateralValue": obj_collateral_value,
-                    "ownershipShare": ownership_share,
-                    "ownershipBasis": ownership_basis,
-                    "registrationRecord": registration_record if random.random() > 0.5 else None,
-                    "encumbrances": "Не выявлены" if not has_encumbrances else "Имеются обременения",
-                    "replanning": replanning_description,
-                    "description": f"Детальное описание объекта {j}: {collateral_description or 'Описание отсутствует'}",
-                })
-        
-        # Фото (демо)
-        photos = []
-        if random.random() > 0.5:
-            photo_count = random.randint(2, 5)
-            for j in range(1, photo_count + 1):
-                photos.append({
-                    "id": f"photo-{i}-{j}",
-                    "url": f"https://via.placeholder.com/400x300?text=Photo+{j}",
-                    "description": f"Фото {j} - {'фасадное' if j <= 2 else 'внутреннее'}",
-                    "isMain": j <= 2,
-                })
-        
-        # Рецензия (для некоторых)
-        review = None
-        if random.random() > 0.7:
-            review = {
-                "id": f"review-{i}",
-                "reviewer": random.choice(AUTHORS),
-                "reviewDate": random_date(
-                    datetime.strptime(conclusion_date, "%Y-%m-%d"),
-                    datetime.strptime(conclusion_date, "%Y-%m-%d") + timedelta(days=10)
-                ),
-                "reviewText": "Рецензия проведена. Заключение соответствует требованиям.",
-                "conclusion": "Одобрено",
-            }
-        
-        # Расчеты (для некоторых типов)
-        calculations = []
-        if random.random() > 0.6:
-            calc_types = ["Расчет ком.пом.", "Расчет АЗС", "Расчет движимое (ЗП)"]
-            for calc_type in random.sample(calc_types, random.randint(1, 2)):
-                calculations.append({
-                    "id": f"calc-{i}-{calc_type}",
-                    "type": calc_type,
-                    "data": {
-                        "Исходные данные": "Демо данные",
-                        "Результат": market_value or collateral_value,
-                        "Метод": "Сравнительный",
-                    },
-                })
-        
-        # Формируем additionalData с характеристиками для нежилой недвижимости
-        additional_data: Dict[str, Any] = {}
-        if is_real_estate and collateral_type and "нежилая" in str(collateral_type).lower():
-            # Сохраняем характеристики в additionalData для нежилой недвижимости
-            additional_data = {
-                "totalAreaSqm": total_area_sqm,
-                "collateralLocation": collateral_location,
-                "landCategory": land_category,
-                "landPermittedUse": land_permitted_use,
-                "landCadastralNumber": land_cadastral,
-                "hasEncumbrances": has_encumbrances,
-                "ownershipShare": f"{ownership_share}/100" if ownership_share else None,
-                "marketValue": market_value,
-                "collateralValue": collateral_value,
-                "fairValue": int((float(market_value) if market_value else 0) * random.uniform(0.9, 1.0)) if market_value else None,
-                "category": random.choice(CATEGORIES) if random.random() > 0.3 else None,
-                "collateralCondition": collateral_condition,
-                "wallMaterial": random.choice(["Деревянные", "Кирпич", "Кирпичный/Сталинский", "Монолит/Монолит-кирпич", "Панельный/блочный"]) if random.random() > 0.5 else None,
-                "ceilingMaterial": random.choice(["Деревянные балки", "Металлические балки", "ж/б"]) if random.random() > 0.5 else None,
-                "finishLevel": random.choice(["Евроремонт", "Простая", "Среднее", "Улучшенная"]) if random.random() > 0.5 else None,
-                "finishCondition": random.choice(["Хорошее", "Удовлетворительное", "Требуется косметический ремонт"]) if random.random() > 0.5 else None,
-                "replanning": random.choice(["Несущественные", "Перепланировки отсутствуют", "Существенные"]) if random.random() > 0.5 else None,
-                "ownershipRight": random.choice(["Право собственности", "Право аренды", "Иное"]) if random.random() > 0.5 else None,
-            }
-            # Удаляем None значения
-            additional_data = {k: v for k, v in additional_data.items() if v is not None}
-        
-        conclusion: Dict[str, Any] = {
-            "id": f"conclusion-{i}",
-            "conclusionNumber": generate_conclusion_number(i),
-            "conclusionDate": conclusion_date,
-            "reference": reference if reference else None,
-            "contractNumber": contract_number,
-            "pledger": pledger,
-            "pledgerInn": pledger_inn,
-            "borrower": borrower,
-            "borrowerInn": f"{random.randint(1000000000, 9999999999)}" if random.random() > 0.5 else None,
-            "creditProduct": credit_product,
-            "creditAmount": credit_amount,
-            "creditTermMonths": credit_term,
-            "collateralType": collateral_type,
-            "collateralName": f"{collateral_type} - объект {i}" if random.random() > 0.5 else None,
-            "collateralPurpose": f"Использование в качестве {collateral_type.lower()}" if random.random() > 0.5 else None,
-            "totalAreaSqm": total_area_sqm,
-            "totalAreaHectares": total_area_hectares,
-            "collateralLocation": collateral_location,
-            "objectsCount": objects_count,
-            "ownershipShare": ownership_share,
-            "landCategory": land_category,
-            "landPermittedUse": land_permitted_use,
-            "landCadastralNumber": land_cadastral,
-            "landAreaSqm": land_area_sqm,
-            "marketValue": market_value,
-            "collateralValue": collateral_value,
-            "fairValue": int((float(market_value) if market_value else 0) * random.uniform(0.9, 1.0)) if market_value else None,
-            "category": random.choice(CATEGORIES) if random.random() > 0.3 else None,
-            "liquidity": random.choice(LIQUIDITY_OPTIONS) if random.random() > 0.3 else None,
-            "liquidityFairValue": random.choice(LIQUIDITY_OPTIONS) if random.random() > 0.5 else None,
-            "collateralDescription": collateral_description,
-            "collateralCondition": collateral_condition,
-            "hasReplanning": has_replanning,
-            "replanningDescription": replanning_description,
-            "landFunctionalProvision": land_functional_provision,
-            "hasEncumbrances": has_encumbrances,
-            "encumbrancesDescription": encumbrances_description,
-            "encumbrancesDetails": encumbrances_details,
-            "ownershipBasis": ownership_basis,
-            "ownershipDocuments": ownership_documents,
-            "registrationRecord": registration_record,
-            "registrationDocument": registration_document,
-            "inspectionDate": inspection_date,
-            "inspectorName": inspector_name,
-            "bankruptcyCheckDate": bankruptcy_check_date,
-            "bankruptcyCheckResult": bankruptcy_check_result,
-            "specialOpinion": special_opinion,
-            "creditContractNumber": f"КРД-{random.randint(10000, 99999)}" if credit_product and random.random() > 0.5 else None,
-            "cadastralValue": int((market_value or 0) * random.uniform(0.7, 0.9)) if market_value and random.random() > 0.5 else None,
-            "marketValuePerSqm": int((market_value or 0) / (total_area_sqm or 1)) if market_value and total_area_sqm and random.random() > 0.5 else None,
-            "marketValuePerHectare": int((market_value or 0) / (total_area_hectares or 0.01)) if market_value and total_area_hectares and random.random() > 0.5 else None,
-            "liquidityMovable": random.choice(LIQUIDITY_OPTIONS) if collateral_type and "транспорт" in str(collateral_type).lower() and random.random() > 0.5 else None,
-            "suspensiveConditions": suspensive_conditions if suspensive_conditions else None,
-            "detailedDescriptions": detailed_descriptions if detailed_descriptions else None,
-            "photos": photos if photos else None,
-            "review": review,
-            "calculations": calculations if calculations else None,
-            "additionalData": additional_data if additional_data else None,
-            "conclusionType": random.choice(CONCLUSION_TYPES),
-            "status": status,
-            "statusColor": (
-                "green" if status == "Согласовано"
-                else "blue" if status == "На согласовании"
-                else "red" if status in ["Отклонено", "Аннулировано"]
-                else None
-            ),
-            "author": random.choice(AUTHORS),
-            "authorDate": author_date,
-            "approver": approver,
-            "approvalDate": approval_date,
-            "conclusionText": random.choice(CONCLUSION_TEXTS),
-            "recommendations": random.choice(RECOMMENDATIONS) if random.random() > 0.3 else None,
-            "riskLevel": random.choice(RISK_LEVELS) if random.random() > 0.2 else None,
-            "notes": f"Примечание к заключению {i}" if random.random() > 0.5 else None,
-        }
-        
-        conclusions.append(conclusion)
-    
-    return conclusions
+    for first in range(1, count + 1, batch_size):
+        last = min(first + batch_size, count + 1)
+        yield [build_conclusion(i, deals, dates, year) for i in range(first, last)]
 
 
-def main():
-    """Основная функция"""
+def generate_conclusions(count: int = 50, portfolio: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+    """Генерация списка заключений"""
+    return [conclusion for batch in iter_conclusion_batches(count, portfolio) for conclusion in batch]
+
+
+def write_conclusions(out: TextIO, batches: Iterable[List[Dict[str, Any]]]) -> int:
+    """Пишет то же, что json.dump(conclusions, indent=2), не собирая весь список в памяти"""
+    written = 0
+    for batch in batches:
+        for conclusion in batch:
+            out.write(",\n  " if written else "[\n  ")
+            out.write(json.dumps(conclusion, ensure_ascii=False, indent=2).replace("\n", "\n  "))
+            written += 1
+    out.write("\n]" if written else "[]")
+    return written
+
+
+
+def run(
+    portfolio: Optional[List[Dict[str, Any]]] = None,
+    count: int = 50,
+    seed: Optional[int] = None,
+    batch_size: int = BATCH_SIZE,
+) -> None:
+    """Генерация и запись заключений; portfolio можно передать уже загруженным"""
     print("Генерация демо-данных для залоговых заключений...")
-    
-    conclusions = generate_conclusions(50)
+    if seed is not None:
+        random.seed(seed)
     
     OUTPUT_FILE.parent.mkdir(parents=True, exist_ok=True)
     with OUTPUT_FILE.open("w", encoding="utf-8") as f:
-        json.dump(conclusions, f, ensure_ascii=False, indent=2)
+        written = write_conclusions(f, iter_conclusion_batches(count, portfolio, batch_size))
     
-    print(f"✅ Данные залоговых заключений записаны: {OUTPUT_FILE} ({len(conclusions)} заключений)")
+    print(f"✅ Данные залоговых заключений записаны: {OUTPUT_FILE} ({written} заключений)")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate demo collateral conclusions.")
+    parser.add_argument("--count", type=int, default=50, help="Число заключений.")
+    parser.add_argument("--seed", type=int, default=None, help="Seed генератора (по умолчанию не фиксирован).")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=BATCH_SIZE,
+        help="Сколько заключений строится и записывается за раз (ограничивает память).",
+    )
+    args = parser.parse_args(argv)
+    if args.batch_size < 1:
+        parser.error("--batch-size must be >= 1")
+    return args
+
+
+def main(argv: Optional[List[str]] = None):
+    """Основная функция"""
+    args = parse_args(argv)
+    run(None, args.count, args.seed, args.batch_size)
 
 
 if __name__ == "__main__":
     main()
-
@@ -6,6 +6,8 @@ from typing import Any, Dict, List
 
 import pandas as pd
 
+from source_cache import read_excel_cached
+
 
 PORTFOLIO_FILE = Path("public/portfolioData.json")
 STRUCTURE_FILE = Path("ZALOG_DOS") / "структура для хранения документов Залоговое Досье.xlsx"
@@ -54,7 +56,7 @@ def load_portfolio_records() -> List[Dict[str, Any]]:
 
 
 def load_folder_structure() -> List[Dict[str, Any]]:
-    df = pd.read_excel(STRUCTURE_FILE)
+    df = read_excel_cached(STRUCTURE_FILE)
     folders: List[Dict[str, Any]] = []
     for idx, row in df.iterrows():
         path = [
@@ -123,9 +125,8 @@ def generate_documents(portfolio: List[Dict[str, Any]], folders: List[Dict[str,
     return documents
 
 
-def main() -> None:
+def run(portfolio_records: List[Dict[str, Any]]) -> None:
     random.seed(84)
-    portfolio_records = load_portfolio_records()
     folders = load_folder_structure()
     documents = generate_documents(portfolio_records, folders)
 
@@ -138,6 +139,10 @@ def main() -> None:
     print(f"Saved {len(documents)} documents across {len(folders)} folders to {OUTPUT_FILE}")
 
 
+def main() -> None:
+    run(load_portfolio_records())
+
+
 if __name__ == "__main__":
     main()
 
@@ -2,21 +2,49 @@
 Генерация XML файла отчета по форме 0409310 ЦБ РФ
 на основе данных залогового портфеля
 """
+import argparse
+import io
 import json
+import os
+import re
+import shutil
+import tempfile
 import uuid
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Deque, Dict, Iterator, List, Optional, TextIO
 import xml.etree.ElementTree as ET
-from xml.dom import minidom
+
+from keyword_classifier import KeywordClassifier
 
 PORTFOLIO_DATA_FILE = Path("public/portfolioData.json")
+SCHEMA_FILE = Path("XML_310_2025-04-24") / "Ф310_Schema.xsd"
 OUTPUT_DIR = Path("public/reports")
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
 # Namespace для формы 0409310
 NS = "urn:cbr-ru:rep0409310:v4.0.4.5"
 NS_MAP = {None: NS}
+NS_PREFIX = "ns0"
+INDENT = "  "
+
+# Ограничение числа сделок на раздел; None — весь портфель
+REPORT_ITEM_LIMIT: Optional[int] = None
+# Размер порции сделок, которую раздел строит за один шаг (и один воркер при --workers > 1)
+SECTION_CHUNK_SIZE = 5_000
+# Разделы 2-5 пишутся во временные файлы, пока идет раздел 1; до этого размера они остаются в памяти
+SECTION_SPOOL_SIZE = 64 * 2**20
+
+REAL_ESTATE_KEYWORDS = ["недвиж", "зем", "здание", "помещение"]
+VEHICLE_KEYWORDS = ["транспорт", "авто", "машина"]
+
+# Подраздел раздела 4: 4.1 — недвижимость, 4.3 — транспорт
+SECTION4_CLASSIFIER: KeywordClassifier[Optional[str]] = KeywordClassifier(
+    [(REAL_ESTATE_KEYWORDS, "4.1"), (VEHICLE_KEYWORDS, "4.3")], None
+)
 
 
 def format_decimal(value: Any, decimals: int = 2) -> str:
@@ -30,22 +58,26 @@ def format_decimal(value: Any, decimals: int = 2) -> str:
         return "0.00"
 
 
+@lru_cache(maxsize=65536)
+def parse_date_text(value: str) -> Optional[str]:
+    """Строка даты в CCYY-MM-DD или None; в портфеле даты сильно повторяются, поэтому кэшируем"""
+    # Пробуем разные форматы
+    for fmt in ["%Y-%m-%d", "%d.%m.%Y", "%d/%m/%Y"]:
+        try:
+            dt = datetime.strptime(value, fmt)
+            return dt.strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+    return None
+
+
 def format_date(value: Any) -> str:
     """Форматирование даты в формат CCYY-MM-DD"""
-    if not value:
-        return datetime.now().strftime("%Y-%m-%d")
-    try:
-        if isinstance(value, str):
-            # Пробуем разные форматы
-            for fmt in ["%Y-%m-%d", "%d.%m.%Y", "%d/%m/%Y"]:
-                try:
-                    dt = datetime.strptime(value, fmt)
-                    return dt.strftime("%Y-%m-%d")
-                except ValueError:
-                    continue
-        return datetime.now().strftime("%Y-%m-%d")
-    except Exception:
-        return datetime.now().strftime("%Y-%m-%d")
+    if value and isinstance(value, str):
+        parsed = parse_date_text(value)
+        if parsed:
+            return parsed
+    return datetime.now().strftime("%Y-%m-%d")
 
 
 def escape_xml(text: str) -> str:
@@ -91,181 +123,347 @@ def create_root_element(
     return root, section310
 
 
-def create_section1(section310: ET.Element, portfolio_items: List[Dict[str, Any]]) -> None:
-    """Раздел 1: Общие сведения"""
-    for item in portfolio_items[:100]:  # Ограничение до 100 записей
-        ref = str(item.get("reference") or item.get("contractNumber") or "")
-        if not ref:
-            continue
+def classify_collateral(collateral_type: str) -> Optional[str]:
+    """Подраздел раздела 4 по типу обеспечения: 4.1 — недвижимость, 4.3 — транспорт"""
+    return SECTION4_CLASSIFIER.classify(collateral_type)
 
-        section1 = ET.SubElement(section310, f"{{{NS}}}Раздел1")
-        section1.set("Раздел1_1", ref)
 
-        # Подраздел 1.1-1.4
-        subsection1 = ET.SubElement(section1, f"{{{NS}}}Подраздел1")
+def prepare_deal(item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Поля сделки, общие для нескольких разделов, вычисленные один раз; None — сделка без идентификатора"""
+    ref = str(item.get("reference") or item.get("contractNumber") or "")
+    if not ref:
+        return None
+    return {
+        "item": item,
+        "ref": ref,
+        "kind": classify_collateral(str(item.get("collateralType") or "")),
+        "location": escape_xml(str(item.get("collateralLocation") or "")),
+        "info": escape_xml(str(item.get("collateralInfo") or "")),
+        "registrationDate": format_date(item.get("registrationDate")),
+    }
+
+
+def section1_item(deal: Dict[str, Any]) -> Optional[ET.Element]:
+    """Раздел 1 для подготовленной сделки (общие сведения); None — сделка в раздел не попадает"""
+    item = deal["item"]
+    ref = deal["ref"]
+
+    section1 = ET.Element(f"{{{NS}}}Раздел1")
+    section1.set("Раздел1_1", ref)
 
-        # 1.1 - Регистрация залога
-        reg1 = ET.SubElement(subsection1, f"{{{NS}}}Раздел1_1")
-        reg1.set("Раздел1.1_2", ref)
+    # Подраздел 1.1-1.4
+    subsection1 = ET.SubElement(section1, f"{{{NS}}}Подраздел1")
+
+    # 1.1 - Регистрация залога
+    reg1 = ET.SubElement(subsection1, f"{{{NS}}}Раздел1_1")
+    reg1.set("Раздел1.1_2", ref)
 
-        reg2 = ET.SubElement(subsection1, f"{{{NS}}}Раздел1.1")
-        reg_date = format_date(item.get("registrationDate") or item.get("collateralContractDate"))
-        reg2.set("Раздел1.1_3", reg_date)
-        reg2.set("Раздел1.1_4", escape_xml(str(item.get("collateralType") or "-")))
+    reg2 = ET.SubElement(subsection1, f"{{{NS}}}Раздел1.1")
+    reg_date = format_date(item.get("registrationDate") or item.get("collateralContractDate"))
+    reg2.set("Раздел1.1_3", reg_date)
+    reg2.set("Раздел1.1_4", escape_xml(str(item.get("collateralType") or "-")))
+
+    # 1.2 - Дополнительная регистрация
+    if item.get("collateralReference"):
+        reg3 = ET.SubElement(subsection1, f"{{{NS}}}Раздел1.2")
+        reg3.set("Раздел1.2_2", str(item.get("collateralReference")))
+
+    # 1.3 - Изменение залога
+    if item.get("lastMonitoringDate"):
+        reg4 = ET.SubElement(subsection1, f"{{{NS}}}Раздел1.3")
+        reg4.set("Раздел1.3_2", format_date(item.get("lastMonitoringDate")))
+
+    # 1.4 - Снятие с учета
+    if item.get("closeDate"):
+        reg5 = ET.SubElement(section1, f"{{{NS}}}Раздел1.4")
+        reg5.set("Раздел1.4_2", format_date(item.get("closeDate")))
+
+    return section1
+
+
+def section2_item(deal: Dict[str, Any]) -> Optional[ET.Element]:
+    """Раздел 2 для подготовленной сделки (финансовые показатели); None — сделка в раздел не попадает"""
+    item = deal["item"]
+    ref = deal["ref"]
+
+    section2 = ET.Element(f"{{{NS}}}Раздел2")
+    section2.set("Раздел2_1", ref)
+    section2.set("Раздел2_2", str(item.get("contractNumber") or ""))
+
+    # Основной долг
+    debt = item.get("debtRub") or 0
+    debt_date = format_date(item.get("contractDate"))
+    section2.set("Раздел2_3", format_decimal(debt))
+    section2.set("Раздел2_4", debt_date)
+
+    # Проценты
+    interest = item.get("overdueInterest") or 0
+    section2.set("Раздел2_5", format_decimal(interest))
+    section2.set("Раздел2_6", debt_date)
+
+    # Просроченный основной долг
+    overdue_principal = item.get("overduePrincipal") or 0
+    section2.set("Раздел2_7", format_decimal(overdue_principal))
+    section2.set("Раздел2_8", debt_date)
+
+    # Просроченные проценты
+    overdue_interest = item.get("overdueInterest") or 0
+    section2.set("Раздел2_9", format_decimal(overdue_interest))
+    section2.set("Раздел2_10", debt_date)
+
+    # Лимит
+    limit = item.get("limitRub") or 0
+    section2.set("Раздел2_11", format_decimal(limit))
+    section2.set("Раздел2_12", debt_date)
 
-        # 1.2 - Дополнительная регистрация
-        if item.get("collateralReference"):
-            reg3 = ET.SubElement(subsection1, f"{{{NS}}}Раздел1.2")
-            reg3.set("Раздел1.2_2", str(item.get("collateralReference")))
+    # Резерв
+    section2.set("Раздел2_13", "0.00")
+    section2.set("Раздел2_14", debt_date)
 
-        # 1.3 - Изменение залога
-        if item.get("lastMonitoringDate"):
-            reg4 = ET.SubElement(subsection1, f"{{{NS}}}Раздел1.3")
-            reg4.set("Раздел1.3_2", format_date(item.get("lastMonitoringDate")))
+    return section2
 
-        # 1.4 - Снятие с учета
-        if item.get("closeDate"):
-            reg5 = ET.SubElement(section1, f"{{{NS}}}Раздел1.4")
-            reg5.set("Раздел1.4_2", format_date(item.get("closeDate")))
 
+def section3_item(deal: Dict[str, Any]) -> Optional[ET.Element]:
+    """Раздел 3 для подготовленной сделки (оценка обеспечения); None — сделка в раздел не попадает"""
+    item = deal["item"]
+    ref = deal["ref"]
+
+    section3 = ET.Element(f"{{{NS}}}Раздел3")
+    section3.set("Раздел3_1", ref)
+    section3.set("Раздел3_2", deal["location"])
+    section3.set("Раздел3_3", escape_xml(str(item.get("collateralType") or "")))
+    section3.set("Раздел3_4", escape_xml(str(item.get("collateralCategory") or "")))
+    section3.set("Раздел3_5", "310310")  # Код ОКАТО по умолчанию
+    section3.set("Раздел3_6", deal["info"])
+    section3.set("Раздел3_7", escape_xml(str(item.get("collateralPurpose") or "")))
+    section3.set("Раздел3_8", escape_xml(str(item.get("qualityCategory") or "")))
+    section3.set("Раздел3_9", escape_xml(str(item.get("liquidity") or "")))
+
+    # Залоговая стоимость
+    collateral_value = item.get("collateralValue") or 0
+    section3.set("Раздел3_10", escape_xml(str(collateral_value)))
 
-def create_section2(section310: ET.Element, portfolio_items: List[Dict[str, Any]]) -> None:
-    """Раздел 2: Финансовые показатели"""
-    for item in portfolio_items[:100]:
-        ref = str(item.get("reference") or item.get("contractNumber") or "")
-        if not ref:
-            continue
+    # Рыночная стоимость
+    market_value = item.get("marketValue") or item.get("currentMarketValue") or 0
+    section3.set("Раздел3_11", format_decimal(market_value))
+
+    return section3
 
-        section2 = ET.SubElement(section310, f"{{{NS}}}Раздел2")
-        section2.set("Раздел2_1", ref)
-        section2.set("Раздел2_2", str(item.get("contractNumber") or ""))
-
-        # Основной долг
-        debt = item.get("debtRub") or 0
-        debt_date = format_date(item.get("contractDate"))
-        section2.set("Раздел2_3", format_decimal(debt))
-        section2.set("Раздел2_4", debt_date)
-
-        # Проценты
-        interest = item.get("overdueInterest") or 0
-        section2.set("Раздел2_5", format_decimal(interest))
-        section2.set("Раздел2_6", debt_date)
-
-        # Просроченный основной долг
-        overdue_principal = item.get("overduePrincipal") or 0
-        section2.set("Раздел2_7", format_decimal(overdue_principal))
-        section2.set("Раздел2_8", debt_date)
-
-        # Просроченные проценты
-        overdue_interest = item.get("overdueInterest") or 0
-        section2.set("Раздел2_9", format_decimal(overdue_interest))
-        section2.set("Раздел2_10", debt_date)
-
-        # Лимит
-        limit = item.get("limitRub") or 0
-        section2.set("Раздел2_11", format_decimal(limit))
-        section2.set("Раздел2_12", debt_date)
-
-        # Резерв
-        section2.set("Раздел2_13", "0.00")
-        section2.set("Раздел2_14", debt_date)
-
-
-def create_section3(section310: ET.Element, portfolio_items: List[Dict[str, Any]]) -> None:
-    """Раздел 3: Оценка обеспечения"""
-    for item in portfolio_items[:100]:
-        ref = str(item.get("reference") or item.get("contractNumber") or "")
-        if not ref:
-            continue
 
-        section3 = ET.SubElement(section310, f"{{{NS}}}Раздел3")
-        section3.set("Раздел3_1", ref)
-        section3.set("Раздел3_2", escape_xml(str(item.get("collateralLocation") or "")))
-        section3.set("Раздел3_3", escape_xml(str(item.get("collateralType") or "")))
-        section3.set("Раздел3_4", escape_xml(str(item.get("collateralCategory") or "")))
-        section3.set("Раздел3_5", "310310")  # Код ОКАТО по умолчанию
-        section3.set("Раздел3_6", escape_xml(str(item.get("collateralInfo") or "")))
-        section3.set("Раздел3_7", escape_xml(str(item.get("collateralPurpose") or "")))
-        section3.set("Раздел3_8", escape_xml(str(item.get("qualityCategory") or "")))
-        section3.set("Раздел3_9", escape_xml(str(item.get("liquidity") or "")))
-
-        # Залоговая стоимость
-        collateral_value = item.get("collateralValue") or 0
-        section3.set("Раздел3_10", escape_xml(str(collateral_value)))
-
-        # Рыночная стоимость
-        market_value = item.get("marketValue") or item.get("currentMarketValue") or 0
-        section3.set("Раздел3_11", format_decimal(market_value))
-
-
-def create_section4(section310: ET.Element, portfolio_items: List[Dict[str, Any]]) -> None:
-    """Раздел 4: Детализация по типам обеспечения"""
-    for item in portfolio_items[:100]:
-        ref = str(item.get("reference") or item.get("contractNumber") or "")
-        if not ref:
-            continue
+def section4_item(deal: Dict[str, Any]) -> Optional[ET.Element]:
+    """Раздел 4 для подготовленной сделки (детализация по типам обеспечения); None — сделка в раздел не попадает"""
+    item = deal["item"]
+    ref = deal["ref"]
+
+    section4 = ET.Element(f"{{{NS}}}Раздел4")
+    section4.set("Раздел4_1", ref)
 
-        collateral_type = str(item.get("collateralType") or "").lower()
-
-        section4 = ET.SubElement(section310, f"{{{NS}}}Раздел4")
-        section4.set("Раздел4_1", ref)
-
-        # Определяем категорию обеспечения (4.1 - недвижимость, 4.3 - транспорт и т.д.)
-        if any(k in collateral_type for k in ["недвиж", "зем", "здание", "помещение"]):
-            # 4.1 - Недвижимость
-            subsection = ET.SubElement(section4, f"{{{NS}}}Раздел4.1")
-            subsection.set("Раздел4.1_2", escape_xml(str(item.get("collateralLocation") or "")))
-            subsection.set("Раздел4.1_3", format_date(item.get("registrationDate")))
-            subsection.set("Раздел4.1_4", format_date(item.get("initialValuationDate")))
-            subsection.set("Раздел4.1_5", str(item.get("collateralReference") or ""))
-            subsection.set("Раздел4.1_6", format_date(item.get("currentValuationDate")))
-
-        elif any(k in collateral_type for k in ["транспорт", "авто", "машина"]):
-            # 4.3 - Транспортные средства
-            subsection = ET.SubElement(section4, f"{{{NS}}}Раздел4.3")
-            subsection.set("Раздел4.3_2", format_date(item.get("registrationDate")))
-            subsection.set("Раздел4.3_3", escape_xml(str(item.get("collateralInfo") or "")))
-            subsection.set("Раздел4.3_4", escape_xml(str(item.get("collateralLocation") or "")))
-            subsection.set("Раздел4.3_5", "2024")  # Год выпуска
-            subsection.set("Раздел4.3_6", escape_xml(str(item.get("collateralInfo") or "")))
-            subsection.set("Раздел4.3_7", escape_xml(str(item.get("collateralInfo") or "")))
-            subsection.set("Раздел4.3_8", escape_xml(str(item.get("collateralInfo") or "")))
-
-
-def create_section5(section310: ET.Element, portfolio_items: List[Dict[str, Any]]) -> None:
-    """Раздел 5: Информация о залогодателях"""
-    for item in portfolio_items[:100]:
-        ref = str(item.get("reference") or item.get("contractNumber") or "")
-        if not ref:
-            continue
+    # Определяем категорию обеспечения (4.1 - недвижимость, 4.3 - транспорт и т.д.)
+    if deal["kind"] == "4.1":
+        # 4.1 - Недвижимость
+        subsection = ET.SubElement(section4, f"{{{NS}}}Раздел4.1")
+        subsection.set("Раздел4.1_2", deal["location"])
+        subsection.set("Раздел4.1_3", deal["registrationDate"])
+        subsection.set("Раздел4.1_4", format_date(item.get("initialValuationDate")))
+        subsection.set("Раздел4.1_5", str(item.get("collateralReference") or ""))
+        subsection.set("Раздел4.1_6", format_date(item.get("currentValuationDate")))
+
+    elif deal["kind"] == "4.3":
+        # 4.3 - Транспортные средства
+        subsection = ET.SubElement(section4, f"{{{NS}}}Раздел4.3")
+        subsection.set("Раздел4.3_2", deal["registrationDate"])
+        subsection.set("Раздел4.3_3", deal["info"])
+        subsection.set("Раздел4.3_4", deal["location"])
+        subsection.set("Раздел4.3_5", "2024")  # Год выпуска
+        subsection.set("Раздел4.3_6", deal["info"])
+        subsection.set("Раздел4.3_7", deal["info"])
+        subsection.set("Раздел4.3_8", deal["info"])
+
+    return section4
+
+
+def section5_item(deal: Dict[str, Any]) -> Optional[ET.Element]:
+    """Раздел 5 для подготовленной сделки (информация о залогодателях); None — сделка в раздел не попадает"""
+    item = deal["item"]
+    ref = deal["ref"]
+
+    pledger = item.get("pledger") or item.get("borrower") or ""
+    if not pledger:
+        return None
+
+    section5 = ET.Element(f"{{{NS}}}Раздел5")
+    section5.set("Раздел5_1", ref)
+
+    # 5.1 - Залогодатель - физическое лицо
+    subsection = ET.SubElement(section5, f"{{{NS}}}Раздел5.1")
+    subsection.set("Раздел5.1_2", deal["location"])
+    subsection.set("Раздел5.1_3", escape_xml(pledger))
+    subsection.set("Раздел5.1_4", escape_xml(pledger))
+    subsection.set("Раздел5.1_5", "")
+    subsection.set("Раздел5.1_6", "")
+    subsection.set("Раздел5.1_7", "")
+    subsection.set("Раздел5.1_8", str(item.get("inn") or ""))
+    subsection.set("Раздел5.1_9", "")
+
+    return section5
+
+
+SECTION_ITEM_BUILDERS = [section1_item, section2_item, section3_item, section4_item, section5_item]
+
+
+ATTR_SPECIAL_CHARS = re.compile('[&<>"\n\r\t]')
+
+
+@lru_cache(maxsize=None)
+def qualified_tag(tag: str) -> str:
+    prefix = f"{{{NS}}}"
+    return f"{NS_PREFIX}:{tag[len(prefix):]}" if tag.startswith(prefix) else tag
 
-        pledger = item.get("pledger") or item.get("borrower") or ""
-        if not pledger:
+
+def quote_attr(value: Any) -> str:
+    text = str(value)
+    if not ATTR_SPECIAL_CHARS.search(text):
+        return text
+    return (
+        text
+        .replace("&", "&amp;")
+        .replace("<", "&lt;")
+        .replace(">", "&gt;")
+        .replace('"', "&quot;")
+        .replace("\n", "&#10;")
+        .replace("\r", "&#13;")
+        .replace("\t", "&#9;")
+    )
+
+
+def start_tag(element: ET.Element, extra: str = "") -> str:
+    attrs = "".join(f' {name}="{quote_attr(value)}"' for name, value in element.attrib.items())
+    return f"<{qualified_tag(element.tag)}{extra}{attrs}"
+
+
+def render_element(element: ET.Element, depth: int, parts: List[str]) -> None:
+    """Добавляет в parts элемент с отступами (как minidom.toprettyxml)"""
+    indent = INDENT * depth
+    if len(element) == 0:
+        parts.append(f"{indent}{start_tag(element)}/>\n")
+        return
+    parts.append(f"{indent}{start_tag(element)}>\n")
+    for child in element:
+        render_element(child, depth + 1, parts)
+    parts.append(f"{indent}</{qualified_tag(element.tag)}>\n")
+
+
+def render_deals_chunk(items: List[Dict[str, Any]]) -> List[str]:
+    """Один проход по порции сделок: фрагменты всех разделов 1-5 сразу"""
+    parts: List[List[str]] = [[] for _ in SECTION_ITEM_BUILDERS]
+    for item in items:
+        deal = prepare_deal(item)
+        if deal is None:
             continue
+        for section_parts, build_item in zip(parts, SECTION_ITEM_BUILDERS):
+            element = build_item(deal)
+            if element is not None:
+                render_element(element, 2, section_parts)
+    return ["".join(section_parts) for section_parts in parts]
 
-        section5 = ET.SubElement(section310, f"{{{NS}}}Раздел5")
-        section5.set("Раздел5_1", ref)
 
-        # 5.1 - Залогодатель - физическое лицо
-        subsection = ET.SubElement(section5, f"{{{NS}}}Раздел5.1")
-        subsection.set("Раздел5.1_2", escape_xml(str(item.get("collateralLocation") or "")))
-        subsection.set("Раздел5.1_3", escape_xml(pledger))
-        subsection.set("Раздел5.1_4", escape_xml(pledger))
-        subsection.set("Раздел5.1_5", "")
-        subsection.set("Раздел5.1_6", "")
-        subsection.set("Раздел5.1_7", "")
-        subsection.set("Раздел5.1_8", str(item.get("inn") or ""))
-        subsection.set("Раздел5.1_9", "")
+_chunk_items: List[Dict[str, Any]] = []
 
 
-def create_section6(section310: ET.Element, portfolio_items: List[Dict[str, Any]]) -> None:
-    """Раздел 6: Дополнительная информация"""
-    # Раздел 6.1 - Изменения в разделе 1
-    # Раздел 6.2 - Изменения в разделе 2
-    # Раздел 6.3 - Изменения в разделе 3
-    # Раздел 6.4 - Изменения в разделе 4
-    # Раздел 6.5 - Изменения в разделе 5
-    pass
+def init_chunk_worker(items: List[Dict[str, Any]]) -> None:
+    # Сделки передаются воркеру один раз при старте, задачи несут только границы порций
+    global _chunk_items
+    _chunk_items = items
+
+
+def render_chunk_task(start: int, stop: int) -> List[str]:
+    return render_deals_chunk(_chunk_items[start:stop])
+
+
+def iter_deal_chunks(items: List[Dict[str, Any]], workers: int = 1) -> Iterator[List[str]]:
+    """Фрагменты разделов 1-5 по порциям сделок, в порядке портфеля.
+
+    При workers > 1 порции строятся параллельно в пуле процессов; в работе
+    держится не больше 2 * workers порций, так что память ограничена.
+    """
+    bounds = [(start, min(start + SECTION_CHUNK_SIZE, len(items))) for start in range(0, len(items), SECTION_CHUNK_SIZE)]
+    if workers <= 1 or len(bounds) <= 1:
+        for start, stop in bounds:
+            yield render_deals_chunk(items[start:stop])
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_chunk_worker, initargs=(items,)) as pool:
+        pending: Deque[Future] = deque()
+        for start, stop in bounds:
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+            pending.append(pool.submit(render_chunk_task, start, stop))
+        while pending:
+            yield pending.popleft().result()
+
+
+def write_xml_stream(
+    out: TextIO,
+    portfolio_data: List[Dict[str, Any]],
+    guid: str,
+    report_date: str,
+    credit_org_code: str,
+    credit_org_name: str,
+    workers: int = 1,
+) -> None:
+    """Потоковая запись отчета: каждая сделка сериализуется и сразу пишется в out"""
+    root, section310 = create_root_element(guid, report_date, credit_org_code, credit_org_name)
+
+    out.write('<?xml version="1.0" encoding="windows-1251"?>\n')
+    out.write(start_tag(root, f' xmlns:{NS_PREFIX}="{NS}"') + ">\n")
+    for child in root:
+        if child is not section310:
+            parts: List[str] = []
+            render_element(child, 1, parts)
+            out.write("".join(parts))
+
+    # Раздел310 открываем лениво: без вложенных разделов он должен остаться пустым тегом
+    section_head = INDENT + start_tag(section310)
+    opened = False
+    # Раздел 1 идет прямо в out, разделы 2-5 копятся в спулах и дописываются после него
+    spools = [
+        tempfile.SpooledTemporaryFile(max_size=SECTION_SPOOL_SIZE, mode="w+", encoding="utf-8")
+        for _ in SECTION_ITEM_BUILDERS[1:]
+    ]
+    try:
+        for fragments in iter_deal_chunks(portfolio_data[:REPORT_ITEM_LIMIT], workers):
+            if not opened and any(fragments):
+                out.write(section_head + ">\n")
+                opened = True
+            out.write(fragments[0])
+            for spool, fragment in zip(spools, fragments[1:]):
+                spool.write(fragment)
+        for spool in spools:
+            spool.seek(0)
+            shutil.copyfileobj(spool, out)
+    finally:
+        for spool in spools:
+            spool.close()
+    if opened:
+        out.write(f"{INDENT}</{qualified_tag(section310.tag)}>\n")
+    else:
+        out.write(section_head + "/>\n")
+    out.write(f"</{qualified_tag(root.tag)}>\n")
+
+
+def write_xml_report(
+    output_file: Path,
+    portfolio_data: List[Dict[str, Any]],
+    credit_org_code: str = "000000000",
+    credit_org_name: str = "Кредитная организация",
+    report_date: Optional[str] = None,
+    workers: int = 1,
+) -> None:
+    """Пишет отчет прямо в файл в windows-1251, не собирая документ в памяти"""
+    if not report_date:
+        report_date = datetime.now().strftime("%Y-%m-%d")
+    with output_file.open("w", encoding="windows-1251", errors="xmlcharrefreplace") as f:
+        write_xml_stream(f, portfolio_data, str(uuid.uuid4()), report_date, credit_org_code, credit_org_name, workers)
 
 
 def generate_xml_report(
@@ -278,53 +476,117 @@ def generate_xml_report(
     if not report_date:
         report_date = datetime.now().strftime("%Y-%m-%d")
 
-    guid = str(uuid.uuid4())
+    buffer = io.BytesIO()
+    with io.TextIOWrapper(buffer, encoding="windows-1251", errors="xmlcharrefreplace") as out:
+        write_xml_stream(out, portfolio_data, str(uuid.uuid4()), report_date, credit_org_code, credit_org_name)
+        out.flush()
+        return buffer.getvalue().decode("windows-1251")
 
-    root, section310 = create_root_element(guid, report_date, credit_org_code, credit_org_name)
 
-    # Создаем разделы
-    create_section1(section310, portfolio_data)
-    create_section2(section310, portfolio_data)
-    create_section3(section310, portfolio_data)
-    create_section4(section310, portfolio_data)
-    create_section5(section310, portfolio_data)
-    create_section6(section310, portfolio_data)
+@lru_cache(maxsize=4)
+def compile_schema(schema_path: str, mtime_ns: int, size: int) -> Any:
+    # Ключ включает mtime и размер: измененная схема компилируется заново
+    from lxml import etree
 
-    # Форматируем XML
-    rough_string = ET.tostring(root, encoding="utf-8")
-    reparsed = minidom.parseString(rough_string)
-    pretty_xml = reparsed.toprettyxml(indent="  ", encoding="windows-1251")
+    return etree.XMLSchema(etree.parse(schema_path))
 
-    return pretty_xml.decode("windows-1251")
 
+def load_schema(schema_file: Path = SCHEMA_FILE) -> Any:
+    """Скомпилированная XSD-схема; в пределах процесса компилируется один раз"""
+    stat = schema_file.stat()
+    return compile_schema(str(schema_file), stat.st_mtime_ns, stat.st_size)
 
-def main():
-    """Основная функция"""
-    # Загружаем данные портфеля
-    if not PORTFOLIO_DATA_FILE.exists():
-        print(f"❌ Файл {PORTFOLIO_DATA_FILE} не найден")
-        return
 
-    with PORTFOLIO_DATA_FILE.open("r", encoding="utf-8") as f:
-        portfolio_data = json.load(f)
+def validate_xml_report(xml_file: Path, schema_file: Path = SCHEMA_FILE, max_errors: int = 20) -> List[str]:
+    """Потоковая проверка отчета по XSD (lxml iterparse); пустой список — отчет валиден.
+
+    Разобранные элементы сразу освобождаются, поэтому память не растет с размером
+    отчета. Проверка останавливается на первом нарушении схемы; возвращаются
+    сообщения из журнала ошибок парсера (не больше max_errors).
+    """
+    try:
+        from lxml import etree
+    except ImportError as exc:
+        raise RuntimeError("Для проверки по XSD нужен пакет lxml (pip install lxml)") from exc
 
+    schema = load_schema(schema_file)
+    try:
+        for _, element in etree.iterparse(str(xml_file), events=("end",), schema=schema, huge_tree=True):
+            element.clear()
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+    except etree.XMLSyntaxError as exc:
+        messages = [entry.message for entry in exc.error_log] or [str(exc)]
+        return messages[:max_errors]
+    return []
+
+
+def run(portfolio_data: List[Dict[str, Any]], workers: int = 1) -> Path:
+    """Генерация и сохранение отчета по уже загруженному портфелю"""
     print(f"📊 Загружено {len(portfolio_data)} записей из портфеля")
 
-    # Генерируем XML
-    xml_content = generate_xml_report(
+    # Генерируем XML сразу в файл
+    output_file = OUTPUT_DIR / f"Ф310_{datetime.now().strftime('%Y%m%d')}_{uuid.uuid4().hex[:8]}.xml"
+    write_xml_report(
+        output_file,
         portfolio_data,
         credit_org_code="000000000",
         credit_org_name="ПАО 'Тестовый Банк'",
         report_date=datetime.now().strftime("%Y-%m-%d"),
+        workers=workers,
     )
 
-    # Сохраняем файл
-    output_file = OUTPUT_DIR / f"Ф310_{datetime.now().strftime('%Y%m%d')}_{uuid.uuid4().hex[:8]}.xml"
-    with output_file.open("w", encoding="windows-1251") as f:
-        f.write(xml_content)
-
     print(f"✅ XML отчет сохранен: {output_file}")
     print(f"📄 Размер файла: {output_file.stat().st_size} байт")
+    return output_file
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate Form 0409310 XML report from the collateral portfolio.")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Число процессов для построения разделов; 1 — в текущем процессе.",
+    )
+    parser.add_argument(
+        "--limit",
+        type=int,
+        default=None,
+        help="Ограничить число сделок в каждом разделе (по умолчанию — весь портфель).",
+    )
+    parser.add_argument(
+        "--validate",
+        action="store_true",
+        help=f"Проверить сформированный отчет по XSD ({SCHEMA_FILE}); требуется lxml.",
+    )
+    return parser.parse_args()
+
+
+def main():
+    """Основная функция"""
+    global REPORT_ITEM_LIMIT
+    args = parse_args()
+    REPORT_ITEM_LIMIT = args.limit
+
+    # Загружаем данные портфеля
+    if not PORTFOLIO_DATA_FILE.exists():
+        print(f"❌ Файл {PORTFOLIO_DATA_FILE} не найден")
+        return
+
+    with PORTFOLIO_DATA_FILE.open("r", encoding="utf-8") as f:
+        portfolio_data = json.load(f)
+
+    output_file = run(portfolio_data, args.workers)
+
+    if args.validate:
+        errors = validate_xml_report(output_file)
+        if errors:
+            print(f"❌ Отчет не соответствует схеме {SCHEMA_FILE}:")
+            for message in errors:
+                print(f"   - {message}")
+            raise SystemExit(1)
+        print(f"✅ Отчет соответствует схеме {SCHEMA_FILE}")
 
 
 if __name__ == "__main__":
@@ -2,16 +2,30 @@
 Полная генерация демо-данных для залоговых заключений со всеми вкладками из ZZ
 """
 
+import argparse
+import hashlib
 import json
+import os
 import random
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
+from typing import Deque, Iterable, Iterator, List, Optional, TextIO
+
+from record_specs import Context, Field, Generator, choice, compile_record, const, let, randint, ref
 
 OUTPUT_FILE = Path("public/collateralConclusionsData.json")
+# Заключений в шарде; шард — единица работы воркера и собственного seed
+SHARD_SIZE = 1_000
+# Период дат заключений
+CONCLUSION_START = datetime(2024, 1, 1)
+CONCLUSION_END = datetime(2025, 1, 7)
 
 # Справочники
 CONCLUSION_TYPES = ["Первичное", "Повторное", "Дополнительное", "Переоценка"]
 STATUSES = ["Черновик", "На согласовании", "Согласовано", "Отклонено", "Аннулировано"]
+STATUS_COLORS = {"Согласовано": "green", "На согласовании": "blue", "Отклонено": "red", "Аннулировано": "red"}
 RISK_LEVELS = ["Низкий", "Средний", "Высокий", "Критический"]
 
 COLLATERAL_TYPES = [
@@ -66,62 +80,92 @@ def random_date(start: datetime, end: datetime) -> str:
     random_days = random.randint(0, delta.days)
     return (start + timedelta(days=random_days)).strftime("%Y-%m-%d")
 
+# Шаблоны записей (см. record_specs): поля в порядке обращений к random
+
+SUSPENSIVE_CONDITION_FIELDS = [
+    Field("id", lambda c: f"cond-{c['i']}"),
+    Field("number", ref("i")),
+    Field("description", ref("cond")),
+    Field("suspensiveCondition", const("+"), 0.7, otherwise="-"),
+    Field("additionalCondition", choice(SUSPENSIVE_CONDITIONS_LIST), 0.5),
+]
+
+suspensive_condition_record = compile_record(SUSPENSIVE_CONDITION_FIELDS)
+
 def generate_suspensive_conditions(count: int = None) -> list:
     """Генерация отлагательных условий"""
     if count is None:
         count = random.randint(2, 6)
-    
-    conditions = []
+
     selected = random.sample(SUSPENSIVE_CONDITIONS_LIST, min(count, len(SUSPENSIVE_CONDITIONS_LIST)))
-    
-    for i, cond in enumerate(selected, 1):
-        conditions.append({
-            "id": f"cond-{i}",
-            "number": i,
-            "description": cond,
-            "suspensiveCondition": "+" if random.random() > 0.3 else "-",
-            "additionalCondition": random.choice(SUSPENSIVE_CONDITIONS_LIST) if random.random() > 0.5 else None,
-        })
-    
-    return conditions
+    return [suspensive_condition_record({"i": i, "cond": cond}) for i, cond in enumerate(selected, 1)]
+
+def cadastral_number(c: Context) -> str:
+    return f"{random.randint(77, 99)}:{random.randint(1, 99)}:{random.randint(1000000, 9999999)}:{random.randint(1, 9999)}"
+
+def object_description(c: Context) -> str:
+    return (
+        f"Детальное описание объекта {c['j']}: состояние {random.choice(CONDITIONS)}, "
+        f"год постройки {random.randint(1990, 2020) if c['is_real_estate'] else 'N/A'}"
+    )
+
+DETAILED_DESCRIPTION_FIELDS = [
+    let("obj_area", randint(20, 500), when="is_real_estate"),
+    let("obj_cadastral", cadastral_number, 0.7, when="is_real_estate"),
+    Field("id", lambda c: f"desc-{c['j']}"),
+    Field("objectNumber", ref("j")),
+    Field("objectName", lambda c: f"{c['collateral_type']} - объект {c['j']}"),
+    Field("objectType", ref("collateral_type")),
+    Field("cadastralNumber", ref("obj_cadastral")),
+    Field("address", lambda c: f"г. Москва, ул. Примерная, д. {random.randint(1, 200)}"),
+    Field("areaSqm", ref("obj_area")),
+    Field("areaHectares", lambda c: round(c["obj_area"] / 100, 2), 0.5, when="obj_area"),
+    Field("floor", lambda c: f"{random.randint(1, 10)} этаж", 0.5, when="is_real_estate"),
+    Field("floorsCount", randint(1, 10), 0.5, when="is_real_estate"),
+    Field("undergroundFloors", randint(0, 2), 0.3, when="is_real_estate"),
+    Field("purpose", ref("collateral_type")),
+    Field("condition", choice(CONDITIONS)),
+    Field("material", choice(["Кирпич", "Бетон", "Металл", "Дерево"]), 0.5, when="is_real_estate"),
+    Field("yearBuilt", randint(1990, 2020), 0.5),
+    Field("yearCommissioned", randint(1990, 2020), 0.5),
+    Field(
+        "marketValue",
+        lambda c: int(c["market_value"] / c["objects_count"]),
+        when=lambda c: c["market_value"] and c["objects_count"],
+    ),
+    Field(
+        "collateralValue",
+        lambda c: int(c["collateral_value"] / c["objects_count"]),
+        when=lambda c: c["collateral_value"] and c["objects_count"],
+    ),
+    Field("ownershipShare", randint(50, 100)),
+    Field("ownershipBasis", choice(["Право собственности", "Право аренды", "Право пользования"])),
+    Field(
+        "registrationRecord",
+        lambda c: f"Запись № {random.randint(100000, 999999)}-{random.randint(1, 99)}/{random.randint(2020, 2024)}-{random.randint(1, 10)}",
+        0.5,
+    ),
+    Field("encumbrances", const("Не выявлены"), 0.4, otherwise="Имеются обременения"),
+    Field("replanning", const("Перепланировки не выявлены"), 0.4, otherwise="Выявлены несущественные перепланировки"),
+    Field("description", object_description),
+]
+
+detailed_description_record = compile_record(DETAILED_DESCRIPTION_FIELDS)
 
 def generate_detailed_descriptions(collateral_type: str, objects_count: int, market_value: float, collateral_value: float) -> list:
     """Генерация детального описания объектов"""
-    descriptions = []
     is_real_estate = "недвижимость" in collateral_type.lower()
-    
-    for j in range(1, objects_count + 1):
-        obj_area = random.randint(20, 500) if is_real_estate else None
-        obj_cadastral = f"{random.randint(77, 99)}:{random.randint(1, 99)}:{random.randint(1000000, 9999999)}:{random.randint(1, 9999)}" if is_real_estate and random.random() > 0.3 else None
-        
-        descriptions.append({
-            "id": f"desc-{j}",
-            "objectNumber": j,
-            "objectName": f"{collateral_type} - объект {j}",
-            "objectType": collateral_type,
-            "cadastralNumber": obj_cadastral,
-            "address": f"г. Москва, ул. Примерная, д. {random.randint(1, 200)}",
-            "areaSqm": obj_area,
-            "areaHectares": round((obj_area or 0) / 100, 2) if obj_area and random.random() > 0.5 else None,
-            "floor": f"{random.randint(1, 10)} этаж" if is_real_estate and random.random() > 0.5 else None,
-            "floorsCount": random.randint(1, 10) if is_real_estate and random.random() > 0.5 else None,
-            "undergroundFloors": random.randint(0, 2) if is_real_estate and random.random() > 0.7 else None,
-            "purpose": collateral_type,
-            "condition": random.choice(CONDITIONS),
-            "material": random.choice(["Кирпич", "Бетон", "Металл", "Дерево"]) if is_real_estate and random.random() > 0.5 else None,
-            "yearBuilt": random.randint(1990, 2020) if random.random() > 0.5 else None,
-            "yearCommissioned": random.randint(1990, 2020) if random.random() > 0.5 else None,
-            "marketValue": int((market_value or 0) / objects_count) if market_value and objects_count else None,
-            "collateralValue": int((collateral_value or 0) / objects_count) if collateral_value and objects_count else None,
-            "ownershipShare": random.randint(50, 100),
-            "ownershipBasis": random.choice(["Право собственности", "Право аренды", "Право пользования"]),
-            "registrationRecord": f"Запись № {random.randint(100000, 999999)}-{random.randint(1, 99)}/{random.randint(2020, 2024)}-{random.randint(1, 10)}" if random.random() > 0.5 else None,
-            "encumbrances": "Не выявлены" if random.random() > 0.6 else "Имеются обременения",
-            "replanning": "Перепланировки не выявлены" if random.random() > 0.6 else "Выявлены несущественные перепланировки",
-            "description": f"Детальное описание объекта {j}: состояние {random.choice(CONDITIONS)}, год постройки {random.randint(1990, 2020) if is_real_estate else 'N/A'}",
+    return [
+        detailed_description_record({
+            "j": j,
+            "collateral_type": collateral_type,
+            "is_real_estate": is_real_estate,
+            "objects_count": objects_count,
+            "market_value": market_value,
+            "collateral_value": collateral_value,
         })
-    
-    return descriptions
+        for j in range(1, objects_count + 1)
+    ]
 
 def generate_calculations(collateral_type: str, market_value: float) -> list:
     """Генерация расчетов в зависимости от типа залога"""
@@ -184,253 +228,379 @@ def generate_calculations(collateral_type: str, market_value: float) -> list:
     
     return calculations
 
-def generate_conclusions(count: int = 50) -> list:
-    """Генерация заключений"""
-    conclusions = []
-    
-    # Загружаем данные портфеля для связи
+def load_portfolio_data() -> list:
+    """Данные портфеля для связи заключений со сделками"""
     portfolio_file = Path("public/portfolioData.json")
-    portfolio_data = []
     if portfolio_file.exists():
         with portfolio_file.open("r", encoding="utf-8") as f:
-            portfolio_data = json.load(f)
-    
-    for i in range(1, count + 1):
-        # Связь с портфелем
-        deal = random.choice(portfolio_data) if portfolio_data else None
-        
-        conclusion_date = random_date(
-            datetime(2024, 1, 1),
-            datetime(2025, 1, 7)
-        )
-        
-        # Основные данные
-        conclusion_type = random.choice(CONCLUSION_TYPES)
-        status = random.choice(STATUSES)
-        collateral_type = random.choice(COLLATERAL_TYPES)
-        is_real_estate = "недвижимость" in collateral_type.lower()
-        
-        # Данные из портфеля или случайные
-        reference = deal.get("reference") if deal else f"DEMO-{i:04d}"
-        contract_number = deal.get("contractNumber") if deal else f"DEM-2023-{1000+i}"
-        pledger = deal.get("pledger") if deal else f"ООО «Демо {i:03d}»"
-        pledger_inn = deal.get("inn") if deal else f"{random.randint(1000000000, 9999999999)}"
-        borrower = deal.get("borrower") if deal else f"ООО «Заемщик {i:03d}»"
-        
-        # Кредитный продукт
-        credit_product = random.choice(CREDIT_PRODUCTS)
-        credit_amount = random.randint(10000000, 500000000)
-        credit_term = random.randint(12, 120)
-        
-        # Имущество
-        total_area_sqm = random.randint(50, 500) if is_real_estate else None
-        total_area_hectares = round((total_area_sqm or 0) / 100, 2) if total_area_sqm and random.random() > 0.5 else None
-        objects_count = random.randint(1, 5)
-        ownership_share = random.randint(50, 100)
-        collateral_location = deal.get("collateralLocation") if deal else f"г. Москва, ул. Примерная, д. {i}"
-        
-        # Земельный участок
-        land_cadastral = f"{random.randint(77, 99)}:{random.randint(1, 99)}:{random.randint(1000000, 9999999)}:{random.randint(1, 9999)}" if is_real_estate and random.random() > 0.4 else None
-        land_category = random.choice(LAND_CATEGORIES) if is_real_estate and random.random() > 0.4 else None
-        land_permitted_use = random.choice(PERMITTED_USES) if is_real_estate and random.random() > 0.4 else None
-        land_area_sqm = int(total_area_sqm * random.uniform(1.5, 3.0)) if total_area_sqm and is_real_estate and random.random() > 0.5 else None
-        land_area_hectares = round((land_area_sqm or 0) / 10000, 2) if land_area_sqm and random.random() > 0.5 else None
-        
-        # Оценка
-        market_value = random.randint(5000000, 300000000)
-        collateral_value = int(market_value * random.uniform(0.6, 0.9))
-        fair_value = int(market_value * random.uniform(0.85, 1.0))
-        cadastral_value = int(market_value * random.uniform(0.7, 0.9)) if random.random() > 0.5 else None
-        market_value_per_sqm = int(market_value / (total_area_sqm or 1)) if total_area_sqm and random.random() > 0.5 else None
-        market_value_per_hectare = int(market_value / (total_area_hectares or 0.01)) if total_area_hectares and random.random() > 0.5 else None
-        
-        # Характеристики
-        category = random.choice(CATEGORIES) if random.random() > 0.3 else None
-        liquidity = random.choice(LIQUIDITY_OPTIONS) if random.random() > 0.3 else None
-        liquidity_fair_value = random.choice(LIQUIDITY_OPTIONS) if random.random() > 0.5 else None
-        liquidity_movable = random.choice(LIQUIDITY_OPTIONS) if "транспорт" in collateral_type.lower() and random.random() > 0.5 else None
-        
-        # Состояние
-        collateral_condition = random.choice(CONDITIONS) if random.random() > 0.3 else None
-        has_replanning = random.choice([True, False]) if random.random() > 0.5 else None
-        replanning_description = (
-            "Выявлены несущественные перепланировки" if has_replanning and random.random() > 0.5
-            else "Перепланировки не выявлены" if not has_replanning
-            else None
-        )
-        land_functional_provision = random.choice(["функционально обеспечивает", "не обеспечивает"]) if is_real_estate and random.random() > 0.6 else None
-        
-        collateral_description = (
-            f"Предлагаемое в залог имущество расположено в {collateral_location}, "
-            f"состояние имущества {collateral_condition or 'хорошее'}, "
-            f"перепланировки {'выявлены' if has_replanning else 'не выявлены'}."
-        ) if random.random() > 0.2 else None
-        
-        # Обременения
-        has_encumbrances = random.choice([True, False]) if random.random() > 0.6 else None
-        encumbrances_description = "Имеются зарегистрированные обременения. Требуется снятие обременений." if has_encumbrances else None
-        encumbrances_details = "Обременения не выявлены, имеются ограничения прав на часть земельного участка." if has_encumbrances and random.random() > 0.5 else None
-        
-        # Права на объект
-        ownership_basis = random.choice(["Право собственности", "Право аренды", "Право пользования земельным участком"]) if random.random() > 0.4 else None
-        ownership_documents = f"Договор купли-продажи от {random_date(datetime.strptime(conclusion_date, '%Y-%m-%d') - timedelta(days=365), datetime.strptime(conclusion_date, '%Y-%m-%d'))}" if ownership_basis and random.random() > 0.5 else None
-        registration_record = f"Запись № {random.randint(100000, 999999)}-{random.randint(1, 99)}/{random.randint(2020, 2024)}-{random.randint(1, 10)} от {random_date(datetime.strptime(conclusion_date, '%Y-%m-%d') - timedelta(days=180), datetime.strptime(conclusion_date, '%Y-%m-%d'))}" if random.random() > 0.5 else None
-        registration_document = f"Выписка из Единого государственного реестра недвижимости об объекте недвижимости № {random.randint(99, 999)}/{random.randint(2020, 2024)}/{random.randint(100000000, 999999999)}" if random.random() > 0.6 else None
-        
-        # Проверка
-        inspection_date = random_date(
-            datetime.strptime(conclusion_date, "%Y-%m-%d") - timedelta(days=14),
-            datetime.strptime(conclusion_date, "%Y-%m-%d") - timedelta(days=1)
-        ) if random.random() > 0.3 else None
-        inspector_name = random.choice(AUTHORS) if inspection_date else None
-        
-        # Проверка на банкротство
-        bankruptcy_check_date = random_date(
-            datetime.strptime(conclusion_date, "%Y-%m-%d") - timedelta(days=30),
-            datetime.strptime(conclusion_date, "%Y-%m-%d")
-        ) if random.random() > 0.5 else None
-        bankruptcy_check_result = "Признаков банкротства не выявлено" if bankruptcy_check_date and random.random() > 0.3 else None
-        
-        # Особое мнение
-        special_opinion = (
-            f"Возможно рассмотреть в качестве залога при условии {'внесения в ЕГРН сведений о кадастровых номерах' if land_cadastral else 'подтверждения права собственности'}. "
-            f"Уровень ликвидности объекта: {liquidity or random.choice(LIQUIDITY_OPTIONS)}. "
-            f"{'Требуется снятие обременений.' if has_encumbrances else ''}"
-        ) if random.random() > 0.3 else None
-        
-        # Отлагательные условия
-        suspensive_conditions = generate_suspensive_conditions() if random.random() > 0.5 else []
-        
-        # Детальное описание
-        detailed_descriptions = generate_detailed_descriptions(collateral_type, objects_count, market_value, collateral_value) if objects_count > 1 and random.random() > 0.6 else []
-        
-        # Фото
-        photos = []
-        if random.random() > 0.5:
-            photo_count = random.randint(2, 5)
-            for j in range(1, photo_count + 1):
-                photos.append({
-                    "id": f"photo-{j}",
-                    "url": f"https://via.placeholder.com/400x300?text=Photo+{j}",
-                    "description": f"Фото {j} - {'фасадное' if j <= 2 else 'внутреннее'}",
-                    "isMain": j <= 2,
-                    "photoNumber": j,
-                })
-        
-        # Рецензия
-        review = None
-        if random.random() > 0.7:
-            review = {
-                "id": "review-1",
-                "reviewer": random.choice(AUTHORS),
-                "reviewerPosition": random.choice(["Главный оценщик", "Руководитель отдела", "Эксперт"]),
-                "reviewDate": random_date(
-                    datetime.strptime(conclusion_date, "%Y-%m-%d"),
-                    datetime.strptime(conclusion_date, "%Y-%m-%d") + timedelta(days=10)
-                ),
-                "reviewText": "Рецензия проведена. Заключение соответствует требованиям.",
-                "conclusion": "Одобрено",
-                "compliance": "Соответствует требованиям Федерального закона от 29.07.98 г. №135-ФЗ",
-                "reportCompliance": "Отчет об оценке соответствует требованиям Федерального закона от 29.07.98 г. №135-ФЗ «Об оценочной деятельности в Российской Федерации»" if random.random() > 0.5 else None,
-            }
-        
-        # Расчеты
-        calculations = generate_calculations(collateral_type, market_value) if random.random() > 0.6 else []
-        
-        conclusion = {
-            "id": f"conclusion-{i}",
-            "conclusionNumber": f"ЗК-{datetime.strptime(conclusion_date, '%Y-%m-%d').year}-{i:06d}",
-            "conclusionDate": conclusion_date,
-            "reference": reference,
-            "contractNumber": contract_number,
-            "pledger": pledger,
-            "pledgerInn": pledger_inn,
-            "borrower": borrower,
-            "borrowerInn": f"{random.randint(1000000000, 9999999999)}",
-            "creditProduct": credit_product,
-            "creditAmount": credit_amount,
-            "creditTermMonths": credit_term,
-            "creditContractNumber": f"КРД-{random.randint(10000, 99999)}" if random.random() > 0.5 else None,
-            "collateralType": collateral_type,
-            "collateralName": f"{collateral_type} - объект 1",
-            "collateralPurpose": f"Использование в качестве {collateral_type.lower()}",
-            "totalAreaSqm": total_area_sqm,
-            "totalAreaHectares": total_area_hectares,
-            "collateralLocation": collateral_location,
-            "objectsCount": objects_count,
-            "ownershipShare": ownership_share,
-            "landCategory": land_category,
-            "landPermittedUse": land_permitted_use,
-            "landCadastralNumber": land_cadastral,
-            "landAreaSqm": land_area_sqm,
-            "landAreaHectares": land_area_hectares,
-            "marketValue": market_value,
-            "collateralValue": collateral_value,
-            "fairValue": fair_value,
-            "cadastralValue": cadastral_value,
-            "marketValuePerSqm": market_value_per_sqm,
-            "marketValuePerHectare": market_value_per_hectare,
-            "category": category,
-            "liquidity": liquidity,
-            "liquidityFairValue": liquidity_fair_value,
-            "liquidityMovable": liquidity_movable,
-            "collateralDescription": collateral_description,
-            "collateralCondition": collateral_condition,
-            "hasReplanning": has_replanning,
-            "replanningDescription": replanning_description,
-            "landFunctionalProvision": land_functional_provision,
-            "hasEncumbrances": has_encumbrances,
-            "encumbrancesDescription": encumbrances_description,
-            "encumbrancesDetails": encumbrances_details,
-            "ownershipBasis": ownership_basis,
-            "ownershipDocuments": ownership_documents,
-            "registrationRecord": registration_record,
-            "registrationDocument": registration_document,
-            "inspectionDate": inspection_date,
-            "inspectorName": inspector_name,
-            "bankruptcyCheckDate": bankruptcy_check_date,
-            "bankruptcyCheckResult": bankruptcy_check_result,
-            "specialOpinion": special_opinion,
-            "suspensiveConditions": suspensive_conditions if suspensive_conditions else None,
-            "detailedDescriptions": detailed_descriptions if detailed_descriptions else None,
-            "photos": photos if photos else None,
-            "review": review,
-            "calculations": calculations if calculations else None,
-            "conclusionType": conclusion_type,
-            "status": status,
-            "statusColor": (
-                "green" if status == "Согласовано"
-                else "blue" if status == "На согласовании"
-                else "red" if status in ["Отклонено", "Аннулировано"]
-                else None
-            ),
-            "author": random.choice(AUTHORS),
-            "authorDate": conclusion_date,
-            "approver": random.choice(AUTHORS) if status == "Согласовано" and random.random() > 0.3 else None,
-            "approvalDate": random_date(
-                datetime.strptime(conclusion_date, "%Y-%m-%d"),
-                datetime.strptime(conclusion_date, "%Y-%m-%d") + timedelta(days=30)
-            ) if status == "Согласовано" and random.random() > 0.5 else None,
-            "conclusionText": f"Проведена оценка залогового имущества. Рыночная стоимость: {format(market_value, ',')} руб. Рекомендуется принять в качестве обеспечения.",
-            "recommendations": "Рекомендуется принять в качестве обеспечения с регулярным мониторингом." if random.random() > 0.5 else None,
-            "riskLevel": random.choice(RISK_LEVELS) if random.random() > 0.5 else None,
-            "notes": f"Примечания к заключению {i}" if random.random() > 0.7 else None,
+            return json.load(f)
+    return []
+
+def demo_photos(count: int) -> list:
+    """Фото (демо): первые два — фасадные"""
+    return [
+        {
+            "id": f"photo-{j}",
+            "url": f"https://via.placeholder.com/400x300?text=Photo+{j}",
+            "description": f"Фото {j} - {'фасадное' if j <= 2 else 'внутреннее'}",
+            "isMain": j <= 2,
+            "photoNumber": j,
         }
-        
-        conclusions.append(conclusion)
+        for j in range(1, count + 1)
+    ]
+
+def days_before(first: int, last: int = 0) -> Generator:
+    """random_date(дата заключения - first дней, дата заключения - last дней)"""
+    return lambda c: random_date(c["day"] - timedelta(days=first), c["day"] - timedelta(days=last))
+
+def days_after(last: int) -> Generator:
+    """random_date(дата заключения, дата заключения + last дней)"""
+    return lambda c: random_date(c["day"], c["day"] + timedelta(days=last))
+
+REVIEW_FIELDS = [
+    Field("id", const("review-1")),
+    Field("reviewer", choice(AUTHORS)),
+    Field("reviewerPosition", choice(["Главный оценщик", "Руководитель отдела", "Эксперт"])),
+    Field("reviewDate", days_after(10)),
+    Field("reviewText", const("Рецензия проведена. Заключение соответствует требованиям.")),
+    Field("conclusion", const("Одобрено")),
+    Field("compliance", const("Соответствует требованиям Федерального закона от 29.07.98 г. №135-ФЗ")),
+    Field(
+        "reportCompliance",
+        const(
+            "Отчет об оценке соответствует требованиям Федерального закона от 29.07.98 г. №135-ФЗ "
+            "«Об оценочной деятельности в Российской Федерации»"
+        ),
+        0.5,
+    ),
+]
+
+review_record = compile_record(REVIEW_FIELDS)
+
+def from_deal(name: str, key: str, demo: Generator) -> Field:
+    """Поле key сделки портфеля; без сделки — демо-значение"""
+    return let(name, lambda c: c["deal"].get(key) if c["deal"] else demo(c))
+
+def registration_record(c: Context) -> str:
+    return (
+        f"Запись № {random.randint(100000, 999999)}-{random.randint(1, 99)}/{random.randint(2020, 2024)}-"
+        f"{random.randint(1, 10)} от {random_date(c['day'] - timedelta(days=180), c['day'])}"
+    )
+
+def registration_document(c: Context) -> str:
+    return (
+        "Выписка из Единого государственного реестра недвижимости об объекте недвижимости "
+        f"№ {random.randint(99, 999)}/{random.randint(2020, 2024)}/{random.randint(100000000, 999999999)}"
+    )
+
+def collateral_description(c: Context) -> str:
+    return (
+        f"Предлагаемое в залог имущество расположено в {c['collateral_location']}, "
+        f"состояние имущества {c['collateral_condition'] or 'хорошее'}, "
+        f"перепланировки {'выявлены' if c['has_replanning'] else 'не выявлены'}."
+    )
+
+def special_opinion(c: Context) -> str:
+    condition = "внесения в ЕГРН сведений о кадастровых номерах" if c["land_cadastral"] else "подтверждения права собственности"
+    return (
+        f"Возможно рассмотреть в качестве залога при условии {condition}. "
+        f"Уровень ликвидности объекта: {c['liquidity'] or random.choice(LIQUIDITY_OPTIONS)}. "
+        f"{'Требуется снятие обременений.' if c['has_encumbrances'] else ''}"
+    )
+
+def is_approved(c: Context) -> bool:
+    return c["status"] == "Согласовано"
+
+CONCLUSION_FIELDS = [
+    # Связь с портфелем
+    let("deal", lambda c: random.choice(c["portfolio_data"]), when="portfolio_data"),
+    let("conclusion_date", lambda c: random_date(CONCLUSION_START, CONCLUSION_END)),
+    let("day", lambda c: datetime.strptime(c["conclusion_date"], "%Y-%m-%d")),
+    # Основные данные
+    let("conclusion_type", choice(CONCLUSION_TYPES)),
+    let("status", choice(STATUSES)),
+    let("collateral_type", choice(COLLATERAL_TYPES)),
+    let("is_real_estate", lambda c: "недвижимость" in c["collateral_type"].lower()),
+    # Данные из портфеля или случайные
+    from_deal("reference", "reference", lambda c: f"DEMO-{c['i']:04d}"),
+    from_deal("contract_number", "contractNumber", lambda c: f"DEM-2023-{1000 + c['i']}"),
+    from_deal("pledger", "pledger", lambda c: f"ООО «Демо {c['i']:03d}»"),
+    from_deal("pledger_inn", "inn", lambda c: f"{random.randint(1000000000, 9999999999)}"),
+    from_deal("borrower", "borrower", lambda c: f"ООО «Заемщик {c['i']:03d}»"),
+    # Кредитный продукт
+    let("credit_product", choice(CREDIT_PRODUCTS)),
+    let("credit_amount", randint(10000000, 500000000)),
+    let("credit_term", randint(12, 120)),
+    # Имущество
+    let("total_area_sqm", randint(50, 500), when="is_real_estate"),
+    let("total_area_hectares", lambda c: round(c["total_area_sqm"] / 100, 2), 0.5, when="total_area_sqm"),
+    let("objects_count", randint(1, 5)),
+    let("ownership_share", randint(50, 100)),
+    from_deal("collateral_location", "collateralLocation", lambda c: f"г. Москва, ул. Примерная, д. {c['i']}"),
+    # Земельный участок
+    let("land_cadastral", cadastral_number, 0.6, when="is_real_estate"),
+    let("land_category", choice(LAND_CATEGORIES), 0.6, when="is_real_estate"),
+    let("land_permitted_use", choice(PERMITTED_USES), 0.6, when="is_real_estate"),
+    let(
+        "land_area_sqm",
+        lambda c: int(c["total_area_sqm"] * random.uniform(1.5, 3.0)),
+        0.5,
+        when=lambda c: c["total_area_sqm"] and c["is_real_estate"],
+    ),
+    let("land_area_hectares", lambda c: round(c["land_area_sqm"] / 10000, 2), 0.5, when="land_area_sqm"),
+    # Оценка
+    let("market_value", randint(5000000, 300000000)),
+    let("collateral_value", lambda c: int(c["market_value"] * random.uniform(0.6, 0.9))),
+    let("fair_value", lambda c: int(c["market_value"] * random.uniform(0.85, 1.0))),
+    let("cadastral_value", lambda c: int(c["market_value"] * random.uniform(0.7, 0.9)), 0.5),
+    let("market_value_per_sqm", lambda c: int(c["market_value"] / c["total_area_sqm"]), 0.5, when="total_area_sqm"),
+    let("market_value_per_hectare", lambda c: int(c["market_value"] / c["total_area_hectares"]), 0.5, when="total_area_hectares"),
+    # Характеристики
+    let("category", choice(CATEGORIES), 0.7),
+    let("liquidity", choice(LIQUIDITY_OPTIONS), 0.7),
+    let("liquidity_fair_value", choice(LIQUIDITY_OPTIONS), 0.5),
+    let("liquidity_movable", choice(LIQUIDITY_OPTIONS), 0.5, when=lambda c: "транспорт" in c["collateral_type"].lower()),
+    # Состояние
+    let("collateral_condition", choice(CONDITIONS), 0.7),
+    let("has_replanning", choice([True, False]), 0.5),
+    let("replanning_found", const("Выявлены несущественные перепланировки"), 0.5, when="has_replanning"),
+    let("replanning_description", lambda c: c["replanning_found"] if c["has_replanning"] else "Перепланировки не выявлены"),
+    let("land_functional_provision", choice(["функционально обеспечивает", "не обеспечивает"]), 0.4, when="is_real_estate"),
+    let("collateral_description", collateral_description, 0.8),
+    # Обременения
+    let("has_encumbrances", choice([True, False]), 0.4),
+    let("encumbrances_description", const("Имеются зарегистрированные обременения. Требуется снятие обременений."), when="has_encumbrances"),
+    let(
+        "encumbrances_details",
+        const("Обременения не выявлены, имеются ограничения прав на часть земельного участка."),
+        0.5,
+        when="has_encumbrances",
+    ),
+    # Права на объект
+    let("ownership_basis", choice(["Право собственности", "Право аренды", "Право пользования земельным участком"]), 0.6),
+    let("ownership_documents", lambda c: f"Договор купли-продажи от {random_date(c['day'] - timedelta(days=365), c['day'])}", 0.5, when="ownership_basis"),
+    let("registration_record", registration_record, 0.5),
+    let("registration_document", registration_document, 0.4),
+    # Проверки
+    let("inspection_date", days_before(14, 1), 0.7),
+    let("inspector_name", choice(AUTHORS), when="inspection_date"),
+    let("bankruptcy_check_date", days_before(30), 0.5),
+    let("bankruptcy_check_result", const("Признаков банкротства не выявлено"), 0.7, when="bankruptcy_check_date"),
+    let("special_opinion", special_opinion, 0.7),
+    # Вкладки
+    let("suspensive_conditions", lambda c: generate_suspensive_conditions(), 0.5, otherwise=[]),
+    let(
+        "detailed_descriptions",
+        lambda c: generate_detailed_descriptions(c["collateral_type"], c["objects_count"], c["market_value"], c["collateral_value"]),
+        0.4,
+        when=lambda c: c["objects_count"] > 1,
+        otherwise=[],
+    ),
+    let("photos", lambda c: demo_photos(random.randint(2, 5)), 0.5, otherwise=[]),
+    let("review", lambda c: review_record({"day": c["day"]}), 0.3),
+    let("calculations", lambda c: generate_calculations(c["collateral_type"], c["market_value"]), 0.4, otherwise=[]),
+    # Запись
+    Field("id", lambda c: f"conclusion-{c['i']}"),
+    Field("conclusionNumber", lambda c: f"ЗК-{c['day'].year}-{c['i']:06d}"),
+    Field("conclusionDate", ref("conclusion_date")),
+    Field("reference", ref("reference")),
+    Field("contractNumber", ref("contract_number")),
+    Field("pledger", ref("pledger")),
+    Field("pledgerInn", ref("pledger_inn")),
+    Field("borrower", ref("borrower")),
+    Field("borrowerInn", lambda c: f"{random.randint(1000000000, 9999999999)}"),
+    Field("creditProduct", ref("credit_product")),
+    Field("creditAmount", ref("credit_amount")),
+    Field("creditTermMonths", ref("credit_term")),
+    Field("creditContractNumber", lambda c: f"КРД-{random.randint(10000, 99999)}", 0.5),
+    Field("collateralType", ref("collateral_type")),
+    Field("collateralName", lambda c: f"{c['collateral_type']} - объект 1"),
+    Field("collateralPurpose", lambda c: f"Использование в качестве {c['collateral_type'].lower()}"),
+    Field("totalAreaSqm", ref("total_area_sqm")),
+    Field("totalAreaHectares", ref("total_area_hectares")),
+    Field("collateralLocation", ref("collateral_location")),
+    Field("objectsCount", ref("objects_count")),
+    Field("ownershipShare", ref("ownership_share")),
+    Field("landCategory", ref("land_category")),
+    Field("landPermittedUse", ref("land_permitted_use")),
+    Field("landCadastralNumber", ref("land_cadastral")),
+    Field("landAreaSqm", ref("land_area_sqm")),
+    Field("landAreaHectares", ref("land_area_hectares")),
+    Field("marketValue", ref("market_value")),
+    Field("collateralValue", ref("collateral_value")),
+    Field("fairValue", ref("fair_value")),
+    Field("cadastralValue", ref("cadastral_value")),
+    Field("marketValuePerSqm", ref("market_value_per_sqm")),
+    Field("marketValuePerHectare", ref("market_value_per_hectare")),
+    Field("category", ref("category")),
+    Field("liquidity", ref("liquidity")),
+    Field("liquidityFairValue", ref("liquidity_fair_value")),
+    Field("liquidityMovable", ref("liquidity_movable")),
+    Field("collateralDescription", ref("collateral_description")),
+    Field("collateralCondition", ref("collateral_condition")),
+    Field("hasReplanning", ref("has_replanning")),
+    Field("replanningDescription", ref("replanning_description")),
+    Field("landFunctionalProvision", ref("land_functional_provision")),
+    Field("hasEncumbrances", ref("has_encumbrances")),
+    Field("encumbrancesDescription", ref("encumbrances_description")),
+    Field("encumbrancesDetails", ref("encumbrances_details")),
+    Field("ownershipBasis", ref("ownership_basis")),
+    Field("ownershipDocuments", ref("ownership_documents")),
+    Field("registrationRecord", ref("registration_record")),
+    Field("registrationDocument", ref("registration_document")),
+    Field("inspectionDate", ref("inspection_date")),
+    Field("inspectorName", ref("inspector_name")),
+    Field("bankruptcyCheckDate", ref("bankruptcy_check_date")),
+    Field("bankruptcyCheckResult", ref("bankruptcy_check_result")),
+    Field("specialOpinion", ref("special_opinion")),
+    Field("suspensiveConditions", lambda c: c["suspensive_conditions"] or None),
+    Field("detailedDescriptions", lambda c: c["detailed_descriptions"] or None),
+    Field("photos", lambda c: c["photos"] or None),
+    Field("review", ref("review")),
+    Field("calculations", lambda c: c["calculations"] or None),
+    Field("conclusionType", ref("conclusion_type")),
+    Field("status", ref("status")),
+    Field("statusColor", lambda c: STATUS_COLORS.get(c["status"])),
+    Field("author", choice(AUTHORS)),
+    Field("authorDate", ref("conclusion_date")),
+    Field("approver", choice(AUTHORS), 0.7, when=is_approved),
+    Field("approvalDate", days_after(30), 0.5, when=is_approved),
+    Field(
+        "conclusionText",
+        lambda c: (
+            f"Проведена оценка залогового имущества. Рыночная стоимость: {format(c['market_value'], ',')} руб. "
+            "Рекомендуется принять в качестве обеспечения."
+        ),
+    ),
+    Field("recommendations", const("Рекомендуется принять в качестве обеспечения с регулярным мониторингом."), 0.5),
+    Field("riskLevel", choice(RISK_LEVELS), 0.5),
+    Field("notes", lambda c: f"Примечания к заключению {c['i']}", 0.3),
+]
+
+conclusion_record = compile_record(CONCLUSION_FIELDS)
+
+def build_conclusion(i: int, portfolio_data: list) -> dict:
+    """Заключение №i (случайные значения — из общего генератора random)"""
+    return conclusion_record({"i": i, "portfolio_data": portfolio_data})
+
+def generate_conclusions(count: int = 50, portfolio_data: list = None) -> list:
+    """Генерация заключений"""
+    # Загружаем данные портфеля для связи, если их не передали
+    if portfolio_data is None:
+        portfolio_data = load_portfolio_data()
     
-    return conclusions
+    return [build_conclusion(i, portfolio_data) for i in range(1, count + 1)]
 
-def main():
-    """Основная функция"""
+def shard_seed(master_seed: int, shard: int) -> int:
+    """Seed шарда: зависит только от общего seed и номера шарда"""
+    digest = hashlib.blake2b(f"{master_seed}:{shard}".encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+def render_shard(portfolio_data: list, master_seed: int, shard: int, start: int, stop: int) -> str:
+    """Заключения start..stop-1 одного шарда — фрагмент JSON-массива в виде json.dump(indent=2)"""
+    random.seed(shard_seed(master_seed, shard))
+    return ",\n  ".join(
+        json.dumps(build_conclusion(i, portfolio_data), ensure_ascii=False, indent=2).replace("\n", "\n  ")
+        for i in range(start, stop)
+    )
+
+_shard_portfolio: list = []
+
+def init_shard_worker(portfolio_data: list) -> None:
+    # Портфель передается воркеру один раз при старте, задачи несут только границы шардов
+    global _shard_portfolio
+    _shard_portfolio = portfolio_data
+
+def render_shard_task(master_seed: int, shard: int, start: int, stop: int) -> str:
+    return render_shard(_shard_portfolio, master_seed, shard, start, stop)
+
+def iter_shards(
+    count: int, portfolio_data: list, master_seed: int, workers: int = 1, shard_size: int = SHARD_SIZE
+) -> Iterator[str]:
+    """
+    Фрагменты JSON по шардам из shard_size заключений, по порядку номеров.
+
+    У каждого шарда свой seed (shard_seed), поэтому результат зависит от
+    master_seed и shard_size, но не от числа воркеров. При workers > 1 шарды
+    строятся в пуле процессов, в работе не больше 2 * workers шардов.
+    """
+    bounds = [(shard, start, min(start + shard_size, count + 1)) for shard, start in enumerate(range(1, count + 1, shard_size))]
+    if workers <= 1 or len(bounds) <= 1:
+        # Общий генератор random переустанавливается на каждый шард; состояние вызывающего восстанавливается
+        state = random.getstate()
+        try:
+            for shard, start, stop in bounds:
+                yield render_shard(portfolio_data, master_seed, shard, start, stop)
+        finally:
+            random.setstate(state)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_shard_worker, initargs=(portfolio_data,)) as pool:
+        pending: Deque[Future] = deque()
+        for shard, start, stop in bounds:
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+            pending.append(pool.submit(render_shard_task, master_seed, shard, start, stop))
+        while pending:
+            yield pending.popleft().result()
+
+def write_shards(out: TextIO, shards: Iterable[str]) -> None:
+    """Склеивает фрагменты в массив, как его записал бы json.dump(conclusions, indent=2)"""
+    written = False
+    for text in shards:
+        out.write(",\n  " if written else "[\n  ")
+        out.write(text)
+        written = True
+    out.write("\n]" if written else "[]")
+
+def run(
+    portfolio_data: list = None,
+    count: int = 50,
+    workers: int = 1,
+    seed: Optional[int] = None,
+    shard_size: int = SHARD_SIZE,
+):
+    """Генерация и запись заключений; portfolio_data можно передать уже загруженным"""
     print("Генерация полных демо-данных для залоговых заключений...")
-    conclusions = generate_conclusions(50)
+    if portfolio_data is None:
+        portfolio_data = load_portfolio_data()
+    master_seed = seed if seed is not None else random.getrandbits(64)
     
     with OUTPUT_FILE.open("w", encoding="utf-8") as f:
-        json.dump(conclusions, f, ensure_ascii=False, indent=2)
+        write_shards(f, iter_shards(count, portfolio_data, master_seed, workers, shard_size))
     
-    print(f"✅ Данные залоговых заключений записаны: {OUTPUT_FILE} ({len(conclusions)} заключений)")
+    print(f"✅ Данные залоговых заключений записаны: {OUTPUT_FILE} ({count} заключений, seed {master_seed})")
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate full demo collateral conclusions (all ZZ tabs).")
+    parser.add_argument("--count", type=int, default=50, help="Число заключений.")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Число процессов для генерации шардов; 1 — в текущем процессе. На результат не влияет.",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Общий seed; seed каждого шарда выводится из него и номера шарда (по умолчанию — случайный).",
+    )
+    parser.add_argument(
+        "--shard-size",
+        type=int,
+        default=SHARD_SIZE,
+        help="Заключений в шарде. Входит в разбиение на seed, поэтому при другом размере данные другие.",
+    )
+    args = parser.parse_args(argv)
+    if args.shard_size < 1:
+        parser.error("--shard-size must be >= 1")
+    return args
+
+def main(argv: Optional[List[str]] = None):
+    """Основная функция"""
+    args = parse_args(argv)
+    run(None, args.count, args.workers, args.seed, args.shard_size)
 
 if __name__ == "__main__":
     main()
-
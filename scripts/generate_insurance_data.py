@@ -7,10 +7,23 @@ from typing import Any, Dict, List, Optional
 
 import pandas as pd
 
+from keyword_classifier import KeywordClassifier
+from source_cache import read_excel_cached
+
 INS_SOURCE = Path("INS") / "Страховой портфель.xlsx"
 PORTFOLIO_JSON = Path("public/portfolioData.json")
 OUTPUT_FILE = Path("public/insuranceData.json")
 
+# Тип застрахованного имущества по типу обеспечения сделки (демо-режим)
+PROPERTY_TYPE_CLASSIFIER: KeywordClassifier[str] = KeywordClassifier(
+    [
+        (["недвиж", "зем", "склад", "офис", "торгов"], "Недвижимость"),
+        (["транспорт", "авто", "грузовой", "легковой"], "Транспортные средства"),
+        (["техника", "оборуд"], "Движимое оборудование"),
+    ],
+    "Имущество",
+)
+
 
 def normalize_date(value: Any) -> Optional[str]:
     if pd.isna(value):
@@ -40,7 +53,7 @@ def load_portfolio() -> List[Dict[str, Any]]:
 def load_ins_source() -> Optional[pd.DataFrame]:
     if INS_SOURCE.exists():
         try:
-            return pd.read_excel(INS_SOURCE)
+            return read_excel_cached(INS_SOURCE)
         except Exception:
             return None
     return None
@@ -122,14 +135,7 @@ def build_demo_from_portfolio(portfolio: List[Dict[str, Any]]) -> List[Dict[str,
         # derive property fields from collateral info
         collateral_type = str(p.get("collateralType") or p.get("collateralCategory") or "")
         location = p.get("collateralLocation") or "г. Москва"
-        if any(k in collateral_type.lower() for k in ["недвиж", "зем", "склад", "офис", "торгов"]):
-            prop_type = "Недвижимость"
-        elif any(k in collateral_type.lower() for k in ["транспорт", "авто", "грузовой", "легковой"]):
-            prop_type = "Транспортные средства"
-        elif any(k in collateral_type.lower() for k in ["техника", "оборуд"]):
-            prop_type = "Движимое оборудование"
-        else:
-            prop_type = "Имущество"
+        prop_type = PROPERTY_TYPE_CLASSIFIER.classify(collateral_type)
         records.append(
             {
                 "policyNumber": f"POL-{100000+idx}",
@@ -150,8 +156,7 @@ def build_demo_from_portfolio(portfolio: List[Dict[str, Any]]) -> List[Dict[str,
     return records
 
 
-def main():
-    portfolio = load_portfolio()
+def run(portfolio: List[Dict[str, Any]]) -> None:
     df = load_ins_source()
     if df is not None and len(df) > 0:
         data = build_from_ins(df, portfolio)
@@ -164,6 +169,10 @@ def main():
     print(f"✅ Insurance dataset written: {OUTPUT_FILE} ({len(data)} records)")
 
 
+def main():
+    run(load_portfolio())
+
+
 if __name__ == "__main__":
     main()
 
@@ -1,13 +1,17 @@
 import argparse
+import itertools
 import json
 import math
 import random
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 
+import numpy as np
 import pandas as pd
 
+from source_cache import read_excel_cached
+
 
 SOURCE_FILE = Path("ZALOG") / "залоговый портфель.xlsx"
 OUTPUT_FILE = Path("public/portfolioData.json")
@@ -99,15 +103,52 @@ def normalize_value(value: Any) -> Optional[Any]:
     return value
 
 
+def normalize_floats(values: np.ndarray, numbers: np.ndarray) -> None:
+    """Заменяет в values целочисленные float на int (как normalize_value), на месте."""
+    integral = np.isfinite(numbers) & (np.floor(numbers) == numbers)
+    small = integral & (np.abs(numbers) < 2**63)
+    values[small] = numbers[small].astype(np.int64).astype(object)
+    big = integral & ~small
+    if big.any():
+        values[big] = [int(number) for number in numbers[big]]
+
+
+def normalize_column(series: pd.Series) -> List[Any]:
+    """Колоночный аналог normalize_value: столбец обрабатывается целиком по своему dtype."""
+    missing = series.isna().to_numpy()
+    if pd.api.types.is_datetime64_any_dtype(series):
+        values = series.dt.strftime("%Y-%m-%d").to_numpy(dtype=object)
+    elif pd.api.types.is_float_dtype(series):
+        numbers = series.to_numpy(dtype=float)
+        values = numbers.astype(object)
+        normalize_floats(values, numbers)
+    else:
+        values = series.to_numpy(dtype=object, copy=True)
+        if series.dtype == object and pd.api.types.infer_dtype(series, skipna=True) not in ("string", "integer", "boolean", "empty"):
+            # Смешанный столбец из Excel: типы ячеек определяем одним проходом map(type),
+            # дальше float-ы и даты обрабатываются векторно по маскам.
+            types = series.map(type)
+            is_float = ~missing & types.isin([float, np.float64]).to_numpy()
+            if is_float.any():
+                floats = values[is_float]
+                normalize_floats(floats, floats.astype(float))
+                values[is_float] = floats
+            is_date = ~missing & types.isin([pd.Timestamp, datetime]).to_numpy()
+            if is_date.any():
+                values[is_date] = [value.strftime("%Y-%m-%d") for value in values[is_date]]
+    values[missing] = None
+    return values.tolist()
+
+
+def records_from_frame(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    frame = df.reindex(columns=list(COLUMN_ALIASES))
+    columns = [normalize_column(frame.iloc[:, position]) for position in range(len(COLUMN_ALIASES))]
+    aliases = list(COLUMN_ALIASES.values())
+    return [dict(zip(aliases, row)) for row in zip(*columns)]
+
+
 def load_source_records() -> List[Dict[str, Any]]:
-    df = pd.read_excel(SOURCE_FILE)
-    records: List[Dict[str, Any]] = []
-    for row in df.to_dict("records"):
-        item: Dict[str, Any] = {}
-        for original, alias in COLUMN_ALIASES.items():
-            item[alias] = normalize_value(row.get(original))
-        records.append(item)
-    return records
+    return records_from_frame(read_excel_cached(SOURCE_FILE))
 
 
 def ensure_choices(records: List[Dict[str, Any]], key: str) -> List[Any]:
@@ -137,7 +178,7 @@ def rotating_pick(pool: List[Any], index: int) -> Any:
     return pool[index % len(pool)]
 
 
-def build_demo_rows(records: List[Dict[str, Any]], count: int = 100) -> List[Dict[str, Any]]:
+def iter_demo_rows(records: List[Dict[str, Any]], count: int = 100) -> Iterator[Dict[str, Any]]:
     segments = ensure_choices(records, "segment") or ["СРБ"]
     groups = ensure_choices(records, "group") or ["СВХ"]
     collateral_types = ensure_pool(ensure_choices(records, "collateralType"), "collateralType")
@@ -149,58 +190,194 @@ def build_demo_rows(records: List[Dict[str, Any]], count: int = 100) -> List[Dic
     start_date = datetime(2020, 1, 1)
     end_date = datetime(2024, 12, 31)
 
-    demo_rows: List[Dict[str, Any]] = []
     for idx in range(1, count + 1):
         collateral_type = rotating_pick(collateral_types, idx - 1)
         location = rotating_pick(locations, idx - 1)
-        demo_rows.append(
-            {
-                "segment": random.choice(segments),
-                "group": random.choice(groups),
-                "reference": f"DEMO-{idx:04d}",
-                "pledger": f"{random.choice(NAME_POOL)} {idx:02d}",
-                "inn": f"77{random.randint(10**8, 10**9 - 1)}",
-                "borrower": f"ООО «Демо {idx:03d}»",
-                "contractNumber": f"DEM-{2020 + idx % 5}-{1000 + idx}",
-                "contractDate": random_date(start_date, end_date),
-                "type": random.choice(["Кредит", "Овердрафт", "Гарантия"]),
-                "openDate": random_date(start_date, end_date),
-                "closeDate": random_date(start_date, end_date),
-                "debtRub": random_money(5_000_000, 150_000_000),
-                "limitRub": random_money(20_000_000, 250_000_000),
-                "overduePrincipal": random_money(0, 5_000_000),
-                "overdueInterest": random_money(0, 2_500_000),
-                "collateralReference": f"COLL-{idx:04d}",
-                "collateralContractNumber": f"ZL-{2020 + idx % 5}-{idx:05d}",
-                "collateralContractDate": random_date(start_date, end_date),
-                "collateralCategory": random.choice(["МСБ", "Крупный бизнес", "Сегмент ВЭД"]),
-                "collateralValue": random_money(15_000_000, 180_000_000),
-                "marketValue": random_money(15_000_000, 200_000_000),
-                "initialValuationDate": random_date(start_date, end_date),
-                "currentMarketValue": random_money(15_000_000, 200_000_000),
-                "currentValuationDate": random_date(start_date, end_date),
-                "fairValue": random_money(10_000_000, 150_000_000),
-                "collateralType": collateral_type,
-                "collateralPurpose": random.choice(
-                    ["Обеспечение оборотного капитала", "Развитие сети", "Инвестиции в проекты"]
-                ),
-                "collateralInfo": f"Демо описание предмета залога #{idx}",
-                "collateralLocation": location,
-                "liquidity": rotating_pick(liquidity_values, idx - 1),
-                "qualityCategory": rotating_pick(quality_values, idx - 1),
-                "registrationDate": random_date(start_date, end_date),
-                "priority": random.choice(["1", "2", "3"]),
-                "monitoringType": rotating_pick(monitoring_types, idx - 1),
-                "lastMonitoringDate": random_date(start_date, end_date),
-                "nextMonitoringDate": random_date(start_date, end_date),
-                "owner": f"Куратор Демо {idx:03d}",
-                "account9131": f"9131{random.randint(10**12, 10**13 - 1)}",
-            }
-        )
-    return demo_rows
-
-
-def parse_args() -> argparse.Namespace:
+        yield {
+            "segment": random.choice(segments),
+            "group": random.choice(groups),
+            "reference": f"DEMO-{idx:04d}",
+            "pledger": f"{random.choice(NAME_POOL)} {idx:02d}",
+            "inn": f"77{random.randint(10**8, 10**9 - 1)}",
+            "borrower": f"ООО «Демо {idx:03d}»",
+            "contractNumber": f"DEM-{2020 + idx % 5}-{1000 + idx}",
+            "contractDate": random_date(start_date, end_date),
+            "type": random.choice(["Кредит", "Овердрафт", "Гарантия"]),
+            "openDate": random_date(start_date, end_date),
+            "closeDate": random_date(start_date, end_date),
+            "debtRub": random_money(5_000_000, 150_000_000),
+            "limitRub": random_money(20_000_000, 250_000_000),
+            "overduePrincipal": random_money(0, 5_000_000),
+            "overdueInterest": random_money(0, 2_500_000),
+            "collateralReference": f"COLL-{idx:04d}",
+            "collateralContractNumber": f"ZL-{2020 + idx % 5}-{idx:05d}",
+            "collateralContractDate": random_date(start_date, end_date),
+            "collateralCategory": random.choice(["МСБ", "Крупный бизнес", "Сегмент ВЭД"]),
+            "collateralValue": random_money(15_000_000, 180_000_000),
+            "marketValue": random_money(15_000_000, 200_000_000),
+            "initialValuationDate": random_date(start_date, end_date),
+            "currentMarketValue": random_money(15_000_000, 200_000_000),
+            "currentValuationDate": random_date(start_date, end_date),
+            "fairValue": random_money(10_000_000, 150_000_000),
+            "collateralType": collateral_type,
+            "collateralPurpose": random.choice(
+                ["Обеспечение оборотного капитала", "Развитие сети", "Инвестиции в проекты"]
+            ),
+            "collateralInfo": f"Демо описание предмета залога #{idx}",
+            "collateralLocation": location,
+            "liquidity": rotating_pick(liquidity_values, idx - 1),
+            "qualityCategory": rotating_pick(quality_values, idx - 1),
+            "registrationDate": random_date(start_date, end_date),
+            "priority": random.choice(["1", "2", "3"]),
+            "monitoringType": rotating_pick(monitoring_types, idx - 1),
+            "lastMonitoringDate": random_date(start_date, end_date),
+            "nextMonitoringDate": random_date(start_date, end_date),
+            "owner": f"Куратор Демо {idx:03d}",
+            "account9131": f"9131{random.randint(10**12, 10**13 - 1)}",
+        }
+
+
+def build_demo_rows(records: List[Dict[str, Any]], count: int = 100) -> List[Dict[str, Any]]:
+    return list(iter_demo_rows(records, count))
+
+
+DEMO_START_DATE = np.datetime64("2020-01-01")
+DEMO_END_DATE = np.datetime64("2024-12-31")
+
+
+DEMO_DATE_TABLE = np.datetime_as_string(np.arange(DEMO_START_DATE, DEMO_END_DATE + 1), unit="D")
+
+
+def column_dates(rng: np.random.Generator, count: int) -> np.ndarray:
+    # Форматируем не миллион дат, а только ~1800 дней диапазона, и индексируем таблицу
+    return DEMO_DATE_TABLE[rng.integers(0, len(DEMO_DATE_TABLE), size=count)]
+
+
+def column_money(rng: np.random.Generator, count: int, low: int, high: int, step: int = 500_000) -> np.ndarray:
+    steps = (high - low + step - 1) // step
+    return low + rng.integers(0, steps, size=count) * step
+
+
+def column_choice(rng: np.random.Generator, count: int, values: List[Any]) -> np.ndarray:
+    pool = np.asarray(values, dtype=object)
+    return pool[rng.integers(0, len(pool), size=count)]
+
+
+def column_rotating(values: List[Any], count: int) -> np.ndarray:
+    pool = np.asarray(values, dtype=object)
+    return pool[np.arange(count) % len(pool)]
+
+
+def column_format(prefix: str, numbers: np.ndarray, width: int = 0, suffix: str = "") -> np.ndarray:
+    text = numbers.astype(str)
+    if width:
+        text = np.char.zfill(text, width)
+    return np.char.add(np.char.add(prefix, text), suffix)
+
+
+def build_demo_columns(records: List[Dict[str, Any]], count: int = 100, seed: int = 42) -> Dict[str, np.ndarray]:
+    """Колоночный аналог build_demo_rows: каждое поле генерируется одним массивом.
+
+    Результат зависит только от seed (numpy Generator), но не совпадает
+    с построчным движком, который использует модуль random.
+    """
+    segments = ensure_choices(records, "segment") or ["СРБ"]
+    groups = ensure_choices(records, "group") or ["СВХ"]
+    collateral_types = ensure_pool(ensure_choices(records, "collateralType"), "collateralType")
+    locations = ensure_pool(ensure_choices(records, "collateralLocation"), "collateralLocation")
+    liquidity_values = ensure_pool(ensure_choices(records, "liquidity"), "liquidity")
+    quality_values = ensure_pool(ensure_choices(records, "qualityCategory"), "qualityCategory")
+    monitoring_types = ensure_pool(ensure_choices(records, "monitoringType"), "monitoringType")
+
+    rng = np.random.default_rng(seed)
+    idx = np.arange(1, count + 1)
+    contract_year = 2020 + idx % 5
+
+    return {
+        "segment": column_choice(rng, count, segments),
+        "group": column_choice(rng, count, groups),
+        "reference": column_format("DEMO-", idx, 4),
+        "pledger": np.char.add(
+            np.char.add(column_choice(rng, count, NAME_POOL).astype(str), " "),
+            np.char.zfill(idx.astype(str), 2),
+        ),
+        "inn": column_format("77", rng.integers(10**8, 10**9, size=count)),
+        "borrower": column_format("ООО «Демо ", idx, 3, "»"),
+        "contractNumber": np.char.add(column_format("DEM-", contract_year, 0, "-"), (1000 + idx).astype(str)),
+        "contractDate": column_dates(rng, count),
+        "type": column_choice(rng, count, ["Кредит", "Овердрафт", "Гарантия"]),
+        "openDate": column_dates(rng, count),
+        "closeDate": column_dates(rng, count),
+        "debtRub": column_money(rng, count, 5_000_000, 150_000_000),
+        "limitRub": column_money(rng, count, 20_000_000, 250_000_000),
+        "overduePrincipal": column_money(rng, count, 0, 5_000_000),
+        "overdueInterest": column_money(rng, count, 0, 2_500_000),
+        "collateralReference": column_format("COLL-", idx, 4),
+        "collateralContractNumber": np.char.add(column_format("ZL-", contract_year, 0, "-"), np.char.zfill(idx.astype(str), 5)),
+        "collateralContractDate": column_dates(rng, count),
+        "collateralCategory": column_choice(rng, count, ["МСБ", "Крупный бизнес", "Сегмент ВЭД"]),
+        "collateralValue": column_money(rng, count, 15_000_000, 180_000_000),
+        "marketValue": column_money(rng, count, 15_000_000, 200_000_000),
+        "initialValuationDate": column_dates(rng, count),
+        "currentMarketValue": column_money(rng, count, 15_000_000, 200_000_000),
+        "currentValuationDate": column_dates(rng, count),
+        "fairValue": column_money(rng, count, 10_000_000, 150_000_000),
+        "collateralType": column_rotating(collateral_types, count),
+        "collateralPurpose": column_choice(
+            rng, count, ["Обеспечение оборотного капитала", "Развитие сети", "Инвестиции в проекты"]
+        ),
+        "collateralInfo": column_format("Демо описание предмета залога #", idx),
+        "collateralLocation": column_rotating(locations, count),
+        "liquidity": column_rotating(liquidity_values, count),
+        "qualityCategory": column_rotating(quality_values, count),
+        "registrationDate": column_dates(rng, count),
+        "priority": column_choice(rng, count, ["1", "2", "3"]),
+        "monitoringType": column_rotating(monitoring_types, count),
+        "lastMonitoringDate": column_dates(rng, count),
+        "nextMonitoringDate": column_dates(rng, count),
+        "owner": column_format("Куратор Демо ", idx, 3),
+        "account9131": column_format("9131", rng.integers(10**12, 10**13, size=count)),
+    }
+
+
+def iter_column_rows(columns: Dict[str, np.ndarray], chunk_size: int = 65_536) -> Iterator[Dict[str, Any]]:
+    """Материализует строки из колонок порциями, переводя значения в типы Python."""
+    keys = list(columns)
+    total = len(next(iter(columns.values()))) if columns else 0
+    for start in range(0, total, chunk_size):
+        chunk = [columns[key][start : start + chunk_size].tolist() for key in keys]
+        for values in zip(*chunk):
+            yield dict(zip(keys, values))
+
+
+def write_json_array(path: Path, rows: Iterable[Dict[str, Any]], indent: Optional[int] = 2) -> int:
+    """Пишет JSON-массив построчно, не собирая весь документ в памяти.
+
+    При indent=2 результат побайтно совпадает с json.dumps(list, indent=2);
+    при indent=None каждая запись пишется компактно на отдельной строке.
+    """
+    if indent is None:
+        dump_kwargs: Dict[str, Any] = {"separators": (",", ":")}
+        item_prefix = ""
+    else:
+        dump_kwargs = {"indent": indent}
+        item_prefix = " " * indent
+
+    count = 0
+    with path.open("w", encoding="utf-8") as f:
+        f.write("[")
+        for row in rows:
+            chunk = json.dumps(row, ensure_ascii=False, **dump_kwargs)
+            if item_prefix:
+                chunk = chunk.replace("\n", "\n" + item_prefix)
+            f.write(",\n" if count else "\n")
+            f.write(item_prefix + chunk)
+            count += 1
+        f.write("\n]" if count else "]")
+    return count
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Generate collateral portfolio dataset with demo entries.")
     parser.add_argument(
         "--demo-count",
@@ -214,20 +391,48 @@ def parse_args() -> argparse.Namespace:
         default=42,
         help="Базовое значение seed для генерации демо-данных (по умолчанию 42).",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--engine",
+        choices=["python", "numpy"],
+        default="python",
+        help="Движок генерации демо-сделок: построчный (python) или колоночный (numpy).",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Писать записи в файл потоково, не собирая весь портфель в памяти.",
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Компактный JSON без отступов (одна запись на строку); подразумевает --stream.",
+    )
+    return parser.parse_args(argv)
 
 
-def main() -> None:
-    args = parse_args()
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
     if args.demo_count <= 0:
         raise ValueError("demo-count должен быть больше нуля")
 
     random.seed(args.random_seed)
     real_records = load_source_records()
-    demo_records = build_demo_rows(real_records, args.demo_count)
-    all_records = real_records + demo_records
-
     OUTPUT_FILE.parent.mkdir(parents=True, exist_ok=True)
+
+    if args.engine == "numpy":
+        columns = build_demo_columns(real_records, args.demo_count, args.random_seed)
+        demo_rows: Iterable[Dict[str, Any]] = iter_column_rows(columns)
+    else:
+        demo_rows = iter_demo_rows(real_records, args.demo_count)
+
+    if args.stream or args.compact:
+        rows = itertools.chain(real_records, demo_rows)
+        saved = write_json_array(OUTPUT_FILE, rows, indent=None if args.compact else 2)
+        print(f"Saved {saved} rows to {OUTPUT_FILE}")
+        return
+
+    all_records = real_records + list(demo_rows)
+
     OUTPUT_FILE.write_text(json.dumps(all_records, ensure_ascii=False, indent=2), encoding="utf-8")
     print(f"Saved {len(all_records)} rows to {OUTPUT_FILE}")
 
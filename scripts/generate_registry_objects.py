@@ -3,11 +3,35 @@
 с характеристиками из справочника и связью с портфелем
 """
 
+import argparse
 import json
+import math
 import random
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
+
+import numpy as np
+
+from column_specs import (
+    Column,
+    build_columns,
+    build_rows,
+    choice,
+    codes,
+    const,
+    flags,
+    floats,
+    ints,
+    iso_dates,
+    labeled,
+    objects as column_objects,
+    optional,
+    ratio_of,
+    share_of,
+    when,
+)
+from id_allocator import Allocator, mixed_radix
 
 # Типы объектов из справочника
 OBJECT_TYPES = [
@@ -52,8 +76,54 @@ ORGANIZATIONS = ['ООО "Рога и Копыта"', 'ООО "Бизнес Гр
 # Статусы
 STATUSES = ['approved', 'editing', 'approved', 'approved']  # Больше approved для реалистичности
 
+# id объектов, адресов и участников (obj-NNNNNN) и кадастровые номера выдаются
+# аллокаторами (id_allocator): уникальны в пределах запуска без проверки повторов
+ID_DIGITS = 6
+IDS_PER_OBJECT = 4  # объект, адрес и до двух участников
+CADASTRAL_RADIXES = (90, 99, 9000000, 9000)
+
+
+class RegistryCodes:
+    def __init__(self, seed: int, count: int = 0):
+        digits = ID_DIGITS
+        while 9 * 10 ** (digits - 1) < IDS_PER_OBJECT * count:
+            digits += 1
+        self.id_base = 10 ** (digits - 1)
+        self.ids = Allocator(9 * self.id_base, seed, 'id')
+        self.cadastral = Allocator(math.prod(CADASTRAL_RADIXES), seed, 'cadastral')
+
+    def object_id(self) -> str:
+        return f"obj-{self.id_base + self.ids.next()}"
+
+    def object_ids(self, count: int) -> List[str]:
+        return [f"obj-{number}" for number in (self.ids.take(count) + self.id_base).tolist()]
+
+    def cadastral_number(self) -> str:
+        return format_cadastral(*mixed_radix(self.cadastral.next(), CADASTRAL_RADIXES))
+
+    def cadastral_numbers(self, count: int) -> List[str]:
+        digits = (column.tolist() for column in mixed_radix(self.cadastral.take(count), CADASTRAL_RADIXES))
+        return [format_cadastral(*parts) for parts in zip(*digits)]
+
+
+def format_cadastral(region: int, district: int, block: int, number: int) -> str:
+    """Номер аллокатора в разрядах CADASTRAL_RADIXES -> 77:01:1234567:1234"""
+    return f"{10 + region}:{1 + district:02d}:{1000000 + block}:{1000 + number}"
+
+
+CODES = RegistryCodes(random.getrandbits(64))
+
+
+def reset_codes(seed: Optional[int], count: int) -> None:
+    """Новые аллокаторы на запуск генерации; без seed — случайные"""
+    global CODES
+    CODES = RegistryCodes(random.getrandbits(64) if seed is None else seed, count)
+
 def generate_id():
-    return f"obj-{random.randint(100000, 999999)}"
+    return CODES.object_id()
+
+def generate_cadastral_number():
+    return CODES.cadastral_number()
 
 def generate_inn(legal: bool = False):
     if legal:
@@ -84,7 +154,7 @@ def generate_address(obj_type: Dict[str, Any]) -> Dict[str, Any]:
     if apartment:
         full_address_parts.append(f"кв. {apartment}")
     
-    cadastral = f"{random.randint(10, 99)}:{random.randint(1, 99):02d}:{random.randint(1000000, 9999999)}:{random.randint(1000, 9999)}"
+    cadastral = generate_cadastral_number()
     
     return {
         'id': generate_id(),
@@ -213,7 +283,7 @@ def generate_characteristics(obj_type: Dict[str, Any]) -> Dict[str, Any]:
         chars['wallMaterial'] = random.choice(['Кирпич', 'Газобетон', 'Дерево', 'Каркасный', 'Монолит'])
         chars['utilities'] = random.choice(['Все', 'Частично', 'Отсутствуют'])
         chars['heating'] = random.choice(['Центральное', 'Газовое', 'Электрическое', 'Печное'])
-        chars['landCadastralNumber'] = f"{random.randint(10, 99)}:{random.randint(1, 99):02d}:{random.randint(1000000, 9999999)}:{random.randint(1000, 9999)}"
+        chars['landCadastralNumber'] = generate_cadastral_number()
         chars['landCategory'] = random.choice(['Земли населенных пунктов', 'Земли сельхозназначения'])
         
     elif key == 'office':
@@ -352,7 +422,7 @@ def generate_characteristics(obj_type: Dict[str, Any]) -> Dict[str, Any]:
         chars['carWash'] = random.choice([True, False])
         chars['shop'] = random.choice([True, False])
         chars['cafe'] = random.choice([True, False])
-        chars['landCadastralNumber'] = f"{random.randint(10, 99)}:{random.randint(1, 99):02d}:{random.randint(1000000, 9999999)}:{random.randint(1000, 9999)}"
+        chars['landCadastralNumber'] = generate_cadastral_number()
         chars['landCategory'] = random.choice(['Земли населенных пунктов', 'Земли промназначения'])
         
     elif key == 'car_dealership':
@@ -473,25 +543,34 @@ def generate_object_name(obj_type: Dict[str, Any], index: int) -> str:
     else:
         return f"{level1}, {random.choice(STREETS)}, д. {random.randint(1, 100)}"
 
+def portfolio_references(portfolio: List[Dict[str, Any]]) -> List[str]:
+    """REFERENCE сделок портфеля для связи объектов с договорами"""
+    return [str(item.get('reference', '')) for item in portfolio if item.get('reference')]
+
 def load_portfolio_references() -> List[str]:
     """Загружает REFERENCE из портфеля для связи объектов с договорами"""
     try:
         portfolio_file = Path("public/portfolioData.json")
         if portfolio_file.exists():
             with open(portfolio_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                references = [str(item.get('reference', '')) for item in data if item.get('reference')]
-                return references
+                return portfolio_references(json.load(f))
     except Exception as e:
         print(f"Ошибка загрузки портфеля: {e}")
     return []
 
-def generate_objects(count: int = 300) -> List[Dict[str, Any]]:
+def generate_objects(
+    count: int = 300, portfolio_refs: Optional[List[str]] = None, seed: Optional[int] = None
+) -> List[Dict[str, Any]]:
     """
     Генерирует объекты всех типов из справочника.
     Гарантирует, что каждый тип объекта представлен минимум несколько раз.
+    Если portfolio_refs не переданы, они читаются из portfolioData.json.
     """
-    portfolio_refs = load_portfolio_references()
+    if seed is not None:
+        random.seed(seed)
+    reset_codes(seed, count)
+    if portfolio_refs is None:
+        portfolio_refs = load_portfolio_references()
     objects = []
     
     # Гарантируем минимум по 5 объектов каждого типа
@@ -549,25 +628,649 @@ def generate_objects(count: int = 300) -> List[Dict[str, Any]]:
     
     return objects
 
-def main():
-    print("Генерация 300 объектов для реестра (все типы из справочника)...")
-    objects = generate_objects(300)
+# Пакетная генерация (--engine numpy): объекты группируются по типу, и каждая
+# колонка характеристик строится numpy сразу для всей группы (column_specs).
+# Состав и порядок полей те же, что у generate_characteristics и соседей.
+
+MIN_PER_TYPE = 5
+MOVABLE_KEYS = ['car_passenger', 'car_truck', 'equipment', 'machinery']
+APARTMENT_KEYS = ['apartment', 'room', 'office', 'retail']
+VIN_ALPHABET = '0123456789ABCDEFGHJKLMNPRSTUVWXYZ'
+CAR_BRANDS = ['Toyota', 'BMW', 'Mercedes-Benz', 'Audi', 'Volkswagen', 'Lada', 'Hyundai', 'Kia']
+CAR_MODELS = ['Camry', 'X5', 'E-Class', 'A6', 'Passat', 'Granta', 'Solaris', 'Rio']
+
+
+def object_ids() -> Column:
+    return lambda rng, size, columns: column_objects(CODES.object_ids(size))
+
+
+def cadastral_numbers() -> Column:
+    """Кадастровые номера вида 77:01:1234567:1234"""
+    return lambda rng, size, columns: column_objects(CODES.cadastral_numbers(size))
+
+
+DATES = iso_dates(datetime(2023, 1, 1), datetime(2024, 12, 31))
+
+COMMON_COLUMNS: Dict[str, Column] = {
+    'marketValue': ints(1000000, 50000000),
+    'collateralValue': share_of('marketValue', 0.5, 0.8),
+    'fairValue': share_of('marketValue', 0.7, 0.9),
+    'category': choice('Основной', 'Формальный'),
+    'liquidity': choice(
+        'высокая (срок реализации до 90 дней)',
+        'удовлетворительная (срок реализации до 365 дней)',
+        'низкая (срок реализации свыше 365 дней)',
+        'малоудовлетворительная'
+    ),
+    'collateralCondition': choice('хорошее', 'удовлетворительное', 'неудовлетворительное'),
+}
+
+TYPE_COLUMNS: Dict[str, Dict[str, Column]] = {
+    'apartment': {
+        'totalAreaSqm': floats(30, 150),
+        'livingArea': share_of('totalAreaSqm', 0.6, 0.8, 1),
+        'kitchenArea': share_of('totalAreaSqm', 0.1, 0.15, 1),
+        'floor': ints(1, 25),
+        'totalFloors': ints(5, 25),
+        'roomsCount': ints(1, 5),
+        'separateBathrooms': ints(1, 2),
+        'balcony': flags(),
+        'ceilingHeight': floats(2.5, 3.2),
+        'buildYear': ints(1950, 2023),
+        'wallMaterial': choice('Кирпич', 'Панель', 'Монолит', 'Блочный', 'Дерево'),
+        'hasReplanning': flags(),
+    },
+    'room': {
+        'totalAreaSqm': floats(15, 30),
+        'livingArea': share_of('totalAreaSqm', 0.8, 0.95, 1),
+        'floor': ints(1, 10),
+        'totalFloors': ints(3, 10),
+        'ceilingHeight': floats(2.5, 3.0),
+        'buildYear': ints(1950, 2023),
+        'wallMaterial': choice('Кирпич', 'Панель', 'Блочный'),
+        'hasReplanning': flags(),
+    },
+    'house': {
+        'totalAreaSqm': floats(100, 400),
+        'landAreaHectares': floats(0.05, 0.5, 2),
+        'floors': ints(1, 3),
+        'roomsCount': ints(3, 10),
+        'buildYear': ints(1950, 2023),
+        'wallMaterial': choice('Кирпич', 'Газобетон', 'Дерево', 'Каркасный', 'Монолит'),
+        'utilities': choice('Все', 'Частично', 'Отсутствуют'),
+        'heating': choice('Центральное', 'Газовое', 'Электрическое', 'Печное'),
+        'landCadastralNumber': cadastral_numbers(),
+        'landCategory': choice('Земли населенных пунктов', 'Земли сельхозназначения'),
+    },
+    'office': {
+        'totalAreaSqm': floats(50, 500),
+        'floor': ints(1, 30),
+        'totalFloors': ints(5, 30),
+        'buildingClass': choice('A+', 'A', 'B+', 'B', 'C'),
+        'planning': choice('Открытая', 'Кабинетная', 'Смешанная', 'Свободная'),
+        'finishing': choice('Без отделки', 'Черновая', 'Предчистовая', 'Чистовая'),
+        'ceilingHeight': floats(2.7, 4.0),
+        'parking': flags(),
+        'parkingSpaces': when('parking', ints(0, 10)),
+        'buildYear': ints(1980, 2023),
+        'wallMaterial': choice('Кирпич', 'Монолит', 'Железобетон', 'Панель'),
+        'ceilingMaterial': choice('Железобетонные плиты', 'Монолитные', 'Смешанные'),
+        'structuralCondition': choice('Хорошее', 'Удовлетворительное', 'Неудовлетворительное'),
+        'finishLevel': choice('Без отделки', 'Черновая', 'Предчистовая', 'Чистовая', 'Типовой ремонт'),
+        'finishCondition': choice('Хорошее', 'Удовлетворительное', 'Неудовлетворительное'),
+        'hasElectricity': const(True),
+        'hasWaterSupply': flags(),
+        'hasSewerage': flags(),
+        'hasGasSupply': flags(),
+        'hasSecurityAlarm': flags(),
+        'hasFireAlarm': const(True),
+        'hasVideoSurveillance': flags(),
+        'replanning': choice('Перепланировки не выявлены', 'Не осуществлялись'),
+        'ownershipRight': const('Право собственности'),
+        'ownershipShare': const('1/1'),
+        'isUnfinishedConstruction': const(False),
+        'ownershipBasis': const('Право собственности, на основании следующих документов: Договор купли-продажи'),
+        'technicalDocument': const('Выписка из Единого государственного реестра недвижимости об объекте'),
+        'hasEncumbrances': flags(),
+        'bookValue': share_of('marketValue', 0.3, 0.7),
+    },
+    'retail': {
+        'totalAreaSqm': floats(30, 300),
+        'tradingArea': share_of('totalAreaSqm', 0.7, 0.9, 1),
+        'floor': ints(1, 5),
+        'entrance': choice('Отдельный', 'Общий'),
+        'showcaseLength': floats(3, 20),
+        'ceilingHeight': floats(2.7, 4.5),
+        'ventilation': choice('Естественная', 'Приточная', 'Приточно-вытяжная'),
+        'parking': flags(),
+        'buildYear': ints(1980, 2023),
+        'wallMaterial': choice('Кирпич', 'Монолит', 'Панель'),
+        'ceilingMaterial': choice('Железобетонные плиты', 'Монолитные'),
+        'structuralCondition': choice('Хорошее', 'Удовлетворительное', 'Неудовлетворительное'),
+        'finishLevel': choice('Типовой ремонт', 'Требуется косметический ремонт', 'Чистовая'),
+        'finishCondition': choice('Хорошее', 'Удовлетворительное'),
+        'hasElectricity': const(True),
+        'hasWaterSupply': const(True),
+        'hasSewerage': const(True),
+        'hasGasSupply': flags(),
+        'hasSecurityAlarm': const(True),
+        'hasFireAlarm': const(True),
+        'hasVideoSurveillance': const(True),
+        'replanning': choice('Перепланировки не выявлены', 'Не осуществлялись'),
+        'ownershipRight': const('Право собственности'),
+        'ownershipShare': const('1/1'),
+        'isUnfinishedConstruction': const(False),
+        'ownershipBasis': const('Право собственности, на основании следующих документов: Договор купли-продажи'),
+        'technicalDocument': const('Выписка из Единого государственного реестра недвижимости об объекте'),
+        'hasEncumbrances': flags(),
+        'bookValue': share_of('marketValue', 0.3, 0.7),
+    },
+    'warehouse': {
+        'totalAreaSqm': floats(500, 10000),
+        'storageArea': share_of('totalAreaSqm', 0.8, 0.95, 1),
+        'ceilingHeight': floats(6, 15),
+        'totalFloors': ints(1, 3),
+        'warehouseClass': choice('A', 'A+', 'B', 'B+', 'C', 'D'),
+        'gates': choice('Докового типа', 'На нулевой отметке', 'Смешанные'),
+        'gatesCount': ints(2, 20),
+        'flooring': choice('Бетон', 'Асфальт', 'Полимер', 'Плитка'),
+        'loadCapacity': floats(3, 10),
+        'heating': flags(),
+        'ramp': flags(),
+        'buildYear': ints(1990, 2023),
+        'wallMaterial': choice('Железобетон', 'Металлический', 'Кирпич'),
+        'ceilingMaterial': choice('Железобетонные плиты', 'Металлические'),
+        'structuralCondition': choice('Хорошее', 'Удовлетворительное', 'Неудовлетворительное'),
+        'finishLevel': choice('Без отделки', 'Черновая'),
+        'finishCondition': choice('Удовлетворительное', 'Хорошее'),
+        'hasElectricity': const(True),
+        'hasWaterSupply': flags(),
+        'hasSewerage': flags(),
+        'hasGasSupply': flags(),
+        'hasSecurityAlarm': const(True),
+        'hasFireAlarm': const(True),
+        'hasVideoSurveillance': const(True),
+        'replanning': choice('Перепланировки не выявлены', 'Не осуществлялись'),
+        'ownershipRight': const('Право собственности'),
+        'ownershipShare': const('1/1'),
+        'isUnfinishedConstruction': const(False),
+        'ownershipBasis': const('Право собственности, на основании следующих документов: Договор купли-продажи'),
+        'technicalDocument': const('Выписка из Единого государственного реестра недвижимости об объекте'),
+        'hasEncumbrances': flags(),
+        'bookValue': share_of('marketValue', 0.3, 0.7),
+    },
+    'hotel': {
+        'totalAreaSqm': floats(500, 5000),
+        'roomsCount': ints(10, 100),
+        'floors': ints(2, 10),
+        'buildingClass': choice('A+', 'A', 'B+', 'B', 'C'),
+        'buildYear': ints(1990, 2023),
+        'wallMaterial': choice('Кирпич', 'Монолит', 'Железобетон'),
+        'ceilingMaterial': choice('Железобетонные плиты', 'Монолитные'),
+        'structuralCondition': choice('Хорошее', 'Удовлетворительное'),
+        'hasElectricity': const(True),
+        'hasWaterSupply': const(True),
+        'hasSewerage': const(True),
+        'hasFireAlarm': const(True),
+        'hasVideoSurveillance': const(True),
+    },
+    'catering': {
+        'totalAreaSqm': floats(50, 500),
+        'tradingArea': share_of('totalAreaSqm', 0.6, 0.8, 1),
+        'floor': ints(1, 3),
+        'seatsCount': ints(20, 200),
+        'ceilingHeight': floats(2.7, 4.0),
+        'ventilation': choice('Приточно-вытяжная', 'Приточная'),
+        'buildYear': ints(1980, 2023),
+        'wallMaterial': choice('Кирпич', 'Монолит', 'Панель'),
+        'hasElectricity': const(True),
+        'hasWaterSupply': const(True),
+        'hasSewerage': const(True),
+        'hasGasSupply': const(True),
+        'hasFireAlarm': const(True),
+    },
+    'gas_station': {
+        'landAreaSqm': floats(1000, 5000),
+        'buildingArea': floats(50, 200),
+        'dispensersCount': ints(2, 12),
+        'tanksVolume': floats(20, 100),
+        'fuelTypes': ints(2, 5),
+        'carWash': flags(),
+        'shop': flags(),
+        'cafe': flags(),
+        'landCadastralNumber': cadastral_numbers(),
+        'landCategory': choice('Земли населенных пунктов', 'Земли промназначения'),
+    },
+    'car_dealership': {
+        'totalAreaSqm': floats(500, 3000),
+        'showroomArea': share_of('totalAreaSqm', 0.4, 0.6, 1),
+        'serviceArea': share_of('totalAreaSqm', 0.3, 0.5, 1),
+        'floors': ints(1, 3),
+        'parkingSpaces': ints(10, 50),
+        'buildYear': ints(2000, 2023),
+        'wallMaterial': choice('Кирпич', 'Металлический', 'Железобетон'),
+        'hasElectricity': const(True),
+        'hasWaterSupply': const(True),
+        'hasSewerage': const(True),
+        'hasFireAlarm': const(True),
+        'hasVideoSurveillance': const(True),
+    },
+    'industrial_building': {
+        'totalAreaSqm': floats(1000, 20000),
+        'ceilingHeight': floats(6, 20),
+        'floors': ints(1, 5),
+        'loadCapacity': floats(5, 20),
+        'buildYear': ints(1970, 2023),
+        'wallMaterial': choice('Железобетон', 'Металлический', 'Кирпич'),
+        'ceilingMaterial': choice('Железобетонные плиты', 'Металлические'),
+        'structuralCondition': choice('Хорошее', 'Удовлетворительное', 'Неудовлетворительное'),
+        'hasElectricity': const(True),
+        'hasWaterSupply': flags(),
+        'hasSewerage': flags(),
+        'hasFireAlarm': const(True),
+    },
+    'workshop': {
+        'totalAreaSqm': floats(200, 2000),
+        'ceilingHeight': floats(4, 10),
+        'loadCapacity': floats(3, 10),
+        'buildYear': ints(1980, 2023),
+        'wallMaterial': choice('Железобетон', 'Металлический', 'Кирпич'),
+        'structuralCondition': choice('Хорошее', 'Удовлетворительное'),
+        'hasElectricity': const(True),
+        'hasWaterSupply': flags(),
+        'hasSewerage': flags(),
+        'hasFireAlarm': const(True),
+    },
+    'car_passenger': {
+        'brand': choice(*CAR_BRANDS),
+        'model': choice(*CAR_MODELS),
+        'year': ints(2015, 2023),
+        'vin': codes(VIN_ALPHABET, 17),
+        'engineVolume': floats(1.5, 4.0),
+        'enginePower': ints(100, 400),
+        'fuelType': choice('Бензин', 'Дизель', 'Гибрид', 'Электрический'),
+        'transmission': choice('Автоматическая', 'Механическая', 'Робот', 'Вариатор'),
+        'mileage': ints(0, 200000),
+        'color': choice('Белый', 'Черный', 'Серебристый', 'Серый', 'Синий', 'Красный'),
+        'condition': choice('Отличное', 'Хорошее', 'Удовлетворительное'),
+    },
+    'equipment': {
+        'manufacturer': choice('Caterpillar', 'Komatsu', 'Volvo', 'Liebherr', 'Hitachi'),
+        'model': labeled('Model-{}', 100, 999),
+        'year': ints(2010, 2023),
+        'serialNumber': labeled('SN{}', 100000, 999999),
+        'condition': choice('Отличное', 'Хорошее', 'Удовлетворительное'),
+        'operatingHours': ints(0, 10000),
+    },
+}
+TYPE_COLUMNS['car_truck'] = TYPE_COLUMNS['car_passenger']
+TYPE_COLUMNS['machinery'] = TYPE_COLUMNS['equipment']
+
+STREET_HOUSE = [choice(*STREETS), ints(1, 100)]
+
+# Названия: (шаблон, колонки для подстановки); {level1} — тип из справочника
+NAME_COLUMNS = {
+    'apartment': ('{}-комнатная квартира, {}, д. {}', [ints(1, 5)] + STREET_HOUSE),
+    'room': ('Комната, {}, д. {}, кв. {}', STREET_HOUSE + [ints(1, 200)]),
+    'house': ('Жилой дом с участком, {}, д. {}', STREET_HOUSE),
+    'townhouse': ('Таунхаус, {}, д. {}', STREET_HOUSE),
+    'land_residential': ('Земельный участок под ИЖС, {}, уч. {}', STREET_HOUSE),
+    'office': ('Офисное помещение, {}, д. {}, пом. {}', STREET_HOUSE + [ints(100, 500)]),
+    'retail': ('Торговое помещение, {}, д. {}', STREET_HOUSE),
+    'warehouse': ('Складской комплекс, {}, д. {}', STREET_HOUSE),
+    'hotel': ('Гостиница, {}, д. {}', STREET_HOUSE),
+    'catering': ('Кафе/Ресторан, {}, д. {}', STREET_HOUSE),
+    'gas_station': ('АЗС, {}, д. {}', STREET_HOUSE),
+    'car_dealership': ('Автосалон, {}, д. {}', STREET_HOUSE),
+    'industrial_building': ('Производственное здание, {}, д. {}', STREET_HOUSE),
+    'workshop': ('Цех, {}, д. {}', STREET_HOUSE),
+    'car_passenger': ('{} {} {}', [choice(*CAR_BRANDS[:6]), choice(*CAR_MODELS[:6]), ints(2015, 2023)]),
+    'equipment': ('{level1}, {} Model-{}', [choice('Caterpillar', 'Komatsu', 'Volvo'), ints(100, 999)]),
+}
+NAME_COLUMNS['car_truck'] = NAME_COLUMNS['car_passenger']
+NAME_COLUMNS['machinery'] = NAME_COLUMNS['equipment']
+DEFAULT_NAME = ('{level1}, {}, д. {}', STREET_HOUSE)
+
+ADDRESS_COLUMNS: Dict[str, Column] = {
+    'id': object_ids(),
+    'region': choice(*REGIONS),
+    'city': choice(*CITIES),
+    'street': choice(*STREETS),
+    'house': labeled('{}', 1, 100),
+    'hasBuilding': flags(),
+    'building': when('hasBuilding', labeled('{}', 1, 5), None),
+    'apartment': labeled('{}', 1, 200),
+    'postalCode': labeled('{}', 100000, 999999),
+    'cadastralNumber': cadastral_numbers(),
+}
+
+PARTNER_COLUMNS: Dict[str, Column] = {
+    'id': object_ids(),
+    'role': choice('owner', 'pledgor'),
+    'organizationName': choice(*ORGANIZATIONS),
+    'legalInn': labeled('{}', 1000000000, 9999999999),
+    'lastName': choice(*LAST_NAMES),
+    'firstName': choice(*FIRST_NAMES),
+    'middleName': choice(*MIDDLE_NAMES),
+    'inn': labeled('{}', 100000000000, 999999999999),
+    'createdAt': DATES,
+    'updatedAt': DATES,
+}
+
+OBJECT_COLUMNS: Dict[str, Column] = {
+    'id': object_ids(),
+    'status': choice(*STATUSES),
+    'createdAt': DATES,
+    'linked': flags(0.7),
+    'contractYear': ints(2020, 2024),
+    'contractSerial': ints(1000, 9999),
+}
+
+
+def characteristic_columns(key: str) -> Dict[str, Column]:
+    """Колонки characteristics для типа key (порядок ключей как в generate_characteristics)"""
+    spec = dict(COMMON_COLUMNS)
+    spec.update(TYPE_COLUMNS.get(key, {}))
+    if key not in MOVABLE_KEYS:
+        spec['ownershipShare'] = choice(100, 50, 33, 25)
+        spec['hasEncumbrances'] = flags()
+        spec['encumbrancesDescription'] = optional('hasEncumbrances', 'Ипотека, аренда')
+        spec.setdefault('buildYear', ints(1950, 2023))
+        spec['cadastralValue'] = share_of('marketValue', 0.3, 0.7)
+        if 'totalAreaSqm' in spec:
+            spec['marketValuePerSqm'] = ratio_of('marketValue', 'totalAreaSqm')
+    return spec
+
+
+def column_lists(spec: Dict[str, Column], rng: np.random.Generator, size: int) -> Dict[str, List[Any]]:
+    return {name: values.tolist() for name, values in build_columns(spec, rng, size).items()}
+
+
+def object_names(obj_type: Dict[str, Any], rng: np.random.Generator, size: int) -> List[str]:
+    template, spec = NAME_COLUMNS.get(obj_type['key'], DEFAULT_NAME)
+    parts = [column(rng, size, {}).tolist() for column in spec]
+    return [template.format(*values, level1=obj_type['level1']) for values in zip(*parts)]
+
+
+def address_rows(rng: np.random.Generator, size: int, with_apartment: bool) -> List[Dict[str, Any]]:
+    columns = column_lists(ADDRESS_COLUMNS, rng, size)
+    apartments = columns['apartment'] if with_apartment else [None] * size
+    rows = []
+    for address_id, region, city, street, house, building, apartment, postal_code, cadastral in zip(
+        columns['id'], columns['region'], columns['city'], columns['street'], columns['house'],
+        columns['building'], apartments, columns['postalCode'], columns['cadastralNumber'],
+    ):
+        full_address_parts = [region, city, street, f"д. {house}"]
+        if building:
+            full_address_parts.append(f"к. {building}")
+        if apartment:
+            full_address_parts.append(f"кв. {apartment}")
+        rows.append({
+            'id': address_id,
+            'region': region,
+            'city': city,
+            'street': street,
+            'house': house,
+            'building': building,
+            'apartment': apartment,
+            'postalCode': postal_code,
+            'fullAddress': ', '.join(full_address_parts),
+            'cadastralNumber': cadastral,
+        })
+    return rows
+
+
+def individual_partner(columns: Dict[str, List[Any]], i: int, share: int) -> Dict[str, Any]:
+    return {
+        'id': columns['id'][i],
+        'type': 'individual',
+        'role': 'owner',
+        'lastName': columns['lastName'][i],
+        'firstName': columns['firstName'][i],
+        'middleName': columns['middleName'][i],
+        'inn': columns['inn'][i],
+        'share': share,
+        'showInRegistry': True,
+        'createdAt': columns['createdAt'][i],
+        'updatedAt': columns['updatedAt'][i],
+    }
+
+
+def partner_lists(rng: np.random.Generator, size: int) -> List[List[Dict[str, Any]]]:
+    """Как generate_partners: юрлицо, один владелец или 30% долевой собственности 50/50"""
+    legal = rng.random(size) < 0.5
+    shared = ~legal & (rng.random(size) < 0.3)
+    first = column_lists(PARTNER_COLUMNS, rng, size)
+    second = column_lists(PARTNER_COLUMNS, rng, int(shared.sum()))
+    lists = []
+    co_owner = 0
+    for i, (is_legal, is_shared) in enumerate(zip(legal.tolist(), shared.tolist())):
+        if is_legal:
+            lists.append([{
+                'id': first['id'][i],
+                'type': 'legal',
+                'role': first['role'][i],
+                'organizationName': first['organizationName'][i],
+                'inn': first['legalInn'][i],
+                'share': 100,
+                'showInRegistry': True,
+                'createdAt': first['createdAt'][i],
+                'updatedAt': first['updatedAt'][i],
+            }])
+        elif is_shared:
+            lists.append([individual_partner(first, i, 50), individual_partner(second, co_owner, 50)])
+            co_owner += 1
+        else:
+            lists.append([individual_partner(first, i, 100)])
+    return lists
+
+
+def generate_objects_batched(
+    count: int = 300, portfolio_refs: Optional[List[str]] = None, seed: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    То же, что generate_objects, но по колонкам: тип, набор и порядок полей и
+    распределения значений совпадают, а случайная последовательность своя
+    (numpy.random.Generator с seed), поэтому объекты другие.
+    """
+    if portfolio_refs is None:
+        portfolio_refs = load_portfolio_references()
+    rng = np.random.default_rng(seed)
+    reset_codes(seed, count)
+
+    type_count = len(OBJECT_TYPES)
+    guaranteed = np.repeat(np.arange(type_count), MIN_PER_TYPE)
+    remaining_count = max(0, count - len(guaranteed))
+    type_codes = rng.permutation(np.concatenate([guaranteed, rng.integers(type_count, size=remaining_count)]))[:count]
+    count = len(type_codes)
+
+    names: List[str] = [''] * count
+    addresses: List[Optional[Dict[str, Any]]] = [None] * count
+    characteristics: List[Dict[str, Any]] = [{}] * count
+    for code, obj_type in enumerate(OBJECT_TYPES):
+        positions = np.flatnonzero(type_codes == code).tolist()
+        if not positions:
+            continue
+        size = len(positions)
+        key = obj_type['key']
+        group_names = object_names(obj_type, rng, size)
+        group_characteristics = build_rows(characteristic_columns(key), rng, size)
+        group_addresses = address_rows(rng, size, key in APARTMENT_KEYS) if key not in MOVABLE_KEYS else [None] * size
+        for position, name, chars, address in zip(positions, group_names, group_characteristics, group_addresses):
+            names[position] = name
+            characteristics[position] = chars
+            addresses[position] = address
+
+    columns = column_lists(OBJECT_COLUMNS, rng, count)
+    partners = partner_lists(rng, count)
+    references: List[Optional[str]] = [None] * count
+    if portfolio_refs:
+        refs = column_objects(portfolio_refs)[rng.integers(len(portfolio_refs), size=count)].tolist()
+        references = [ref if linked else None for ref, linked in zip(refs, columns['linked'])]
+
+    objects = []
+    rows = zip(type_codes.tolist(), columns['id'], columns['status'], columns['createdAt'], names, partners, addresses, characteristics)
+    for i, (code, obj_id, status, created_date, name, obj_partners, address, chars) in enumerate(rows):
+        obj_type = OBJECT_TYPES[code]
+        obj = {
+            'id': obj_id,
+            'number': f"КО-2024-{i+1:04d}",
+            'name': name,
+            'mainCategory': 'real_estate' if obj_type['key'] not in MOVABLE_KEYS else 'movable',
+            'classification': {
+                'level0': obj_type['level0'],
+                'level1': obj_type['level1'],
+                'level2': obj_type['level2'],
+            },
+            'cbCode': obj_type['cbCode'],
+            'status': status,
+            'partners': obj_partners,
+            'address': address,
+            'characteristics': chars,
+            'documents': [],
+            'createdAt': created_date,
+            'updatedAt': created_date,
+        }
+        if references[i]:
+            obj['reference'] = references[i]
+            obj['contractNumber'] = f"ДЗ-{columns['contractYear'][i]}-{columns['contractSerial'][i]}"
+        objects.append(obj)
+
+    return objects
+
+
+OBJECT_ENGINES = {
+    'python': generate_objects,
+    'numpy': generate_objects_batched,
+}
+
+OUTPUT_FILE = Path("public/registryObjects.json")
+MANIFEST_NAME = "manifest.json"
+
+
+def reference_index_file(objects_file: Path) -> Path:
+    return objects_file.with_name(f"{objects_file.stem}.references.json")
+
+
+def pages_dir(objects_file: Path) -> Path:
+    return objects_file.with_suffix('')
+
+
+def page_name(page: int) -> str:
+    return f"page-{page:05d}.json"
+
+
+def build_reference_index(
+    objects: List[Dict[str, Any]], objects_file: Path, page_size: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Обратный индекс reference сделки -> id ее объектов (в порядке реестра):
+    обеспечение по договору находится по ключу, без разбора всего реестра.
+    rows — номера тех же объектов в реестре; при постраничном выводе объект
+    лежит на странице row // pageSize.
+    """
+    references: Dict[str, List[str]] = {}
+    rows: Dict[str, List[int]] = {}
+    for row, obj in enumerate(objects):
+        reference = obj.get('reference')
+        if reference:
+            references.setdefault(reference, []).append(obj['id'])
+            rows.setdefault(reference, []).append(row)
+    return {
+        'objectsFile': f"{pages_dir(objects_file).name}/{MANIFEST_NAME}" if page_size else objects_file.name,
+        'pageSize': page_size or None,
+        'total': len(objects),
+        'linked': sum(len(ids) for ids in references.values()),
+        'references': dict(sorted(references.items())),
+        'rows': dict(sorted(rows.items())),
+    }
+
+
+def write_reference_index(index: Dict[str, Any], objects_file: Path) -> Path:
+    target = reference_index_file(objects_file)
+    target.write_text(json.dumps(index, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+    return target
+
+
+def type_counts(objects: List[Dict[str, Any]]) -> Dict[str, Dict[str, int]]:
+    """Число объектов по level0 и level1 (в порядке справочника OBJECT_TYPES)"""
+    counts: Dict[str, Dict[str, int]] = {'level0': {}, 'level1': {}}
+    for obj_type in OBJECT_TYPES:
+        counts['level0'].setdefault(obj_type['level0'], 0)
+        counts['level1'].setdefault(obj_type['level1'], 0)
+    for obj in objects:
+        classification = obj['classification']
+        for level in ('level0', 'level1'):
+            counts[level][classification[level]] = counts[level].get(classification[level], 0) + 1
+    return {level: {name: count for name, count in by_name.items() if count} for level, by_name in counts.items()}
+
+
+def write_pages(objects: List[Dict[str, Any]], objects_file: Path, page_size: int) -> Path:
+    """
+    Реестр страницами по page_size объектов (компактный JSON) и manifest.json:
+    число объектов по типам и для каждой страницы — диапазон строк [start, stop)
+    и номеров объектов (number), чтобы грузить только нужные страницы.
+    """
+    target_dir = pages_dir(objects_file)
+    target_dir.mkdir(parents=True, exist_ok=True)
+    for stale in target_dir.glob("page-*.json"):
+        stale.unlink()
+
+    pages = []
+    for page, start in enumerate(range(0, len(objects), page_size)):
+        chunk = objects[start:start + page_size]
+        name = page_name(page)
+        (target_dir / name).write_text(json.dumps(chunk, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+        pages.append({
+            'file': name,
+            'count': len(chunk),
+            'rows': [start, start + len(chunk)],
+            'numbers': [chunk[0]['number'], chunk[-1]['number']],
+        })
+
+    manifest = {
+        'total': len(objects),
+        'pageSize': page_size,
+        'pageCount': len(pages),
+        'counts': type_counts(objects),
+        'pages': pages,
+    }
+    manifest_file = target_dir / MANIFEST_NAME
+    manifest_file.write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+    return manifest_file
+
+
+def run(
+    portfolio: Optional[List[Dict[str, Any]]] = None,
+    count: int = 300,
+    engine: str = 'python',
+    seed: Optional[int] = None,
+    page_size: int = 0,
+):
+    print(f"Генерация {count} объектов для реестра (все типы из справочника)...")
+    refs = portfolio_references(portfolio) if portfolio is not None else None
+    objects = OBJECT_ENGINES[engine](count, refs, seed)
     
-    output_file = Path("public/registryObjects.json")
+    output_file = OUTPUT_FILE
     output_file.parent.mkdir(parents=True, exist_ok=True)
     
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(objects, f, ensure_ascii=False, indent=2)
+    if page_size:
+        saved_to = write_pages(objects, output_file, page_size)
+    else:
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(objects, f, ensure_ascii=False, indent=2)
+        saved_to = output_file
+    
+    index = build_reference_index(objects, output_file, page_size)
+    index_file = write_reference_index(index, output_file)
     
     print(f"✅ Сгенерировано {len(objects)} объектов")
-    print(f"📁 Сохранено в {output_file}")
+    print(f"📁 Сохранено в {saved_to}")
+    print(f"🔗 Индекс сделка -> объекты: {index_file} ({len(index['references'])} сделок)")
     
     # Статистика
-    by_type = {}
-    with_ref = sum(1 for obj in objects if obj.get('reference'))
-    for obj in objects:
-        key = obj['classification']['level1']
-        by_type[key] = by_type.get(key, 0) + 1
+    by_type = type_counts(objects)['level1']
+    with_ref = index['linked']
     
     print("\n📊 Статистика:")
     print(f"  - Связано с портфелем: {with_ref} ({with_ref*100//len(objects)}%)")
@@ -575,6 +1278,33 @@ def main():
     for obj_type, count in sorted(by_type.items(), key=lambda x: -x[1]):
         print(f"    • {obj_type}: {count}")
 
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate demo collateral registry objects.")
+    parser.add_argument("--count", type=int, default=300, help="Число объектов (не меньше 5 каждого типа при count >= 90).")
+    parser.add_argument(
+        "--engine",
+        choices=sorted(OBJECT_ENGINES),
+        default="python",
+        help="Построчная (python) или пакетная по типам объектов (numpy) генерация; "
+        "поля и распределения одинаковы, случайные значения разные.",
+    )
+    parser.add_argument("--seed", type=int, default=None, help="Seed генератора (по умолчанию не фиксирован).")
+    parser.add_argument(
+        "--page-size",
+        type=int,
+        default=0,
+        help="Писать реестр страницами по N объектов в public/registryObjects/ с manifest.json; "
+        "0 — одним файлом registryObjects.json.",
+    )
+    args = parser.parse_args(argv)
+    if args.page_size < 0:
+        parser.error("--page-size must be >= 0")
+    return args
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    run(None, args.count, args.engine, args.seed, args.page_size)
+
 if __name__ == "__main__":
     main()
 
@@ -1,107 +1,246 @@
 """
 Генерация данных отчетов (Форма 310) из XML файлов
 """
+import argparse
 import json
+import os
 import random
+import time
 import uuid
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, BinaryIO, Dict, List, NamedTuple, Optional, TextIO, Union
 import xml.etree.ElementTree as ET
 
+from report_index import ReportIndex, Stamp
+
 XML_SOURCE_DIR = Path("XML_310_2025-04-24")
 OUTPUT_FILE = Path("public/reportsData.json")
 
 
+# Разделы формы, элементы которых попадают в отчет
+SECTION_KEYS = {f"Раздел{n}": f"section{n}" for n in range(1, 7)}
+
+
+@lru_cache(maxsize=None)
+def local_name(name: str) -> str:
+    """Имя тега или атрибута без namespace: '{urn:...}Раздел1' -> 'Раздел1'"""
+    return name.rsplit("}", 1)[-1]
+
+
+def get_local(attrib: Dict[str, str], name: str) -> Optional[str]:
+    """Значение атрибута независимо от того, задан ли он с namespace"""
+    value = attrib.get(name)
+    if value is None:
+        for key, candidate in attrib.items():
+            if local_name(key) == name:
+                return candidate
+    return value
+
+
+def scan_xml_file(xml_path: Union[Path, BinaryIO]) -> Dict[str, Any]:
+    """
+    Однопроходный разбор XML формы 310 через iterparse.
+
+    Атрибуты корня, кредитной организации и REFERENCE разделов 1-6 читаются
+    на событии start; закрытый элемент сразу удаляется из родителя, поэтому
+    в памяти держится только текущая ветка дерева.
+    """
+    root_attrib: Dict[str, str] = {}
+    credit_org_attrib: Optional[Dict[str, str]] = None
+    sections: Dict[str, List[str]] = {key: [] for key in SECTION_KEYS.values()}
+    path: List[ET.Element] = []
+
+    source = xml_path if hasattr(xml_path, "read") else str(xml_path)
+    for event, elem in ET.iterparse(source, events=("start", "end")):
+        if event == "start":
+            if not path:
+                root_attrib = dict(elem.attrib)
+            else:
+                tag = local_name(elem.tag)
+                section = SECTION_KEYS.get(tag)
+                if section is not None:
+                    ref = get_local(elem.attrib, "REFERENCE")
+                    if ref:
+                        sections[section].append(ref)
+                elif credit_org_attrib is None and tag == "КредитнаяОрганизация":
+                    credit_org_attrib = dict(elem.attrib)
+            path.append(elem)
+        else:
+            path.pop()
+            elem.clear()
+            if path:
+                # Предыдущие соседи уже удалены — elem единственный ребенок
+                path[-1].remove(elem)
+
+    return {
+        "guid": get_local(root_attrib, "Идентификатор"),
+        "reportDate": get_local(root_attrib, "Дата"),
+        "creditOrg": credit_org_attrib,
+        "sections": sections,
+    }
+
+
+def build_report(scanned: Dict[str, Any]) -> Dict[str, Any]:
+    """Отчет для reportsData.json по результату scan_xml_file"""
+    # Основные атрибуты
+    guid = scanned['guid'] or str(uuid.uuid4())
+    report_date = scanned['reportDate'] or datetime.now().strftime('%Y-%m-%d')
+    
+    # Информация о кредитной организации
+    credit_org_attrib = scanned['creditOrg']
+    credit_org = {
+        'name': credit_org_attrib.get('Наименование', 'Не указано') if credit_org_attrib is not None else 'Не указано',
+        'code': credit_org_attrib.get('Код', '') if credit_org_attrib is not None else '',
+    }
+    
+    report = {
+        'id': str(uuid.uuid4()),
+        'guid': guid,
+        'reportDate': report_date,
+        'reportNumber': f"Ф310-{report_date.replace('-', '')}-{random.randint(1000, 9999)}",
+        'reportType': 'form310',
+        'status': random.choice(['draft', 'submitted', 'approved']),
+        'createdAt': (datetime.now() - timedelta(days=random.randint(1, 30))).isoformat(),
+        'updatedAt': datetime.now().isoformat(),
+        'creditOrg': credit_org,
+    }
+    
+    # Разделы 1-6
+    for section, refs in scanned['sections'].items():
+        if refs:
+            report[section] = {
+                'items': [{'id': str(uuid.uuid4()), 'reference': ref} for ref in refs]
+            }
+    
+    return report
+
+
 def parse_xml_file(xml_path: Path) -> Optional[Dict[str, Any]]:
     """Парсинг XML файла формы 310"""
     try:
-        tree = ET.parse(xml_path)
-        root = tree.getroot()
-        
-        # Извлекаем namespace
-        ns = {'ns': 'urn:cbr-ru:rep0409310:v4.0.4.5'}
-        
-        # Основные атрибуты
-        guid = root.get('Идентификатор') or root.get('{urn:cbr-ru:rep0409310:v4.0.4.5}Идентификатор') or str(uuid.uuid4())
-        report_date = root.get('Дата') or root.get('{urn:cbr-ru:rep0409310:v4.0.4.5}Дата') or datetime.now().strftime('%Y-%m-%d')
-        
-        # Информация о кредитной организации
-        credit_org_elem = root.find('.//ns:КредитнаяОрганизация', ns) or root.find('.//КредитнаяОрганизация')
-        credit_org = {
-            'name': credit_org_elem.get('Наименование', 'Не указано') if credit_org_elem is not None else 'Не указано',
-            'code': credit_org_elem.get('Код', '') if credit_org_elem is not None else '',
-        }
-        
-        # Парсинг разделов
-        section1_items = []
-        section2_items = []
-        section3_items = []
-        section4_items = []
-        section5_items = []
-        section6_items = []
-        
-        # Раздел 1
-        section1_elems = root.findall('.//ns:Раздел1', ns) or root.findall('.//Раздел1')
-        for elem in section1_elems:
-            ref = elem.get('REFERENCE') or elem.get('{urn:cbr-ru:rep0409310:v4.0.4.5}REFERENCE') or ''
-            if ref:
-                section1_items.append({
-                    'id': str(uuid.uuid4()),
-                    'reference': ref,
-                })
-        
-        # Раздел 2
-        section2_elems = root.findall('.//ns:Раздел2', ns) or root.findall('.//Раздел2')
-        for elem in section2_elems:
-            ref = elem.get('REFERENCE') or ''
-            if ref:
-                section2_items.append({
-                    'id': str(uuid.uuid4()),
-                    'reference': ref,
-                })
-        
-        # Раздел 3
-        section3_elems = root.findall('.//ns:Раздел3', ns) or root.findall('.//Раздел3')
-        for elem in section3_elems:
-            ref = elem.get('REFERENCE') or ''
-            if ref:
-                section3_items.append({
-                    'id': str(uuid.uuid4()),
-                    'reference': ref,
-                })
-        
-        report = {
-            'id': str(uuid.uuid4()),
-            'guid': guid,
-            'reportDate': report_date,
-            'reportNumber': f"Ф310-{report_date.replace('-', '')}-{random.randint(1000, 9999)}",
-            'reportType': 'form310',
-            'status': random.choice(['draft', 'submitted', 'approved']),
-            'createdAt': (datetime.now() - timedelta(days=random.randint(1, 30))).isoformat(),
-            'updatedAt': datetime.now().isoformat(),
-            'creditOrg': credit_org,
-        }
-        
-        if section1_items:
-            report['section1'] = {'items': section1_items}
-        if section2_items:
-            report['section2'] = {'items': section2_items}
-        if section3_items:
-            report['section3'] = {'items': section3_items}
-        if section4_items:
-            report['section4'] = {'items': section4_items}
-        if section5_items:
-            report['section5'] = {'items': section5_items}
-        if section6_items:
-            report['section6'] = {'items': section6_items}
-        
-        return report
+        return build_report(scan_xml_file(xml_path))
     except Exception as e:
         print(f"Ошибка при парсинге {xml_path}: {e}")
         return None
 
 
+class XmlSource(NamedTuple):
+    """XML формы 310: отдельный файл или член zip-архива (member)"""
+    path: Path
+    member: Optional[str] = None
+
+    @property
+    def name(self) -> str:
+        return f"{self.path.name}/{self.member}" if self.member else self.path.name
+
+
+def is_form310_name(name: str) -> bool:
+    base = name.rsplit("/", 1)[-1]
+    return base.startswith('Ф310_') and base.lower().endswith('.xml')
+
+
+def zip_sources(archive: Path) -> List[XmlSource]:
+    with zipfile.ZipFile(archive) as zf:
+        return [XmlSource(archive, info.filename) for info in zf.infolist() if not info.is_dir() and is_form310_name(info.filename)]
+
+
+def discover_sources(roots: List[Path]) -> List[XmlSource]:
+    """XML формы 310 в каталогах (рекурсивно), отдельных файлах и zip-архивах"""
+    sources: List[XmlSource] = []
+    for root in roots:
+        paths = sorted(p for p in root.rglob('*') if p.is_file()) if root.is_dir() else [root] if root.exists() else []
+        for path in paths:
+            if path.suffix.lower() == '.zip':
+                try:
+                    sources.extend(zip_sources(path))
+                except zipfile.BadZipFile as e:
+                    print(f"Ошибка при чтении архива {path}: {e}")
+            elif is_form310_name(path.name):
+                sources.append(XmlSource(path))
+    return sources
+
+
+def ingest_source(source: XmlSource) -> Dict[str, Any]:
+    """Разбор одного источника; ошибка не прерывает загрузку остальных"""
+    started = time.perf_counter()
+    result: Dict[str, Any] = {'file': source.name, 'report': None, 'items': 0, 'error': None}
+    try:
+        if source.member is None:
+            scanned = scan_xml_file(source.path)
+        else:
+            # Член архива читается потоком, без распаковки на диск
+            with zipfile.ZipFile(source.path) as zf, zf.open(source.member) as f:
+                scanned = scan_xml_file(f)
+        result['report'] = build_report(scanned)
+        result['items'] = sum(len(refs) for refs in scanned['sections'].values())
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    result['seconds'] = round(time.perf_counter() - started, 3)
+    return result
+
+
+def ingest_sources(sources: List[XmlSource], workers: int = 1) -> List[Dict[str, Any]]:
+    """Разбор источников; при workers > 1 — в пуле процессов, порядок результатов сохраняется"""
+    if workers <= 1 or len(sources) <= 1:
+        return [ingest_source(source) for source in sources]
+    # random.seed без аргумента — чтобы номера отчетов в воркерах не повторялись после fork
+    with ProcessPoolExecutor(max_workers=min(workers, len(sources)), initializer=random.seed) as pool:
+        return list(pool.map(ingest_source, sources))
+
+
+def source_key(source: XmlSource) -> str:
+    key = str(source.path.resolve())
+    return f"{key}!{source.member}" if source.member else key
+
+
+def source_stamps(sources: List[XmlSource]) -> Dict[XmlSource, Stamp]:
+    """Отпечатки источников: (размер, mtime_ns) файла или (размер, CRC) члена архива"""
+    stamps: Dict[XmlSource, Stamp] = {}
+    archives: Dict[Path, Dict[str, Stamp]] = {}
+    for source in sources:
+        if source.member is None:
+            stat = source.path.stat()
+            stamps[source] = (stat.st_size, stat.st_mtime_ns)
+            continue
+        if source.path not in archives:
+            # Каталог архива читается один раз на все его члены
+            with zipfile.ZipFile(source.path) as zf:
+                archives[source.path] = {info.filename: (info.file_size, info.CRC) for info in zf.infolist()}
+        stamps[source] = archives[source.path][source.member]
+    return stamps
+
+
+def print_results(results: List[Dict[str, Any]]) -> None:
+    for result in results:
+        if result['error']:
+            print(f"Ошибка при парсинге {result['file']}: {result['error']}")
+        else:
+            print(f"  {result['file']}: {result['seconds']:.2f} с, элементов разделов: {result['items']}")
+
+
+def ingest_indexed(index: ReportIndex, sources: List[XmlSource], workers: int = 1) -> List[Dict[str, Any]]:
+    """Разбирает только новые и изменившиеся источники; возвращает записи индекса для всех sources"""
+    stamps = source_stamps(sources)
+    known = index.stamps()
+    keys = [source_key(source) for source in sources]
+    stale = [source for source, key in zip(sources, keys) if known.get(key) != stamps[source]]
+
+    started = time.perf_counter()
+    results = ingest_sources(stale, workers)
+    print_results(results)
+    index.store((source_key(source), stamps[source], result) for source, result in zip(stale, results))
+    removed = index.prune(keys)
+    print(
+        f"Разобрано {len(stale)} новых/измененных файлов за {time.perf_counter() - started:.2f} с, "
+        f"из индекса: {len(sources) - len(stale)}, удалено из индекса: {removed}"
+    )
+    return index.entries(keys)
+
+
 def generate_demo_reports(count: int = 10) -> List[Dict[str, Any]]:
     """Генерация демо-отчетов"""
     reports = []
@@ -165,42 +304,109 @@ def generate_demo_reports(count: int = 10) -> List[Dict[str, Any]]:
     return reports
 
 
-def main():
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Build public/reportsData.json from Form 0409310 XML files.")
+    parser.add_argument(
+        "--source",
+        type=Path,
+        nargs="+",
+        default=[XML_SOURCE_DIR],
+        help="Каталоги, XML-файлы или zip-архивы с отчетами Ф310_*.xml (каталоги обходятся рекурсивно).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Число процессов для разбора файлов; 1 — в текущем процессе.",
+    )
+    parser.add_argument(
+        "--ingest-report",
+        type=Path,
+        default=None,
+        help="Сохранить JSON с временем разбора и ошибками по каждому файлу.",
+    )
+    parser.add_argument(
+        "--no-index",
+        action="store_true",
+        help="Разобрать все файлы заново, не используя индекс .cache/reports_index.sqlite.",
+    )
+    parser.add_argument(
+        "--rebuild-index",
+        action="store_true",
+        help="Очистить индекс разобранных отчетов перед запуском.",
+    )
+    return parser.parse_args(argv)
+
+
+def write_reports_payload(out: TextIO, report_texts: List[str], metadata: Dict[str, Any]) -> None:
+    """
+    Пишет то же, что json.dump({'reports': ..., 'metadata': ...}, indent=2),
+    но из готовых JSON-текстов отчетов (indent=2) — без повторной сериализации.
+    """
+    out.write('{\n  "reports": [')
+    for i, text in enumerate(report_texts):
+        out.write(',\n    ' if i else '\n    ')
+        out.write(text.replace('\n', '\n    '))
+    out.write('\n  ],\n' if report_texts else '],\n')
+    out.write('  "metadata": ')
+    out.write(json.dumps(metadata, ensure_ascii=False, indent=2).replace('\n', '\n  '))
+    out.write('\n}')
+
+
+def main(argv: Optional[List[str]] = None):
     """Основная функция"""
-    reports: List[Dict[str, Any]] = []
+    args = parse_args(argv)
     
     # Парсинг XML файлов
-    if XML_SOURCE_DIR.exists():
-        xml_files = list(XML_SOURCE_DIR.glob("*.xml"))
-        for xml_file in xml_files:
-            if xml_file.name.startswith('Ф310_'):
-                parsed = parse_xml_file(xml_file)
-                if parsed:
-                    reports.append(parsed)
+    sources = discover_sources(args.source)
+    index: Optional[ReportIndex] = None
+    if args.no_index:
+        started = time.perf_counter()
+        entries = ingest_sources(sources, args.workers)
+        print_results(entries)
+        if sources:
+            print(f"Разобрано {len(sources)} файлов за {time.perf_counter() - started:.2f} с")
+        for entry in entries:
+            if entry['report'] is not None:
+                entry['report'] = json.dumps(entry['report'], ensure_ascii=False, indent=2)
+    else:
+        index = ReportIndex()
+        if args.rebuild_index:
+            index.clear()
+        entries = ingest_indexed(index, sources, args.workers)
+    report_texts = [entry['report'] for entry in entries if entry['report'] is not None]
+    
+    if args.ingest_report:
+        args.ingest_report.parent.mkdir(parents=True, exist_ok=True)
+        log = [{key: value for key, value in entry.items() if key != 'report'} for entry in entries]
+        args.ingest_report.write_text(json.dumps(log, ensure_ascii=False, indent=2), encoding='utf-8')
     
     # Если не удалось распарсить XML, генерируем демо-данные
-    if not reports:
+    if not report_texts:
         print("XML файлы не найдены или не удалось распарсить. Генерируем демо-данные...")
-        reports = generate_demo_reports(15)
+        demo_count = 15
     else:
         # Добавляем дополнительные демо-отчеты
-        demo_reports = generate_demo_reports(5)
-        reports.extend(demo_reports)
+        demo_count = 5
+    if index is None:
+        demo_reports = generate_demo_reports(demo_count)
+    else:
+        # Демо-отчеты тоже хранятся в индексе, чтобы не меняться от запуска к запуску
+        demo_reports = index.extra(f"demo:{demo_count}", lambda: generate_demo_reports(demo_count))
+        index.close()
+    report_texts.extend(json.dumps(report, ensure_ascii=False, indent=2) for report in demo_reports)
     
-    payload = {
-        'reports': reports,
-        'metadata': {
-            'totalReports': len(reports),
-            'lastUpdated': datetime.now().isoformat(),
-            'sourceFiles': [f.name for f in XML_SOURCE_DIR.glob("*.xml")] if XML_SOURCE_DIR.exists() else [],
-        },
+    metadata = {
+        'totalReports': len(report_texts),
+        'lastUpdated': datetime.now().isoformat(),
+        'sourceFiles': [source.name for source in sources],
     }
     
     OUTPUT_FILE.parent.mkdir(parents=True, exist_ok=True)
     with OUTPUT_FILE.open('w', encoding='utf-8') as f:
-        json.dump(payload, f, ensure_ascii=False, indent=2)
+        write_reports_payload(f, report_texts, metadata)
     
-    print(f"✅ Reports dataset written: {OUTPUT_FILE} ({len(reports)} reports)")
+    print(f"✅ Reports dataset written: {OUTPUT_FILE} ({len(report_texts)} reports)")
 
 
 if __name__ == '__main__':
@@ -1,23 +1,42 @@
+import argparse
 import json
 import random
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
+
+from plan_common import (
+  DESCRIPTION_FIELDS,
+  add_months,
+  add_months_column,
+  base_type_columns,
+  choose_column,
+  detect_base_type,
+  determine_timeframe,
+  format_date_column,
+  keyed_index,
+  keyed_random,
+  memo_map,
+  or_default,
+  parse_date,
+  parse_date_column,
+  parse_number,
+  plan_rows,
+  portfolio_columns,
+  timeframe_column,
+  update_plan_incremental,
+  write_events_index,
+)
+
 
 PORTFOLIO_FILE = Path("public/portfolioData.json")
 OUTPUT_FILE = Path("public/revaluationPlan.json")
 
-BASE_RULES: List[Tuple[str, str, int]] = [
-  ("недвиж", "Недвижимость", 12),
-  ("транспорт", "Транспорт", 6),
-  ("оборуд", "Оборудование", 6),
-  ("ценн", "Ценные бумаги", 12),
-  ("дол", "Доли", 12),
-  ("имуществен", "Имущественные права", 6),
-  ("товар", "Товары и сырье", 3),
-  ("сырь", "Товары и сырье", 3),
-]
+# Диапазон дат последней проверки для записей без нее
+FALLBACK_LAST_START = datetime(2023, 1, 1)
+FALLBACK_LAST_END = datetime(2024, 9, 1)
 
 REVALUATION_METHODS = {
   "Недвижимость": [
@@ -61,13 +80,6 @@ REVALUATION_METHODS = {
   ],
 }
 
-TIMEFRAMES = [
-  ("overdue", -10_000, -1),
-  ("week", 0, 7),
-  ("month", 0, 30),
-  ("quarter", 0, 90),
-]
-
 
 def load_portfolio() -> List[Dict[str, Any]]:
   if not PORTFOLIO_FILE.exists():
@@ -75,142 +87,185 @@ def load_portfolio() -> List[Dict[str, Any]]:
   return json.loads(PORTFOLIO_FILE.read_text(encoding="utf-8"))
 
 
-def parse_date(value: Any) -> Optional[datetime]:
-  if not value or not isinstance(value, (str, int, float)):
-    return None
-  if isinstance(value, (int, float)):
-    try:
-      return datetime.fromtimestamp(value)
-    except Exception:
-      return None
-  normalized = value.strip()
-  for fmt in ("%Y-%m-%d", "%d.%m.%Y", "%d/%m/%Y"):
-    try:
-      return datetime.strptime(normalized, fmt)
-    except ValueError:
-      continue
-  return None
-
-
-def add_months(date_value: datetime, months: int) -> datetime:
-  month = date_value.month - 1 + months
-  year = date_value.year + month // 12
-  month = month % 12 + 1
-  day = min(date_value.day, [31, 29 if year % 4 == 0 else 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31][month - 1])
-  return datetime(year, month, day)
-
-
-def detect_base_type(record: Dict[str, Any]) -> Tuple[str, int]:
-  raw = " ".join(
-    str(value).lower()
-    for value in [
-      record.get("collateralType"),
-      record.get("type"),
-      record.get("collateralCategory"),
-      record.get("collateralInfo"),
-    ]
-    if value
-  )
-  for key, result, months in BASE_RULES:
-    if key in raw:
-      return result, months
-  return "Прочее", 6
-
-
 def choose_revaluation_method(base_type: str, index: int) -> str:
   options = REVALUATION_METHODS.get(base_type) or REVALUATION_METHODS["Прочее"]
   return options[index % len(options)]
 
 
-def determine_timeframe(planned_date: datetime, today: datetime) -> str:
-  delta = (planned_date - today).days
-  if delta < 0:
-    return "overdue"
-  if delta <= 7:
-    return "week"
-  if delta <= 30:
-    return "month"
-  if delta <= 90:
-    return "quarter"
-  return "later"
-
-
-def parse_number(value: Any) -> Optional[float]:
-  if value is None:
-    return None
-  if isinstance(value, (int, float)):
-    return float(value)
-  if isinstance(value, str):
-    normalized = value.replace(" ", "").replace(",", ".")
-    if normalized.replace(".", "", 1).isdigit():
-      try:
-        return float(normalized)
-      except ValueError:
-        return None
-  return None
+def plan_row(record: Dict[str, Any], method_index: int, today: datetime, rng: Any) -> Tuple[Dict[str, Any], datetime]:
+  """Строка плана и плановая дата; rng — модуль random или random.Random"""
+  base_type, base_frequency = detect_base_type(record)
+  frequency_months = base_frequency
+
+  last_date = parse_date(record.get("lastRevaluationDate"))
+  if not last_date:
+    days_offset = rng.randint(0, (FALLBACK_LAST_END - FALLBACK_LAST_START).days)
+    last_date = FALLBACK_LAST_START + timedelta(days=days_offset)
+
+  next_date = parse_date(record.get("nextRevaluationDate"))
+  if not next_date:
+    next_date = add_months(last_date, frequency_months)
+
+  method = choose_revaluation_method(base_type, method_index)
+  timeframe = determine_timeframe(next_date, today)
+
+  collateral_value = parse_number(record.get("collateralValue"))
+  market_value = None
+  if collateral_value:
+    # Market value is typically 80-120% of collateral value
+    market_value = collateral_value * rng.uniform(0.8, 1.2)
+
+  row = {
+    "reference": record.get("reference"),
+    "borrower": record.get("borrower"),
+    "pledger": record.get("pledger"),
+    "segment": record.get("segment"),
+    "group": record.get("group"),
+    "collateralType": record.get("collateralType") or base_type,
+    "baseType": base_type,
+    "frequencyMonths": frequency_months,
+    "lastRevaluationDate": last_date.strftime("%Y-%m-%d"),
+    "plannedDate": next_date.strftime("%Y-%m-%d"),
+    "timeframe": timeframe,
+    "owner": record.get("owner") or "ЗП - не назначен",
+    "priority": record.get("priority"),
+    "collateralValue": collateral_value,
+    "marketValue": market_value,
+    "revaluationMethod": method,
+  }
+  return row, next_date
 
 
 def generate_plan(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
   today = datetime.today()
   random.seed(130)
-  plan_rows: List[Dict[str, Any]] = []
-  fallback_last_start = datetime(2023, 1, 1)
-  fallback_last_end = datetime(2024, 9, 1)
-
-  for index, record in enumerate(records):
-    base_type, base_frequency = detect_base_type(record)
-    frequency_months = base_frequency
-
-    last_date = parse_date(record.get("lastRevaluationDate"))
-    if not last_date:
-      days_offset = random.randint(0, (fallback_last_end - fallback_last_start).days)
-      last_date = fallback_last_start + timedelta(days=days_offset)
-
-    next_date = parse_date(record.get("nextRevaluationDate"))
-    if not next_date:
-      next_date = add_months(last_date, frequency_months)
-
-    method = choose_revaluation_method(base_type, index)
-    timeframe = determine_timeframe(next_date, today)
-
-    collateral_value = parse_number(record.get("collateralValue"))
-    market_value = None
-    if collateral_value:
-      # Market value is typically 80-120% of collateral value
-      market_value = collateral_value * random.uniform(0.8, 1.2)
-
-    plan_rows.append(
-      {
-        "reference": record.get("reference"),
-        "borrower": record.get("borrower"),
-        "pledger": record.get("pledger"),
-        "segment": record.get("segment"),
-        "group": record.get("group"),
-        "collateralType": record.get("collateralType") or base_type,
-        "baseType": base_type,
-        "frequencyMonths": frequency_months,
-        "lastRevaluationDate": last_date.strftime("%Y-%m-%d"),
-        "plannedDate": next_date.strftime("%Y-%m-%d"),
-        "timeframe": timeframe,
-        "owner": record.get("owner") or "ЗП - не назначен",
-        "priority": record.get("priority"),
-        "collateralValue": collateral_value,
-        "marketValue": market_value,
-        "revaluationMethod": method,
-      }
-    )
+  return [plan_row(record, index, today, random)[0] for index, record in enumerate(records)]
+
+
+def plan_row_keyed(record: Dict[str, Any], key: str, today: datetime) -> Tuple[Dict[str, Any], datetime]:
+  """plan_row для инкрементального режима: случайность и способ зависят от ключа записи, а не от ее номера"""
+  return plan_row(record, keyed_index(key), today, keyed_random(130, key))
+
+
+# Поля портфеля, которые читает generate_plan_columnar (кроме DESCRIPTION_FIELDS)
+PLAN_FIELDS = (
+  "lastRevaluationDate",
+  "collateralValue",
+  "nextRevaluationDate",
+  "reference",
+  "borrower",
+  "pledger",
+  "segment",
+  "group",
+  "collateralType",
+  "owner",
+  "priority",
+)
+
+
+def generate_plan_columnar(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+  """Колоночный вариант generate_plan: тот же план при том же seed"""
+  today = datetime.today()
+  random.seed(130)
 
-  return plan_rows
+  columns = portfolio_columns(records, DESCRIPTION_FIELDS + PLAN_FIELDS)
+  base_types, frequency_months = base_type_columns(columns)
+  last_dates = parse_date_column(columns["lastRevaluationDate"])
+  missing = np.isnat(last_dates)
+  collateral_values = memo_map(columns["collateralValue"], parse_number)
+  valued = np.array([bool(value) for value in collateral_values], dtype=bool)
+
+  # generate_plan чередует randint (нет даты переоценки) и uniform (есть стоимость)
+  # по записям — последовательность розыгрышей повторяется в том же порядке
+  span = (FALLBACK_LAST_END - FALLBACK_LAST_START).days
+  offsets: List[int] = []
+  factors: List[float] = []
+  for is_missing, is_valued in zip(missing.tolist(), valued.tolist()):
+    if is_missing:
+      offsets.append(random.randint(0, span))
+    if is_valued:
+      factors.append(random.uniform(0.8, 1.2))
+  last_dates[missing] = np.datetime64(FALLBACK_LAST_START, "us") + np.array(offsets, dtype="timedelta64[D]")
+
+  next_dates = parse_date_column(columns["nextRevaluationDate"])
+  missing = np.isnat(next_dates)
+  next_dates[missing] = add_months_column(last_dates[missing], frequency_months[missing])
+
+  market_values = np.full(len(records), None, dtype=object)
+  market_values[valued] = (np.array(collateral_values, dtype=object)[valued].astype(float) * np.array(factors)).tolist()
+
+  return plan_rows(
+    {
+      "reference": columns["reference"],
+      "borrower": columns["borrower"],
+      "pledger": columns["pledger"],
+      "segment": columns["segment"],
+      "group": columns["group"],
+      "collateralType": or_default(columns["collateralType"], base_types),
+      "baseType": base_types,
+      "frequencyMonths": frequency_months,
+      "lastRevaluationDate": format_date_column(last_dates),
+      "plannedDate": format_date_column(next_dates),
+      "timeframe": timeframe_column(next_dates, today),
+      "owner": or_default(columns["owner"], "ЗП - не назначен"),
+      "priority": columns["priority"],
+      "collateralValue": collateral_values,
+      "marketValue": market_values,
+      "revaluationMethod": choose_column(base_types, REVALUATION_METHODS),
+    }
+  )
+
+
+PLAN_ENGINES = {
+  "python": generate_plan,
+  "numpy": generate_plan_columnar,
+}
 
 
-def main() -> None:
-  records = load_portfolio()
-  plan = generate_plan(records)
+def run(records: List[Dict[str, Any]], engine: str = "python", incremental: bool = False) -> None:
+  if incremental:
+    today = datetime.today()
+    plan, stats = update_plan_incremental(
+      records, DESCRIPTION_FIELDS + PLAN_FIELDS, plan_row_keyed, OUTPUT_FILE, Path(__file__), today
+    )
+    print(
+      f"Updated revaluation plan for {len(plan)} обеспечений in {OUTPUT_FILE}: "
+      f"пересчитано {stats['rebuilt']}, обновлен срок {stats['retimed']}, "
+      f"без изменений {stats['reused']}, удалено {stats['removed']}"
+    )
+    events_file = write_events_index(plan, OUTPUT_FILE, today)
+    print(f"Saved revaluation events index to {events_file}")
+    return
+
+  plan = PLAN_ENGINES[engine](records)
   OUTPUT_FILE.parent.mkdir(parents=True, exist_ok=True)
   OUTPUT_FILE.write_text(json.dumps(plan, ensure_ascii=False, indent=2), encoding="utf-8")
   print(f"Saved revaluation plan for {len(plan)} обеспечений to {OUTPUT_FILE}")
+  events_file = write_events_index(plan, OUTPUT_FILE, datetime.today())
+  print(f"Saved revaluation events index to {events_file}")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+  parser = argparse.ArgumentParser(description="Generate collateral revaluation plan from the portfolio.")
+  parser.add_argument(
+    "--engine",
+    choices=sorted(PLAN_ENGINES),
+    default="python",
+    help="Построчный (python) или колоночный (numpy) расчет плана; результат одинаков.",
+  )
+  parser.add_argument(
+    "--incremental",
+    action="store_true",
+    help="Пересчитать только новые и измененные записи (ключ — reference). Случайные значения "
+    "берутся из хэша reference, поэтому план отличается от полного пересчета с тем же seed.",
+  )
+  return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+  args = parse_args(argv)
+  run(load_portfolio(), args.engine, args.incremental)
 
 
 if __name__ == "__main__":
   main()
-
@@ -0,0 +1,120 @@
+"""
+Уникальные идентификаторы без хранения выданных значений.
+
+FeistelPermutation — псевдослучайная перестановка [0, size): сеть Фейстеля на
+2k битах (2**2k >= size) с ключами раундов из seed; значения за пределами size
+шифруются повторно (cycle walking, в среднем меньше 4 раз). Allocator выдает
+образы 0, 1, 2, ... — все различны, пока не исчерпан size, каждое за O(1) и без
+множества уже выданных. Одинаковые seed и stream дают одинаковую
+последовательность, в том числе в next() и take(n) вперемешку.
+"""
+
+import hashlib
+from typing import Any, List, Sequence
+
+import numpy as np
+
+
+ROUNDS = 4
+MASK64 = (1 << 64) - 1
+MIX1 = 0x9E3779B97F4A7C15
+MIX2 = 0xBF58476D1CE4E5B9
+
+
+def round_keys(seed: int, stream: str, rounds: int = ROUNDS) -> List[int]:
+    return [
+        int.from_bytes(hashlib.blake2b(f"{seed}:{stream}:{round}".encode("utf-8"), digest_size=8).digest(), "big")
+        for round in range(rounds)
+    ]
+
+
+class FeistelPermutation:
+    """Биекция [0, size) -> [0, size), заданная seed и именем потока"""
+
+    def __init__(self, size: int, seed: int, stream: str = "", rounds: int = ROUNDS) -> None:
+        if size < 1:
+            raise ValueError("size must be positive")
+        self.size = size
+        self.half_bits = max(1, ((size - 1).bit_length() + 1) // 2)
+        self.half_mask = (1 << self.half_bits) - 1
+        self.keys = round_keys(seed, stream, rounds)
+
+    def _round(self, value: int, key: int) -> int:
+        # Финализатор splitmix64 в арифметике по модулю 2**64
+        value = ((value ^ key) * MIX1) & MASK64
+        value ^= value >> 29
+        value = (value * MIX2) & MASK64
+        value ^= value >> 32
+        return value & self.half_mask
+
+    def _encrypt(self, value: int) -> int:
+        left, right = value >> self.half_bits, value & self.half_mask
+        for key in self.keys:
+            left, right = right, left ^ self._round(right, key)
+        return (left << self.half_bits) | right
+
+    def permute(self, index: int) -> int:
+        if not 0 <= index < self.size:
+            raise IndexError(index)
+        value = self._encrypt(index)
+        while value >= self.size:
+            value = self._encrypt(value)
+        return value
+
+    def _round_many(self, values: np.ndarray, key: int) -> np.ndarray:
+        values = (values ^ np.uint64(key)) * np.uint64(MIX1)
+        values ^= values >> np.uint64(29)
+        values *= np.uint64(MIX2)
+        values ^= values >> np.uint64(32)
+        return values & np.uint64(self.half_mask)
+
+    def _encrypt_many(self, values: np.ndarray) -> np.ndarray:
+        bits = np.uint64(self.half_bits)
+        left, right = values >> bits, values & np.uint64(self.half_mask)
+        for key in self.keys:
+            left, right = right, left ^ self._round_many(right, key)
+        return (left << bits) | right
+
+    def permute_many(self, indexes: np.ndarray) -> np.ndarray:
+        """permute для массива индексов (результат тот же, что поэлементно)"""
+        values = self._encrypt_many(np.asarray(indexes, dtype=np.uint64))
+        outside = np.flatnonzero(values >= np.uint64(self.size))
+        while len(outside):
+            values[outside] = self._encrypt_many(values[outside])
+            outside = outside[values[outside] >= np.uint64(self.size)]
+        return values.astype(np.int64)
+
+
+class Allocator:
+    """Последовательная выдача уникальных чисел из [0, size) в перемешанном порядке"""
+
+    def __init__(self, size: int, seed: int, stream: str = "") -> None:
+        self.permutation = FeistelPermutation(size, seed, stream)
+        self.issued = 0
+
+    @property
+    def size(self) -> int:
+        return self.permutation.size
+
+    def _reserve(self, count: int) -> int:
+        start = self.issued
+        if start + count > self.size:
+            raise OverflowError(f"Allocator exhausted: {self.size} values")
+        self.issued += count
+        return start
+
+    def next(self) -> int:
+        return self.permutation.permute(self._reserve(1))
+
+    def take(self, count: int) -> np.ndarray:
+        start = self._reserve(count)
+        return self.permutation.permute_many(np.arange(start, start + count, dtype=np.uint64))
+
+
+def mixed_radix(values: Any, radixes: Sequence[int]) -> List[Any]:
+    """Разложение числа или массива чисел по смешанному основанию (старший разряд первым)"""
+    digits = []
+    for radix in reversed(radixes):
+        digits.append(values % radix)
+        values = values // radix
+    return digits[::-1]
@@ -0,0 +1,85 @@
+"""
+Классификация обеспечения по ключевым словам.
+
+Правила — упорядоченный список (ключевые слова, результат): побеждает первое
+правило, хотя бы одно слово которого входит в текст (без учета регистра), как
+в цепочках `if any(k in text for k in ...)`. Все слова всех правил собираются
+в один автомат Ахо–Корасик, поэтому текст просматривается один раз независимо
+от числа слов, а повторяющиеся описания берутся из LRU-кэша.
+"""
+
+from collections import deque
+from functools import lru_cache
+from typing import Deque, Dict, Generic, List, Optional, Sequence, Tuple, TypeVar
+
+
+T = TypeVar("T")
+
+CACHE_SIZE = 1 << 16
+
+
+class KeywordClassifier(Generic[T]):
+    """Первое сработавшее правило для текста; default — если не сработало ни одно"""
+
+    def __init__(self, rules: Sequence[Tuple[Sequence[str], T]], default: T, cache_size: int = CACHE_SIZE) -> None:
+        self.results: List[T] = [result for _, result in rules]
+        self.default = default
+        self.goto: List[Dict[str, int]] = [{}]
+        # best[state] — наименьший номер правила среди слов, оканчивающихся в state
+        # (с учетом суффиксных ссылок); None — ни одного
+        self.best: List[Optional[int]] = [None]
+        for rule, (keywords, _) in enumerate(rules):
+            for keyword in keywords:
+                self._add(keyword.lower(), rule)
+        self.fail = self._link()
+        self.classify = lru_cache(maxsize=cache_size)(self._classify)
+
+    def _add(self, keyword: str, rule: int) -> None:
+        state = 0
+        for char in keyword:
+            if char not in self.goto[state]:
+                self.goto.append({})
+                self.best.append(None)
+                self.goto[state][char] = len(self.goto) - 1
+            state = self.goto[state][char]
+        if self.best[state] is None or rule < self.best[state]:
+            self.best[state] = rule
+
+    def _link(self) -> List[int]:
+        fail = [0] * len(self.goto)
+        queue: Deque[int] = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self.goto[state].items():
+                queue.append(child)
+                link = fail[state]
+                while link and char not in self.goto[link]:
+                    link = fail[link]
+                fail[child] = self.goto[link].get(char, 0)
+                inherited = self.best[fail[child]]
+                if inherited is not None and (self.best[child] is None or inherited < self.best[child]):
+                    self.best[child] = inherited
+        return fail
+
+    def match(self, text: str) -> Optional[int]:
+        """Номер первого сработавшего правила или None"""
+        goto, fail, best = self.goto, self.fail, self.best
+        found: Optional[int] = None
+        state = 0
+        for char in text.lower():
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            rule = best[state]
+            if rule is not None and (found is None or rule < found):
+                if rule == 0:
+                    return 0
+                found = rule
+        return found
+
+    def _classify(self, text: str) -> T:
+        rule = self.match(text)
+        return self.default if rule is None else self.results[rule]
+
+    def classify_many(self, texts: Sequence[str]) -> List[T]:
+        return [self.classify(text) for text in texts]
@@ -0,0 +1,459 @@
+"""
+Общие функции планировщиков мониторинга и переоценки.
+
+Разбор дат и чисел, определение базового типа обеспечения и календарная
+арифметика вызываются для каждой записи портфеля, поэтому повторяющиеся
+значения (даты, описания обеспечения) разбираются один раз и кэшируются.
+Колоночные варианты (*_column) считают то же самое сразу по всему портфелю.
+"""
+
+import hashlib
+import json
+import random
+import re
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from keyword_classifier import KeywordClassifier
+from source_cache import file_hash
+
+
+BASE_RULES: List[Tuple[str, str, int]] = [
+  ("недвиж", "Недвижимость", 12),
+  ("транспорт", "Транспорт", 6),
+  ("оборуд", "Оборудование", 6),
+  ("ценн", "Ценные бумаги", 12),
+  ("дол", "Доли", 12),
+  ("имуществен", "Имущественные права", 6),
+  ("товар", "Товары и сырье", 3),
+  ("сырь", "Товары и сырье", 3),
+]
+
+DEFAULT_BASE_TYPE: Tuple[str, int] = ("Прочее", 6)
+
+BASE_CLASSIFIER = KeywordClassifier([([key], (result, months)) for key, result, months in BASE_RULES], DEFAULT_BASE_TYPE)
+
+TIMEFRAMES = [
+  ("overdue", -10_000, -1),
+  ("week", 0, 7),
+  ("month", 0, 30),
+  ("quarter", 0, 90),
+]
+
+DATE_FORMATS = ("%Y-%m-%d", "%d.%m.%Y", "%d/%m/%Y")
+
+# Точные формы ГГГГ-ММ-ДД и ДД.ММ.ГГГГ разбираются без strptime;
+# все остальное (неполные числа, "/") идет через DATE_FORMATS как раньше
+ISO_DATE_RE = re.compile(r"[0-9]{4}-[0-9]{2}-[0-9]{2}")
+DOTTED_DATE_RE = re.compile(r"[0-9]{2}\.[0-9]{2}\.[0-9]{4}")
+
+DATE_CACHE_SIZE = 1 << 16
+
+# Февраль високосного года определяется по year % 4, как в исходных планировщиках
+MONTH_DAYS = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def parse_date_text(text: str) -> Optional[datetime]:
+  normalized = text.strip()
+  try:
+    if ISO_DATE_RE.fullmatch(normalized):
+      return datetime.fromisoformat(normalized)
+    if DOTTED_DATE_RE.fullmatch(normalized):
+      return datetime(int(normalized[6:]), int(normalized[3:5]), int(normalized[:2]))
+  except ValueError:
+    return None
+  for fmt in DATE_FORMATS:
+    try:
+      return datetime.strptime(normalized, fmt)
+    except ValueError:
+      continue
+  return None
+
+
+def parse_date(value: Any) -> Optional[datetime]:
+  if not value or not isinstance(value, (str, int, float)):
+    return None
+  if isinstance(value, (int, float)):
+    try:
+      return datetime.fromtimestamp(value)
+    except Exception:
+      return None
+  return parse_date_text(value)
+
+
+def add_months(date_value: datetime, months: int) -> datetime:
+  month = date_value.month - 1 + months
+  year = date_value.year + month // 12
+  month = month % 12 + 1
+  days = 29 if month == 2 and year % 4 == 0 else MONTH_DAYS[month - 1]
+  return datetime(year, month, min(date_value.day, days))
+
+
+def classify_base_text(raw: str) -> Tuple[str, int]:
+  return BASE_CLASSIFIER.classify(raw)
+
+
+def description_text(values: Iterable[Any]) -> str:
+  return " ".join(str(value).lower() for value in values if value)
+
+
+def detect_base_type(record: Dict[str, Any]) -> Tuple[str, int]:
+  raw = description_text(
+    [
+      record.get("collateralType"),
+      record.get("type"),
+      record.get("collateralCategory"),
+      record.get("collateralInfo"),
+    ]
+  )
+  return classify_base_text(raw)
+
+
+def determine_timeframe(planned_date: datetime, today: datetime) -> str:
+  delta = (planned_date - today).days
+  if delta < 0:
+    return "overdue"
+  if delta <= 7:
+    return "week"
+  if delta <= 30:
+    return "month"
+  if delta <= 90:
+    return "quarter"
+  return "later"
+
+
+def parse_number(value: Any) -> Optional[float]:
+  if value is None:
+    return None
+  if isinstance(value, (int, float)):
+    return float(value)
+  if isinstance(value, str):
+    normalized = value.replace(" ", "").replace(",", ".")
+    if normalized.replace(".", "", 1).isdigit():
+      try:
+        return float(normalized)
+      except ValueError:
+        return None
+  return None
+
+
+# Колоночный режим: те же правила над столбцами всего портфеля сразу
+
+DESCRIPTION_FIELDS = ("collateralType", "type", "collateralCategory", "collateralInfo")
+
+
+def column(records: List[Dict[str, Any]], field: str) -> np.ndarray:
+  values = np.empty(len(records), dtype=object)
+  values[:] = [record.get(field) for record in records]
+  return values
+
+
+def portfolio_columns(records: List[Dict[str, Any]], fields: Iterable[str]) -> Dict[str, np.ndarray]:
+  """Столбцы портфеля (record.get(field)); каждое поле извлекается один раз"""
+  return {field: column(records, field) for field in dict.fromkeys(fields)}
+
+
+def truthy(values: np.ndarray) -> np.ndarray:
+  # Аналог `if value` для каждого элемента
+  return values.astype(bool)
+
+
+def or_default(values: np.ndarray, default: Any) -> np.ndarray:
+  """Поэлементно `value or default`; default — скаляр или столбец"""
+  return np.where(truthy(values), values, default)
+
+
+def memo_map(values: Iterable[Any], func: Callable[[Any], Any]) -> List[Any]:
+  """func по каждому значению; строки вычисляются один раз на уникальное значение"""
+  cache: Dict[str, Any] = {}
+  result = []
+  for value in values:
+    if type(value) is str:
+      if value not in cache:
+        cache[value] = func(value)
+      result.append(cache[value])
+    else:
+      result.append(func(value))
+  return result
+
+
+def factorize_column(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+  """Коды уникальных значений столбца (None/NaN — код -1); нехэшируемые значения не склеиваются"""
+  try:
+    return pd.factorize(values)
+  except TypeError:
+    return np.arange(len(values)), values
+
+
+def base_type_columns(columns: Dict[str, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+  """Базовый тип и периодичность (мес.) для каждой записи, как detect_base_type"""
+  # Записи группируются по сочетанию кодов четырех полей описания, текст
+  # описания строится по одной записи из группы. factorize склеивает None с NaN
+  # и 1 с True/1.0 — их строковые формы не содержат ключей BASE_RULES, так что
+  # тип группы от этого не зависит
+  keys = np.zeros(len(columns[DESCRIPTION_FIELDS[0]]), dtype=np.int64)
+  for field in DESCRIPTION_FIELDS:
+    codes, uniques = factorize_column(columns[field])
+    keys = pd.factorize(keys * (len(uniques) + 1) + codes + 1)[0]
+  first = np.unique(keys, return_index=True)[1]
+
+  classified = BASE_CLASSIFIER.classify_many([description_text(columns[field][row] for field in DESCRIPTION_FIELDS) for row in first])
+  base_types = np.array([base_type for base_type, _ in classified] or [""], dtype=object)
+  months = np.array([months for _, months in classified] or [0], dtype=np.int64)
+  return base_types[keys], months[keys]
+
+
+def contains_column(values: np.ndarray, needle: str) -> np.ndarray:
+  """Поэлементно `needle in str(value or "").lower()`"""
+  codes, uniques = factorize_column(values)
+  text = pd.Series([str(value or "").lower() for value in uniques], dtype=object)
+  # Код -1 (None/NaN) дает "" или "nan" — needle в них не входит
+  return np.append(text.str.contains(needle, regex=False).to_numpy(dtype=bool), False)[codes]
+
+
+def choose_column(base_types: np.ndarray, rules: Dict[str, List[str]]) -> np.ndarray:
+  """Способ по базовому типу и номеру записи: options[index % len(options)]"""
+  index = np.arange(len(base_types))
+  chosen = np.empty(len(base_types), dtype=object)
+  for base_type in pd.unique(base_types):
+    options = np.array(rules.get(base_type) or rules["Прочее"], dtype=object)
+    rows = base_types == base_type
+    chosen[rows] = options[index[rows] % len(options)]
+  return chosen
+
+
+def parse_date_column(values: np.ndarray) -> np.ndarray:
+  """parse_date по столбцу; пустые значения — NaT"""
+  try:
+    # None и NaN parse_date одинаково превращает в None, поэтому их общий код -1 безопасен
+    codes, uniques = pd.factorize(values)
+  except TypeError:
+    return np.array(memo_map(values, parse_date), dtype="datetime64[us]")
+  parsed = np.array([parse_date(value) for value in uniques] + [None], dtype="datetime64[us]")
+  return parsed[codes]
+
+
+def add_months_column(dates: np.ndarray, months: np.ndarray) -> np.ndarray:
+  """add_months по столбцу дат (datetime64[us]); время отбрасывается, как в add_months"""
+  month_start = dates.astype("datetime64[M]")
+  month_index = month_start.astype(np.int64)
+  day = (dates.astype("datetime64[D]") - month_start.astype("datetime64[D]")).astype(np.int64) + 1
+  total = month_index % 12 + months
+  year = month_index // 12 + 1970 + total // 12
+  month = total % 12 + 1
+  days = np.where((month == 2) & (year % 4 == 0), 29, np.array(MONTH_DAYS)[month - 1])
+  day = np.minimum(day, days)
+
+  # Те же ошибки, что дал бы datetime(year, month, day) в add_months
+  if ((year < 1) | (year > 9999)).any():
+    raise ValueError(f"year {year[(year < 1) | (year > 9999)][0]} is out of range")
+  if ((month == 2) & (day == 29) & (year % 100 == 0) & (year % 400 != 0)).any():
+    raise ValueError("day is out of range for month")
+
+  shifted = ((year - 1970) * 12 + month - 1).astype("datetime64[M]").astype("datetime64[D]") + (day - 1)
+  return shifted.astype("datetime64[us]")
+
+
+def timeframe_column(dates: np.ndarray, today: datetime) -> np.ndarray:
+  """determine_timeframe по столбцу дат"""
+  delta = (dates - np.datetime64(today, "us")) // np.timedelta64(1, "D")
+  return np.select(
+    [delta < 0, delta <= 7, delta <= 30, delta <= 90],
+    [np.array(name, dtype=object) for name in ("overdue", "week", "month", "quarter")],
+    "later",
+  )
+
+
+def format_date_column(dates: np.ndarray) -> List[str]:
+  """strftime("%Y-%m-%d") по столбцу дат"""
+  days, inverse = np.unique(dates.astype("datetime64[D]"), return_inverse=True)
+  formatted = np.datetime_as_string(days, unit="D").astype(object)
+  # strftime не дополняет годы < 1000 нулями — такие даты форматируются по одной
+  early = days < np.datetime64("1000-01-01")
+  if early.any():
+    formatted[early] = [value.strftime("%Y-%m-%d") for value in days[early].astype(datetime)]
+  return formatted[inverse].tolist()
+
+
+def plan_rows(columns: Dict[str, Any]) -> List[Dict[str, Any]]:
+  """Строки плана из столбцов; порядок ключей — порядок columns"""
+  keys = list(columns)
+  values = [value.tolist() if isinstance(value, np.ndarray) else value for value in columns.values()]
+  return [dict(zip(keys, row)) for row in zip(*values)]
+
+
+# Индекс предстоящих событий: план, отсортированный по дате, с диапазонами по срокам и ответственным
+
+TIMEFRAME_ORDER = ("overdue", "week", "month", "quarter", "later")
+
+
+def events_index_file(plan_file: Path) -> Path:
+  return plan_file.with_name(f"{plan_file.stem}.events.json")
+
+
+def timeframe_ranges(ranks: np.ndarray) -> Dict[str, List[int]]:
+  """[начало, конец) каждого срока в отсортированном списке; ranks не убывают"""
+  bounds = np.searchsorted(ranks, np.arange(len(TIMEFRAME_ORDER) + 1)).tolist()
+  return {name: [bounds[i], bounds[i + 1]] for i, name in enumerate(TIMEFRAME_ORDER)}
+
+
+def build_events_index(plan: List[Dict[str, Any]], plan_file: Path, generated_on: str) -> Dict[str, Any]:
+  """
+  Индекс по строкам плана: order — номера строк плана по возрастанию plannedDate,
+  ranges — срез order для каждого срока (overdue, week, ...). То же по каждому
+  ответственному (owner). "Что у куратора X на этой неделе" — это
+  order[start:stop] вместо просмотра всего плана.
+  """
+  dates = np.array([row["plannedDate"] for row in plan], dtype=str)
+  rank_of = {name: rank for rank, name in enumerate(TIMEFRAME_ORDER)}
+  ranks = np.array([rank_of[row["timeframe"]] for row in plan], dtype=np.int64)
+  # При одинаковой дате строки с разным временем могли попасть в разные сроки — досортировка по сроку
+  order = np.lexsort((ranks, dates)) if len(plan) else np.zeros(0, dtype=np.int64)
+
+  owner_codes, owner_names = pd.factorize(np.array([row["owner"] for row in plan], dtype=object), sort=True)
+  by_owner = order[np.argsort(owner_codes[order], kind="stable")]
+  owner_bounds = np.searchsorted(owner_codes[by_owner], np.arange(len(owner_names) + 1))
+
+  owners: Dict[str, Any] = {}
+  for code, owner in enumerate(owner_names):
+    rows = by_owner[owner_bounds[code]:owner_bounds[code + 1]]
+    owners[str(owner)] = {"order": rows.tolist(), "ranges": timeframe_ranges(ranks[rows])}
+
+  return {
+    "planFile": plan_file.name,
+    "generatedOn": generated_on,
+    "dateField": "plannedDate",
+    "total": len(plan),
+    "order": order.tolist(),
+    "ranges": timeframe_ranges(ranks[order]),
+    "owners": owners,
+  }
+
+
+def write_events_index(plan: List[Dict[str, Any]], plan_file: Path, today: datetime) -> Path:
+  target = events_index_file(plan_file)
+  index = build_events_index(plan, plan_file, today.strftime("%Y-%m-%d"))
+  target.write_text(json.dumps(index, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+  return target
+
+
+# Инкрементальный режим: строки плана по ключу записи (reference), пересчитываются
+# только записи, изменившиеся с прошлого запуска
+
+PLAN_STATE_DIR = Path(".cache") / "plans"
+PLAN_STATE_VERSION = 1
+
+
+def keyed_random(seed: int, key: str) -> random.Random:
+  """Генератор, зависящий только от seed и ключа записи — не от ее места в портфеле"""
+  digest = hashlib.blake2b(f"{seed}:{key}".encode("utf-8"), digest_size=8).digest()
+  return random.Random(int.from_bytes(digest, "big"))
+
+
+def keyed_index(key: str) -> int:
+  return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=4).digest(), "big")
+
+
+def record_keys(records: List[Dict[str, Any]]) -> List[str]:
+  """reference записи; повторы получают суффикс #N в порядке появления"""
+  seen: Dict[str, int] = {}
+  keys = []
+  for record in records:
+    reference = str(record.get("reference") or "")
+    count = seen.get(reference, 0)
+    seen[reference] = count + 1
+    keys.append(f"{reference}#{count}" if count else reference)
+  return keys
+
+
+def record_fingerprint(record: Dict[str, Any], fields: Sequence[str]) -> str:
+  return hashlib.blake2b(repr([record.get(field) for field in fields]).encode("utf-8"), digest_size=12).hexdigest()
+
+
+SCALAR_ENCODER = json.JSONEncoder(ensure_ascii=False)
+SCALAR_TYPES = (str, int, float, bool, type(None))
+
+
+def render_plan_row(row: Dict[str, Any]) -> str:
+  """Строка в том виде, в каком ее записал бы json.dumps(plan, indent=2)"""
+  # json.dumps с indent работает на чистом Python; плоскую строку из скаляров
+  # собираем сами, значения кодируются C-энкодером
+  if row and all(isinstance(value, SCALAR_TYPES) for value in row.values()):
+    encode = SCALAR_ENCODER.encode
+    return "{\n    " + ",\n    ".join(f"{encode(key)}: {encode(value)}" for key, value in row.items()) + "\n  }"
+  return json.dumps(row, ensure_ascii=False, indent=2).replace("\n", "\n  ")
+
+
+def plan_state_file(plan_file: Path) -> Path:
+  return PLAN_STATE_DIR / f"{plan_file.stem}.state.json"
+
+
+def load_plan_state(state_file: Path, code: str) -> Dict[str, List[Any]]:
+  if not state_file.exists():
+    return {}
+  try:
+    state = json.loads(state_file.read_text(encoding="utf-8"))
+  except ValueError:
+    return {}
+  # Состояние от другой версии планировщика не используется
+  if state.get("version") != PLAN_STATE_VERSION or state.get("code") != code:
+    return {}
+  return state["rows"]
+
+
+def update_plan_incremental(
+  records: List[Dict[str, Any]],
+  fields: Sequence[str],
+  build_row: Callable[[Dict[str, Any], str, datetime], Tuple[Dict[str, Any], datetime]],
+  plan_file: Path,
+  script: Path,
+  today: datetime,
+) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+  """
+  Обновляет plan_file по изменениям портфеля. Для каждой записи в состоянии
+  хранятся отпечаток полей fields, плановая дата, срок, ответственный и
+  готовый JSON строки. Новые и изменившиеся записи строятся build_row, у
+  остальных при смене дня пересчитывается только срок (timeframe).
+
+  Возвращает строки для индекса событий (plannedDate, timeframe, owner) и счетчики.
+  """
+  state_file = plan_state_file(plan_file)
+  code = file_hash(script)[:16] + file_hash(Path(__file__))[:16]
+  previous = load_plan_state(state_file, code)
+  rows: Dict[str, List[Any]] = {}
+  stats = {"rebuilt": 0, "retimed": 0, "reused": 0}
+
+  for key, record in zip(record_keys(records), records):
+    fingerprint = record_fingerprint(record, fields)
+    entry = previous.get(key)
+    if entry is None or entry[0] != fingerprint:
+      row, planned_at = build_row(record, key, today)
+      entry = [fingerprint, planned_at.isoformat(), row["timeframe"], row["owner"], render_plan_row(row)]
+      stats["rebuilt"] += 1
+    else:
+      timeframe = determine_timeframe(datetime.fromisoformat(entry[1]), today)
+      if timeframe != entry[2]:
+        row = json.loads(entry[4])
+        row["timeframe"] = timeframe
+        entry = [fingerprint, entry[1], timeframe, entry[3], render_plan_row(row)]
+        stats["retimed"] += 1
+      else:
+        stats["reused"] += 1
+    rows[key] = entry
+  stats["removed"] = len(set(previous) - set(rows))
+
+  texts = [entry[4] for entry in rows.values()]
+  plan_file.parent.mkdir(parents=True, exist_ok=True)
+  plan_file.write_text("[\n  " + ",\n  ".join(texts) + "\n]" if texts else "[]", encoding="utf-8")
+  state_file.parent.mkdir(parents=True, exist_ok=True)
+  state = {"version": PLAN_STATE_VERSION, "code": code, "rows": rows}
+  state_file.write_text(json.dumps(state, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+
+  events_rows = [{"plannedDate": entry[1][:10], "timeframe": entry[2], "owner": entry[3]} for entry in rows.values()]
+  return events_rows, stats
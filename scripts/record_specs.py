@@ -0,0 +1,140 @@
+"""
+Шаблоны записей: поле — имя, вероятность и генератор.
+
+Шаблон — упорядоченный список Field. Генератор — функция от контекста:
+словаря с исходными данными записи и уже вычисленными полями шаблона.
+Вероятность p: поле заполняется при random.random() > 1 - p, как в литералах
+вида `x if random.random() > 0.3 else None`, иначе берется otherwise. Условие
+when (имя поля контекста или функция от контекста) проверяется до броска.
+let — промежуточное значение, которого нет в записи; если имя — кортеж,
+значение распаковывается.
+
+compile_record один раз разбирает шаблон (пороги, условия, ключи записи), и
+построитель проходит по полям одним циклом. Случайные значения берутся в
+порядке шаблона, поэтому шаблон, повторяющий порядок рукописного кода, при
+одном seed дает тот же результат.
+"""
+
+import random
+from operator import itemgetter
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+
+Context = Dict[str, Any]
+Generator = Callable[[Context], Any]
+
+
+class Field(NamedTuple):
+    name: Union[str, Tuple[str, ...]]
+    value: Generator
+    probability: Optional[float] = None  # None — без броска
+    when: Union[str, Generator, None] = None
+    otherwise: Any = None
+    output: bool = True  # False — промежуточное значение (см. let)
+
+
+def let(
+    name: Union[str, Tuple[str, ...]],
+    value: Generator,
+    probability: Optional[float] = None,
+    when: Union[str, Generator, None] = None,
+    otherwise: Any = None,
+) -> Field:
+    return Field(name, value, probability, when, otherwise, output=False)
+
+
+def const(value: Any) -> Generator:
+    return lambda context: value
+
+
+class Ref(NamedTuple):
+    """Значение поля контекста name (см. ref)"""
+
+    name: str
+
+    def __call__(self, context: Context) -> Any:
+        return context[self.name]
+
+
+def ref(name: str) -> Ref:
+    """
+    Значение поля контекста name. Безусловное поле записи со значением ref(...)
+    не вычисляется отдельно — оно берется из контекста при сборке записи.
+    """
+    return Ref(name)
+
+
+def choice(options: Sequence[Any]) -> Generator:
+    """random.choice(options)"""
+    return lambda context: random.choice(options)
+
+
+def randint(low: int, high: int) -> Generator:
+    return lambda context: random.randint(low, high)
+
+
+class _Step(NamedTuple):
+    name: Union[str, Tuple[str, ...]]
+    value: Generator
+    when: Optional[Generator]
+    threshold: Optional[float]
+    otherwise: Any
+
+
+def unpacking(names: Tuple[str, ...], value: Generator) -> Generator:
+    def unpack(context: Context) -> None:
+        context.update(zip(names, value(context)))
+
+    return unpack
+
+
+def compile_step(field: Field) -> _Step:
+    value = field.value
+    if isinstance(field.name, tuple):
+        if field.output or field.when is not None or field.probability is not None:
+            raise ValueError(f"Unpacking fields must be unconditional lets: {field.name}")
+        value = unpacking(field.name, value)
+    when = itemgetter(field.when) if isinstance(field.when, str) else field.when
+    # Порог округляется, чтобы 1 - 0.7 давало ровно 0.3 из исходного литерала
+    threshold = None if field.probability is None else round(1 - field.probability, 12)
+    return _Step(field.name, value, when, threshold, field.otherwise)
+
+
+def is_alias(field: Field) -> bool:
+    return field.output and isinstance(field.value, Ref) and field.when is None and field.probability is None
+
+
+def compile_record(fields: Sequence[Field], skip_none: bool = False) -> Callable[[Context], Dict[str, Any]]:
+    """
+    Построитель записи по шаблону. Построитель получает контекст (словарь
+    исходных данных) и дополняет его вычисленными полями, поэтому каждой
+    записи нужен свой словарь. skip_none — не писать ключи со значением None.
+    """
+    names = [field.name for field in fields if field.output]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Duplicate record fields: {names}")
+    # Поля записи читаются из контекста при сборке, поэтому перезаписывать их позже нельзя
+    sources = []
+    for position, field in enumerate(fields):
+        if not field.output:
+            continue
+        source = field.value.name if is_alias(field) else field.name
+        if any(later.name == source for later in fields[position + 1:]):
+            raise ValueError(f"Record field {field.name} is overwritten later in the template")
+        sources.append(source)
+    steps: List[_Step] = [compile_step(field) for field in fields if not is_alias(field)]
+    collect = itemgetter(*sources) if len(sources) > 1 else lambda context: tuple(context[source] for source in sources)
+
+    def build(context: Context) -> Dict[str, Any]:
+        roll = random.random
+        for name, value, when, threshold, otherwise in steps:
+            if (when is None or when(context)) and (threshold is None or roll() > threshold):
+                context[name] = value(context)
+            else:
+                context[name] = otherwise
+        record = dict(zip(names, collect(context)))
+        if skip_none:
+            return {key: item for key, item in record.items() if item is not None}
+        return record
+
+    return build
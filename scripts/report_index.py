@@ -0,0 +1,108 @@
+"""
+Индекс разобранных отчетов формы 310 (SQLite).
+
+Для каждого источника хранится отпечаток (размер и mtime файла или размер и
+CRC члена zip-архива) и готовый JSON отчета. generate_reports_data разбирает
+только новые и изменившиеся файлы, а reportsData.json собирает из индекса.
+
+Пересобрать индекс с нуля: python scripts/generate_reports_data.py --rebuild-index
+"""
+
+import json
+import sqlite3
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+INDEX_FILE = Path(".cache") / "reports_index.sqlite"
+
+Stamp = Tuple[int, int]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    source TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    stamp INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    report TEXT,
+    items INTEGER NOT NULL,
+    error TEXT,
+    seconds REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS extras (
+    key TEXT PRIMARY KEY,
+    payload TEXT NOT NULL
+);
+"""
+
+
+class ReportIndex:
+    """Отчеты по ключу источника; используется как контекстный менеджер"""
+
+    def __init__(self, path: Path = INDEX_FILE) -> None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(path))
+        self.conn.executescript(SCHEMA)
+
+    def __enter__(self) -> "ReportIndex":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.conn.commit()
+        self.conn.close()
+
+    def clear(self) -> None:
+        with self.conn:
+            self.conn.execute("DELETE FROM reports")
+            self.conn.execute("DELETE FROM extras")
+
+    def stamps(self) -> Dict[str, Stamp]:
+        return {source: (size, stamp) for source, size, stamp in self.conn.execute("SELECT source, size, stamp FROM reports")}
+
+    def store(self, rows: Iterable[Tuple[str, Stamp, Dict[str, Any]]]) -> None:
+        """rows — (ключ источника, отпечаток, результат ingest_source)"""
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO reports VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (
+                        source,
+                        stamp[0],
+                        stamp[1],
+                        result["file"],
+                        None if result["report"] is None else json.dumps(result["report"], ensure_ascii=False, indent=2),
+                        result["items"],
+                        result["error"],
+                        result["seconds"],
+                    )
+                    for source, stamp, result in rows
+                ),
+            )
+
+    def prune(self, keep: Iterable[str]) -> int:
+        """Удаляет записи об источниках, которых больше нет"""
+        gone = set(self.stamps()) - set(keep)
+        with self.conn:
+            self.conn.executemany("DELETE FROM reports WHERE source = ?", ((source,) for source in gone))
+        return len(gone)
+
+    def entries(self, sources: List[str]) -> List[Dict[str, Any]]:
+        """Записи в порядке sources; report — JSON-текст отчета (indent=2) или None"""
+        rows = {
+            row[0]: {"file": row[1], "report": row[2], "items": row[3], "error": row[4], "seconds": row[5]}
+            for row in self.conn.execute("SELECT source, name, report, items, error, seconds FROM reports")
+        }
+        return [rows[source] for source in sources if source in rows]
+
+    def extra(self, key: str, build: Callable[[], Any]) -> Any:
+        """Значение из extras; при отсутствии строится build() и сохраняется"""
+        row: Optional[Tuple[str]] = self.conn.execute("SELECT payload FROM extras WHERE key = ?", (key,)).fetchone()
+        if row is not None:
+            return json.loads(row[0])
+        value = build()
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO extras VALUES (?, ?)", (key, json.dumps(value, ensure_ascii=False)))
+        return value
@@ -0,0 +1,424 @@
+"""
+Единая точка запуска генераторов public/*.json.
+
+Портфель (public/portfolioData.json) читается один раз и передаётся
+генераторам в памяти через их функцию run(portfolio). Генераторы описаны
+как граф зависимостей STAGES; независимые этапы выполняются параллельно
+в пуле процессов, зависимые — после завершения своих предшественников.
+
+Сборка инкрементальная: в MANIFEST_FILE для каждого этапа хранятся хэши
+входных файлов, хэш скрипта вместе с импортируемыми им модулями из scripts/,
+seed и хэши записанных выходов. Этап пропускается, если входы, скрипт и seed
+не изменились, выходы совпадают с записанными им самим и ни одна из
+зависимостей не пересобиралась в этом запуске. --force пересобирает всё.
+"""
+
+import argparse
+import ast
+import hashlib
+import importlib
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+from source_cache import file_hash
+
+
+PORTFOLIO_FILE = Path("public/portfolioData.json")
+MANIFEST_FILE = Path(".cache") / "build_manifest.json"
+SCRIPTS_DIR = Path(__file__).resolve().parent
+
+# name — имя этапа, module — скрипт с функцией run, deps — этапы, которые должны
+# завершиться раньше, portfolio — передавать ли портфель в run() (иначе
+# вызывается main(argv)), inputs/outputs — файлы и каталоги для манифеста,
+# seed — seed, с которым скрипт генерирует данные (None — не фиксирован),
+# default — входит ли этап в запуск без аргументов, after — этапы, после
+# которых он идёт, если выбраны в том же запуске (без подтягивания зависимостей)
+STAGES: List[Dict[str, Any]] = [
+    {
+        "name": "portfolio",
+        "module": "generate_portfolio_data",
+        "deps": [],
+        "portfolio": False,
+        "argv": [],
+        "inputs": ["ZALOG/залоговый портфель.xlsx"],
+        "outputs": ["public/portfolioData.json"],
+        "seed": 42,
+    },
+    {
+        "name": "monitoring",
+        "module": "generate_monitoring_plan",
+        "deps": ["portfolio"],
+        "portfolio": True,
+        "inputs": ["public/portfolioData.json"],
+        "outputs": ["public/monitoringPlan.json", "public/monitoringPlan.events.json"],
+        "seed": 120,
+    },
+    {
+        "name": "revaluation",
+        "module": "generate_revaluation_plan",
+        "deps": ["portfolio"],
+        "portfolio": True,
+        "inputs": ["public/portfolioData.json"],
+        "outputs": ["public/revaluationPlan.json", "public/revaluationPlan.events.json"],
+        "seed": 130,
+    },
+    {
+        "name": "insurance",
+        "module": "generate_insurance_data",
+        "deps": ["portfolio"],
+        "portfolio": True,
+        "inputs": ["public/portfolioData.json", "INS/Страховой портфель.xlsx"],
+        "outputs": ["public/insuranceData.json"],
+        "seed": None,
+    },
+    {
+        "name": "dossier",
+        "module": "generate_collateral_dossier",
+        "deps": ["portfolio"],
+        "portfolio": True,
+        "inputs": ["public/portfolioData.json", "ZALOG_DOS/структура для хранения документов Залоговое Досье.xlsx"],
+        "outputs": ["public/collateralDossier.json"],
+        "seed": 84,
+    },
+    {
+        "name": "registry",
+        "module": "generate_registry_objects",
+        "deps": ["portfolio"],
+        "portfolio": True,
+        "inputs": ["public/portfolioData.json"],
+        "outputs": ["public/registryObjects.json", "public/registryObjects.references.json"],
+        "seed": None,
+    },
+    # Краткий формат того же collateralConclusionsData.json: только по явному запросу,
+    # иначе полный запуск впустую строил бы файл, который zz_conclusions перезаписывает
+    {
+        "name": "conclusions",
+        "module": "generate_collateral_conclusions_data",
+        "deps": ["portfolio"],
+        "portfolio": True,
+        "inputs": ["public/portfolioData.json"],
+        "outputs": ["public/collateralConclusionsData.json"],
+        "seed": None,
+        "default": False,
+    },
+    {
+        "name": "zz_conclusions",
+        "module": "generate_full_zz_conclusions",
+        "deps": ["portfolio"],
+        "after": ["conclusions"],
+        "portfolio": True,
+        "inputs": ["public/portfolioData.json"],
+        "outputs": ["public/collateralConclusionsData.json"],
+        "seed": None,
+    },
+    {
+        "name": "form310",
+        "module": "generate_form310_xml",
+        "deps": ["portfolio"],
+        "portfolio": True,
+        "inputs": ["public/portfolioData.json"],
+        "outputs": ["public/reports"],
+        "seed": None,
+    },
+    {
+        "name": "reports",
+        "module": "generate_reports_data",
+        "deps": [],
+        "portfolio": False,
+        "argv": [],
+        "inputs": ["XML_310_2025-04-24"],
+        "outputs": ["public/reportsData.json"],
+        "seed": None,
+    },
+]
+
+STAGES_BY_NAME = {stage["name"]: stage for stage in STAGES}
+
+UP_TO_DATE = "актуален"
+
+_portfolio: Optional[List[Dict[str, Any]]] = None
+
+
+def set_portfolio(portfolio: Optional[List[Dict[str, Any]]]) -> None:
+    # Инициализатор воркера: портфель передаётся в каждый процесс один раз, а не на каждый этап
+    global _portfolio
+    _portfolio = portfolio
+
+
+def run_stage(name: str) -> float:
+    stage = STAGES_BY_NAME[name]
+    started = time.perf_counter()
+    module = importlib.import_module(stage["module"])
+    if stage["portfolio"]:
+        module.run(_portfolio)
+    elif stage.get("argv") is not None:
+        module.main(stage["argv"])
+    else:
+        module.main()
+    return time.perf_counter() - started
+
+
+def path_fingerprint(path: Path) -> Optional[str]:
+    if path.is_file():
+        return file_hash(path)
+    if path.is_dir():
+        digest = hashlib.sha256()
+        for child in sorted(p for p in path.rglob("*") if p.is_file()):
+            digest.update(f"{child.relative_to(path).as_posix()}:{file_hash(child)}\n".encode("utf-8"))
+        return digest.hexdigest()
+    return None
+
+
+def local_modules(module: str) -> List[str]:
+    """Модуль и все скрипты из SCRIPTS_DIR, которые он импортирует (транзитивно)."""
+    found: Set[str] = set()
+    pending = [module]
+    while pending:
+        name = pending.pop()
+        path = SCRIPTS_DIR / f"{name}.py"
+        if name in found or not path.is_file():
+            continue
+        found.add(name)
+        for node in ast.walk(ast.parse(path.read_text(encoding="utf-8"))):
+            if isinstance(node, ast.Import):
+                pending.extend(alias.name for alias in node.names)
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                pending.append(node.module)
+    return sorted(found)
+
+
+def script_fingerprint(module: str) -> str:
+    digest = hashlib.sha256()
+    for name in local_modules(module):
+        digest.update(f"{name}:{file_hash(SCRIPTS_DIR / f'{name}.py')}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def stage_fingerprint(stage: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "inputs": {name: path_fingerprint(Path(name)) for name in stage["inputs"]},
+        "script": script_fingerprint(stage["module"]),
+        "seed": stage["seed"],
+    }
+
+
+def load_manifest() -> Dict[str, Any]:
+    if not MANIFEST_FILE.exists():
+        return {}
+    try:
+        return json.loads(MANIFEST_FILE.read_text(encoding="utf-8"))
+    except ValueError:
+        return {}
+
+
+def save_manifest(manifest: Dict[str, Any]) -> None:
+    MANIFEST_FILE.parent.mkdir(parents=True, exist_ok=True)
+    MANIFEST_FILE.write_text(json.dumps(manifest, ensure_ascii=False, indent=2, sort_keys=True), encoding="utf-8")
+
+
+def output_fingerprints(stage: Dict[str, Any]) -> Dict[str, Optional[str]]:
+    return {name: path_fingerprint(Path(name)) for name in stage["outputs"]}
+
+
+def is_up_to_date(
+    stage: Dict[str, Any], fingerprint: Dict[str, Any], manifest: Dict[str, Any], results: Dict[str, Any]
+) -> bool:
+    if any(isinstance(results.get(dep), float) for dep in stage["deps"]):
+        return False
+    if not all(Path(name).exists() for name in stage["outputs"]):
+        return False
+    entry = manifest.get(stage["name"]) or {}
+    if {key: entry.get(key) for key in fingerprint} != fingerprint:
+        return False
+    # Выходы сверяются с записанными этим этапом: файл мог перезаписать другой этап
+    return entry.get("outputs") == output_fingerprints(stage)
+
+
+def dependency_failed(name: str, results: Dict[str, Any]) -> bool:
+    return any(
+        dep in results and not isinstance(results[dep], float) and results[dep] != UP_TO_DATE
+        for dep in STAGES_BY_NAME[name]["deps"]
+    )
+
+
+def prerequisites(name: str, names: List[str]) -> List[str]:
+    """Этапы, которые должны завершиться раньше: deps и выбранные этапы из after."""
+    stage = STAGES_BY_NAME[name]
+    return stage["deps"] + [other for other in stage.get("after", []) if other in names]
+
+
+def dependencies_done(name: str, results: Dict[str, Any], names: List[str]) -> bool:
+    return all(dep in results for dep in prerequisites(name, names))
+
+
+def select_stages(names: Optional[List[str]]) -> List[str]:
+    """Выбранные этапы вместе со всеми их зависимостями, в порядке STAGES."""
+    if not names:
+        return [stage["name"] for stage in STAGES if stage.get("default", True)]
+    unknown = [name for name in names if name not in STAGES_BY_NAME]
+    if unknown:
+        raise ValueError(f"Неизвестные этапы: {', '.join(unknown)}")
+    selected: Set[str] = set()
+    pending = list(names)
+    while pending:
+        name = pending.pop()
+        if name not in selected:
+            selected.add(name)
+            pending.extend(STAGES_BY_NAME[name]["deps"])
+    return [stage["name"] for stage in STAGES if stage["name"] in selected]
+
+
+def check_acyclic(names: List[str]) -> None:
+    done: Set[str] = set()
+    remaining = list(names)
+    while remaining:
+        ready = [name for name in remaining if all(dep in done for dep in prerequisites(name, names))]
+        if not ready:
+            raise ValueError(f"Циклическая зависимость этапов: {', '.join(remaining)}")
+        done.update(ready)
+        remaining = [name for name in remaining if name not in done]
+
+
+def load_portfolio() -> List[Dict[str, Any]]:
+    if not PORTFOLIO_FILE.exists():
+        raise FileNotFoundError(f"Portfolio data not found: {PORTFOLIO_FILE}")
+    portfolio = json.loads(PORTFOLIO_FILE.read_text(encoding="utf-8"))
+    print(f"📊 Портфель загружен один раз: {len(portfolio)} записей")
+    return portfolio
+
+
+class Build:
+    """Состояние одного запуска: результаты этапов и обновляемый манифест."""
+
+    def __init__(self, names: List[str], force: bool) -> None:
+        self.names = names
+        self.force = force
+        self.manifest = load_manifest()
+        self.results: Dict[str, Any] = {}
+        self.fingerprints: Dict[str, Dict[str, Any]] = {}
+
+    def prepare(self, name: str) -> bool:
+        """Решает судьбу готового к запуску этапа; True — этап нужно выполнить."""
+        if dependency_failed(name, self.results):
+            self.results[name] = "пропущен: не выполнена зависимость"
+            return False
+        stage = STAGES_BY_NAME[name]
+        fingerprint = stage_fingerprint(stage)
+        if not self.force and is_up_to_date(stage, fingerprint, self.manifest, self.results):
+            self.results[name] = UP_TO_DATE
+            return False
+        self.fingerprints[name] = fingerprint
+        return True
+
+    def finish(self, name: str, result: Any) -> None:
+        self.results[name] = result
+        if isinstance(result, float):
+            self.manifest[name] = {**self.fingerprints[name], "outputs": output_fingerprints(STAGES_BY_NAME[name])}
+        else:
+            self.manifest.pop(name, None)
+
+    def needs_portfolio(self) -> bool:
+        return any(STAGES_BY_NAME[name]["portfolio"] for name in self.names if name not in self.results)
+
+
+def run_sequential(build: Build) -> None:
+    for name in build.names:
+        if name in build.results or not build.prepare(name):
+            continue
+        if STAGES_BY_NAME[name]["portfolio"] and _portfolio is None:
+            set_portfolio(load_portfolio())
+        try:
+            build.finish(name, run_stage(name))
+        except Exception as exc:
+            build.finish(name, exc)
+
+
+def run_parallel(build: Build, workers: int) -> None:
+    remaining = [name for name in build.names if name not in build.results]
+    running: Dict[Future, str] = {}
+    portfolio = load_portfolio() if build.needs_portfolio() else None
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=set_portfolio, initargs=(portfolio,)) as pool:
+        while remaining or running:
+            for name in [name for name in remaining if dependencies_done(name, build.results, build.names)]:
+                remaining.remove(name)
+                if build.prepare(name):
+                    running[pool.submit(run_stage, name)] = name
+            if not running:
+                continue
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                try:
+                    build.finish(name, future.result())
+                except Exception as exc:
+                    build.finish(name, exc)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run all public/*.json generators over a single in-memory portfolio.")
+    parser.add_argument(
+        "stages",
+        nargs="*",
+        help=(
+            "Этапы для запуска (с зависимостями); по умолчанию: "
+            f"{', '.join(stage['name'] for stage in STAGES if stage.get('default', True))}."
+        ),
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Число процессов для независимых этапов; 1 — последовательно в текущем процессе.",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Пересобрать все выбранные этапы, не сверяясь с манифестом.",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    names = select_stages(args.stages)
+    check_acyclic(names)
+
+    started = time.perf_counter()
+    build = Build(names, args.force)
+    # Портфель строится в текущем процессе до загрузки: остальные этапы читают его результат
+    if "portfolio" in names:
+        if build.prepare("portfolio"):
+            try:
+                build.finish("portfolio", run_stage("portfolio"))
+            except Exception as exc:
+                build.finish("portfolio", exc)
+
+    if args.workers <= 1:
+        run_sequential(build)
+    else:
+        run_parallel(build, args.workers)
+    save_manifest(build.manifest)
+
+    print("\n📋 Итоги этапов:")
+    failed = 0
+    for name in names:
+        result = build.results.get(name)
+        if isinstance(result, float):
+            print(f"  ✅ {name}: {result:.2f} с")
+        elif result == UP_TO_DATE:
+            print(f"  ⏭  {name}: {UP_TO_DATE}")
+        else:
+            failed += 1
+            print(f"  ❌ {name}: {result}")
+    print(f"⏱  Всего: {time.perf_counter() - started:.2f} с")
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Кэш разобранных Excel-источников.
+
+pd.read_excel — самый медленный шаг пересборки данных. Разобранный DataFrame
+сохраняется в CACHE_DIR (Parquet, если установлен pyarrow и таблица
+сериализуема, иначе pickle) под ключом из пути книги, параметров чтения и
+SHA-256 ее содержимого. Пока книга не изменилась, повторные запуски читают кэш.
+
+Отключить кэш: переменная окружения CMS_SOURCE_CACHE=0.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pandas as pd
+
+
+CACHE_DIR = Path(".cache") / "sources"
+CACHE_ENABLED = os.environ.get("CMS_SOURCE_CACHE", "1") != "0"
+
+HASH_CHUNK_SIZE = 1 << 20
+
+
+def file_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with Path(path).open("rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def options_key(options: Dict[str, Any]) -> str:
+    payload = json.dumps(options, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:12]
+
+
+def cache_stem(path: Path, options: Dict[str, Any]) -> str:
+    # Путь входит в ключ: одноименные книги из разных каталогов (ZZ/, ZALOG/, ...)
+    # не должны вытеснять друг друга через drop_stale
+    source = Path(os.path.normpath(path)).as_posix()
+    return f"{Path(path).stem}-{options_key({'source': source, **options})}"
+
+
+def drop_stale(stem: str, keep: Path) -> None:
+    # Старые версии той же книги с теми же параметрами больше не нужны
+    for stale in CACHE_DIR.glob(f"{stem}-*"):
+        if stale.stem.rsplit("-", 1)[0] == stem and stale != keep:
+            stale.unlink(missing_ok=True)
+
+
+def find_cached(prefix: str) -> List[Path]:
+    return [candidate for candidate in (CACHE_DIR / f"{prefix}.parquet", CACHE_DIR / f"{prefix}.pkl") if candidate.exists()]
+
+
+def store(df: pd.DataFrame, prefix: str) -> Path:
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    target = CACHE_DIR / f"{prefix}.parquet"
+    try:
+        df.to_parquet(target)
+        # Parquet не сохраняет смешанные object-столбцы и нестроковые имена
+        # колонок без потерь — такие листы кладём в pickle
+        if not pd.read_parquet(target).equals(df):
+            raise ValueError("parquet round-trip mismatch")
+    except Exception:
+        target.unlink(missing_ok=True)
+        target = CACHE_DIR / f"{prefix}.pkl"
+        df.to_pickle(target)
+    return target
+
+
+def load(path: Path) -> pd.DataFrame:
+    if path.suffix == ".parquet":
+        return pd.read_parquet(path)
+    return pd.read_pickle(path)
+
+
+def read_excel_cached(path: Path, sheet_name: Any = 0, **options: Any) -> pd.DataFrame:
+    """Аналог pd.read_excel(path, sheet_name=..., **options) с кэшем по хэшу книги."""
+    if not CACHE_ENABLED:
+        return pd.read_excel(path, sheet_name=sheet_name, **options)
+
+    stem = cache_stem(path, {"sheet_name": sheet_name, **options})
+    prefix = f"{stem}-{file_hash(path)[:16]}"
+    for cached in find_cached(prefix):
+        try:
+            return load(cached)
+        except Exception:
+            cached.unlink(missing_ok=True)
+
+    df = pd.read_excel(path, sheet_name=sheet_name, **options)
+    drop_stale(stem, store(df, prefix))
+    return df
+
+
+def excel_sheet_names(path: Path) -> List[str]:
+    """Список листов книги; кэшируется вместе с хэшем, чтобы не открывать книгу повторно."""
+    if not CACHE_ENABLED:
+        with pd.ExcelFile(path) as xls:
+            return [str(name) for name in xls.sheet_names]
+
+    stem = cache_stem(path, {"sheet_names": True})
+    target = CACHE_DIR / f"{stem}-{file_hash(path)[:16]}.json"
+    if target.exists():
+        return json.loads(target.read_text(encoding="utf-8"))
+
+    with pd.ExcelFile(path) as xls:
+        names = [str(name) for name in xls.sheet_names]
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    target.write_text(json.dumps(names, ensure_ascii=False), encoding="utf-8")
+    drop_stale(stem, target)
+    return names